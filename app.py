@@ -1,44 +1,122 @@
 # app.py
 import os
+from concurrent.futures import Future
+from io import BytesIO
 import cv2
 import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QLabel, QPushButton, QFileDialog, QVBoxLayout, QHBoxLayout,
     QWidget, QMessageBox, QSizePolicy, QAction, QDialog, QSpacerItem, QMenu, QCheckBox, QComboBox,
-    QDialogButtonBox, QFormLayout
+    QDialogButtonBox, QFormLayout, QProgressBar
 )
-from PyQt5.QtGui import QPixmap, QFont, QPainter, QIcon
-from PyQt5.QtCore import Qt, QSettings
+from PyQt5.QtGui import QFont, QPainter
+from PyQt5.QtCore import Qt, QSettings, QTimer
 from utils import convertir_cv_qt, load_fonts
 from ui_components import PatientInfoDialog, ConfirmationDialog
-from image_processing import procesar_imagen
-from pdf_report import generate_pdf_report
+import asset_registry
+import result_cache
+from image_io import leer_imagen, leer_vista_previa
+from image_processing import LADO_VISTA_PREVIA
+import scan_export
 from scanner import scan_image
+from workers import GestorTrabajos
+from parallel import TiemposEjecucion, ejecutor
 
 TEST_MODE = True  # Set to True for testing (uploads images), False for production (scans images)
 
+# Status bar labels for the background jobs
+NOMBRES_TRABAJOS = {
+    "left": "Pie izquierdo",
+    "right": "Pie derecho",
+    "reporte": "Reporte PDF",
+}
+
+
+def procesar_vista_previa(imagen_original, foot_side, reportar, reducida=None):
+    """Segmenta y renderiza la vista previa de un pie; se ejecuta en un hilo de trabajo.
+
+    Con `reducida`, un par (imagen reducida, tamaño completo), la vista previa
+    se calcula con ella y `imagen_original` (p. ej. un futuro que todavía
+    decodifica el archivo) se devuelve sin tocar.
+    """
+    reportar("Segmentando", 40)
+    if reducida is not None:
+        vista_previa = result_cache.segmentar(reducida[0], foot_side, vista_previa=True,
+                                              tamano_completo=reducida[1])
+    else:
+        vista_previa = result_cache.segmentar(imagen_original, foot_side, vista_previa=True)
+    reportar("Renderizando", 80)
+    return imagen_original, vista_previa, vista_previa.render_mapa_calor()
+
+
+def resolver_original(original):
+    """El arreglo de un original guardado por la ventana, esperando su decodificación si sigue en curso."""
+    return original.result() if isinstance(original, Future) else original
+
 
 class AspectRatioLabel(QLabel):
+    """QLabel que dibuja su imagen escalada al tamaño del widget sin deformarla.
+
+    La imagen escalada se guarda por tamaño del widget y proporción de
+    píxeles del monitor, así que repintar (al pasar el ratón, mover la
+    ventana, etc.) no vuelve a escalar el escaneo. Mientras se redimensiona
+    se escala con la transformación rápida y, cuando el tamaño deja de
+    cambiar, se vuelve a escalar con la suave.
+    """
+
+    # Milliseconds without resize events before the smooth rescale
+    ESPERA_ESCALADO_SUAVE = 150
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAlignment(Qt.AlignCenter)
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self._pixmap = None
+        self._escalada = None
+        self._clave_escalada = None
+        self._temporizador_suave = QTimer(self)
+        self._temporizador_suave.setSingleShot(True)
+        self._temporizador_suave.setInterval(self.ESPERA_ESCALADO_SUAVE)
+        self._temporizador_suave.timeout.connect(self.update)
 
     def setPixmap(self, pixmap):
+        # Setting the same shared pixmap again (e.g. the backgrounds on "Nuevo") keeps the scaled copy
+        if self._pixmap is not None and pixmap.cacheKey() == self._pixmap.cacheKey():
+            self.update()
+            return
         self._pixmap = pixmap
+        self._escalada = None
+        self._clave_escalada = None
         self.update()
 
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._temporizador_suave.start()
+
+    def pixmap_escalada(self):
+        """La imagen escalada al tamaño actual, reutilizando la anterior si no cambió."""
+        suave = not self._temporizador_suave.isActive()
+        dpr = self.devicePixelRatioF()
+        clave = (self.width(), self.height(), dpr, suave)
+        if clave != self._clave_escalada:
+            # Scale to device pixels so HiDPI screens get a sharp image
+            escalada = self._pixmap.scaled(
+                self.size() * dpr, Qt.KeepAspectRatio,
+                Qt.SmoothTransformation if suave else Qt.FastTransformation
+            )
+            escalada.setDevicePixelRatio(dpr)
+            self._escalada = escalada
+            self._clave_escalada = clave
+        return self._escalada
+
     def paintEvent(self, event):
         super().paintEvent(event)
         if self._pixmap:
+            scaled_pixmap = self.pixmap_escalada()
             painter = QPainter(self)
-            painter.setRenderHint(QPainter.SmoothPixmapTransform)
-            scaled_pixmap = self._pixmap.scaled(
-                self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            x = (self.width() - scaled_pixmap.width()) / 2
-            y = (self.height() - scaled_pixmap.height()) / 2
+            dpr = scaled_pixmap.devicePixelRatioF()
+            x = (self.width() - scaled_pixmap.width() / dpr) / 2
+            y = (self.height() - scaled_pixmap.height() / dpr) / 2
             painter.drawPixmap(int(x), int(y), scaled_pixmap)
 
 
@@ -48,17 +126,24 @@ class VentanaPrincipal(QMainWindow):
         self.setWindowTitle("Orto-Flex Scanner")
         
         # Set the window icon
-        icon_path = os.path.join('resources', 'icon.ico')
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
-        else:
-            print(f"Icon file not found at {icon_path}. Using default icon.")
+        icono_ventana = asset_registry.icono('icon.ico')
+        if icono_ventana is not None:
+            self.setWindowIcon(icono_ventana)
 
         # Initialize image variables
         self.left_image_original = None
         self.left_image_processed = None
+        self.left_segmentation = None
+        self.left_preview = None
         self.right_image_original = None
         self.right_image_processed = None
+        self.right_segmentation = None
+        self.right_preview = None
+
+        # Background jobs (loading, scanning and reports) report progress in the status bar
+        self.trabajos = GestorTrabajos(parent=self)
+        self.trabajos.progreso.connect(self.mostrar_progreso)
+        self.trabajos.inactivo.connect(self.ocultar_progreso)
 
         # QSettings: Load user preferences
         self.settings = QSettings("OrtoFlex", "ScannerApp")
@@ -71,13 +156,10 @@ class VentanaPrincipal(QMainWindow):
         # Load Roboto Font
         self.font_family = load_fonts()
 
-        # Initialize UI components
+        # Initialize UI components; the caller shows the window once everything is built
         self.inicializar_componentes()
         self.aplicar_estilos()
 
-        # Show application in fullscreen
-        self.showFullScreen()
-
     def inicializar_componentes(self):
         # Menu Bar
         self.menu_bar = self.menuBar()
@@ -91,23 +173,7 @@ class VentanaPrincipal(QMainWindow):
         self.label_imagen_derecha.setStyleSheet("background-color: #FFFFFF; border: 1px solid #ccc;")
 
         # Load initial background images
-        bg_left_path = os.path.join('resources', 'bg_left.png')
-        if os.path.exists(bg_left_path):
-            pixmap_bg_left = QPixmap(bg_left_path)
-            self.label_imagen_izquierda.setPixmap(pixmap_bg_left)
-        else:
-            self.label_imagen_izquierda.setText("Pie Izquierdo")
-            self.label_imagen_izquierda.setFont(QFont(self.font_family, 16))
-            self.label_imagen_izquierda.setStyleSheet("color: #1d3557;")
-
-        bg_right_path = os.path.join('resources', 'bg_right.png')
-        if os.path.exists(bg_right_path):
-            pixmap_bg_right = QPixmap(bg_right_path)
-            self.label_imagen_derecha.setPixmap(pixmap_bg_right)
-        else:
-            self.label_imagen_derecha.setText("Pie Derecho")
-            self.label_imagen_derecha.setFont(QFont(self.font_family, 16))
-            self.label_imagen_derecha.setStyleSheet("color: #1d3557;")
+        self.mostrar_fondos()
 
         # Images Layout
         imagenes_layout = QHBoxLayout()
@@ -179,6 +245,16 @@ class VentanaPrincipal(QMainWindow):
         contenedor.setLayout(main_layout)
         self.setCentralWidget(contenedor)
 
+        # Progress and cancellation for background jobs
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setFixedWidth(240)
+        self.boton_cancelar = QPushButton("Cancelar")
+        self.boton_cancelar.clicked.connect(self.trabajos.cancelar_todos)
+        self.statusBar().addPermanentWidget(self.barra_progreso)
+        self.statusBar().addPermanentWidget(self.boton_cancelar)
+        self.barra_progreso.hide()
+        self.boton_cancelar.hide()
+
     def crear_menu(self):
         # File / Nuevo
         nuevo_action = QAction("Nuevo", self)
@@ -260,94 +336,119 @@ class VentanaPrincipal(QMainWindow):
         self.setStyleSheet(estilo)
 
     def cargar_imagen_izquierda(self):
-        opciones = QFileDialog.Options()
-        ruta_archivo, _ = QFileDialog.getOpenFileName(
-            self, "Seleccionar Imagen del Pie Izquierdo", self.last_directory,
-            "Imágenes (*.png *.jpg *.jpeg *.bmp *.svg)", options=opciones
-        )
-        if ruta_archivo:
-            try:
-                self.last_directory = os.path.dirname(ruta_archivo)
-                self.settings.setValue("last_directory", self.last_directory)
-
-                self.left_image_original = cv2.imread(ruta_archivo)
-                if self.left_image_original is None:
-                    raise Exception("No se pudo cargar la imagen.")
-
-                self.left_image_processed = procesar_imagen(
-                    ruta=ruta_archivo, ruta_logotipo=None, recolor=True, image=None, foot_side="left"
-                )
-
-                pixmap = convertir_cv_qt(self.left_image_processed)
-                self.display_left_image(pixmap)
-
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"No se pudo procesar la imagen.\n{str(e)}")
+        self.cargar_imagen("left", "Seleccionar Imagen del Pie Izquierdo")
 
     def cargar_imagen_derecha(self):
+        self.cargar_imagen("right", "Seleccionar Imagen del Pie Derecho")
+
+    def cargar_imagen(self, foot_side, titulo):
         opciones = QFileDialog.Options()
         ruta_archivo, _ = QFileDialog.getOpenFileName(
-            self, "Seleccionar Imagen del Pie Derecho", self.last_directory,
-            "Imágenes (*.png *.jpg *.jpeg *.bmp *.svg)", options=opciones
+            self, titulo, self.last_directory,
+            "Imágenes (*.png *.jpg *.jpeg *.bmp *.tif *.tiff *.svg)", options=opciones
         )
-        if ruta_archivo:
-            try:
-                self.last_directory = os.path.dirname(ruta_archivo)
-                self.settings.setValue("last_directory", self.last_directory)
-
-                self.right_image_original = cv2.imread(ruta_archivo)
-                if self.right_image_original is None:
-                    raise Exception("No se pudo cargar la imagen.")
+        if not ruta_archivo:
+            return
+        self.last_directory = os.path.dirname(ruta_archivo)
+        self.settings.setValue("last_directory", self.last_directory)
 
-                self.right_image_processed = procesar_imagen(
-                    ruta=ruta_archivo, ruta_logotipo=None, recolor=True, image=None, foot_side="right"
-                )
+        def procesar(reportar):
+            reportar("Leyendo imagen", 10)
+            # A JPEG preview comes from a reduced decode and is shown as soon
+            # as it is ready; the full-resolution decode only starts then and
+            # the report waits for it. Other formats are decoded once, in full.
+            reducida = leer_vista_previa(ruta_archivo, LADO_VISTA_PREVIA)
+            if reducida is None:
+                return procesar_vista_previa(leer_imagen(ruta_archivo), foot_side, reportar)
+            resultado = procesar_vista_previa(None, foot_side, reportar, reducida)
+            return (ejecutor().submit(leer_imagen, ruta_archivo),) + resultado[1:]
+
+        # Loading the same foot again supersedes the job still in flight
+        self.trabajos.enviar(
+            foot_side, procesar,
+            lambda resultado: self.mostrar_pie(foot_side, resultado),
+            lambda mensaje: QMessageBox.critical(self, "Error", f"No se pudo procesar la imagen.\n{mensaje}")
+        )
 
-                pixmap = convertir_cv_qt(self.right_image_processed)
-                self.display_right_image(pixmap)
+    def escanear_imagen_izquierda(self):
+        self.escanear_imagen("left")
 
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"No se pudo procesar la imagen.\n{str(e)}")
+    def escanear_imagen_derecha(self):
+        self.escanear_imagen("right")
 
-    def escanear_imagen_izquierda(self):
+    def escanear_imagen(self, foot_side):
         try:
+            # The scanner driver shows its own dialog, so acquisition stays on the GUI thread.
             # Pass autoclicker preference to the scanner
-            self.left_image_original = scan_image(autoclicker=self.autoclicker_enabled)
-            if self.left_image_original is None:
+            imagen_escaneada = scan_image(autoclicker=self.autoclicker_enabled)
+            if imagen_escaneada is None:
                 raise Exception("No se pudo escanear la imagen.")
-
-            # Example rotation
-            self.left_image_original = cv2.rotate(self.left_image_original, cv2.ROTATE_180)
-
-            self.left_image_processed = procesar_imagen(
-                ruta=None, ruta_logotipo=None, recolor=True, image=self.left_image_original, foot_side="left"
-            )
-
-            pixmap = convertir_cv_qt(self.left_image_processed)
-            self.display_left_image(pixmap)
-
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo escanear o procesar la imagen.\n{str(e)}")
+            return
 
-    def escanear_imagen_derecha(self):
-        try:
-            # Pass autoclicker preference to the scanner
-            self.right_image_original = scan_image(autoclicker=self.autoclicker_enabled)
-            if self.right_image_original is None:
-                raise Exception("No se pudo escanear la imagen.")
-
+        def procesar(reportar):
             # Example rotation
-            self.right_image_original = cv2.rotate(self.right_image_original, cv2.ROTATE_180)
+            imagen_original = cv2.rotate(imagen_escaneada, cv2.ROTATE_180)
+            return procesar_vista_previa(imagen_original, foot_side, reportar)
 
-            self.right_image_processed = procesar_imagen(
-                ruta=None, ruta_logotipo=None, recolor=True, image=self.right_image_original, foot_side="right"
-            )
+        self.trabajos.enviar(
+            foot_side, procesar,
+            lambda resultado: self.mostrar_pie(foot_side, resultado),
+            lambda mensaje: QMessageBox.critical(self, "Error", f"No se pudo escanear o procesar la imagen.\n{mensaje}")
+        )
 
-            pixmap = convertir_cv_qt(self.right_image_processed)
+    def mostrar_pie(self, foot_side, resultado):
+        # Keep the original and its preview in sync; both arrive together from the worker.
+        # The reduced copy fills the screen; full resolution waits for the report.
+        # For JPEGs the original is a future still decoding (see resolver_original).
+        imagen_original, vista_previa, imagen_procesada = resultado
+        pixmap = convertir_cv_qt(imagen_procesada, lado_maximo=self.lado_maximo_pantalla())
+        if foot_side == "left":
+            self.left_image_original = imagen_original
+            self.left_preview = vista_previa
+            self.left_segmentation = None
+            self.left_image_processed = imagen_procesada
+            self.display_left_image(pixmap)
+        else:
+            self.right_image_original = imagen_original
+            self.right_preview = vista_previa
+            self.right_segmentation = None
+            self.right_image_processed = imagen_procesada
             self.display_right_image(pixmap)
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo escanear o procesar la imagen.\n{str(e)}")
+    def mostrar_progreso(self, clave, etapa, porcentaje):
+        self.statusBar().showMessage(f"{NOMBRES_TRABAJOS.get(clave, clave)}: {etapa}")
+        self.barra_progreso.setValue(porcentaje)
+        self.barra_progreso.show()
+        self.boton_cancelar.show()
+
+    def ocultar_progreso(self):
+        self.statusBar().clearMessage()
+        self.barra_progreso.hide()
+        self.boton_cancelar.hide()
+
+    def lado_maximo_pantalla(self):
+        """Lado mayor de la pantalla en píxeles físicos: más resolución no se ve en las etiquetas."""
+        pantalla = self.windowHandle().screen() if self.windowHandle() else QApplication.primaryScreen()
+        if pantalla is None:
+            return None
+        tamano = pantalla.size() * pantalla.devicePixelRatio()
+        return max(tamano.width(), tamano.height())
+
+    def mostrar_fondos(self):
+        """Pone los fondos de pie izquierdo y derecho (compartidos por asset_registry) en las etiquetas."""
+        for label, recurso, texto in (
+            (self.label_imagen_izquierda, 'bg_left.png', "Pie Izquierdo"),
+            (self.label_imagen_derecha, 'bg_right.png', "Pie Derecho"),
+        ):
+            fondo = asset_registry.pixmap(recurso)
+            if fondo is not None:
+                label.setPixmap(fondo)
+            else:
+                label.setText(texto)
+                label.setFont(QFont(self.font_family, 16))
+                label.setStyleSheet("color: #1d3557;")
 
     def display_left_image(self, pixmap):
         self.label_imagen_izquierda.setPixmap(pixmap)
@@ -369,125 +470,205 @@ class VentanaPrincipal(QMainWindow):
             'order_number': '',
             'observaciones': ''
         }
+        self.pedir_datos_reporte(patient_info)
+
+    def pedir_datos_reporte(self, patient_info, preparado=None):
+        """Pide los datos del paciente y genera la vista previa del reporte.
 
-        while True:
-            dialog = PatientInfoDialog(
+        `preparado` son las imágenes ya codificadas de una vista previa
+        anterior; al corregir los datos no se vuelven a procesar los pies.
+        """
+        dialog = PatientInfoDialog(
+            paciente=patient_info['paciente'],
+            telefono=patient_info['telefono'],
+            longitud_pie=patient_info['longitud_pie'],
+            material=patient_info['material'],
+            entrega_date=patient_info['entrega_date'],
+            fecha_escaneo=patient_info['fecha_escaneo'],
+            sucursal=self.default_location,
+            taller=patient_info['taller'],
+            order_number=patient_info['order_number'],
+            observaciones=patient_info['observaciones']
+        )
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        patient_info.update({
+            'paciente': dialog.paciente_edit.text(),
+            'telefono': dialog.telefono_edit.text(),
+            'longitud_pie': dialog.longitud_edit.text(),
+            'material': dialog.get_material(),
+            'entrega_date': dialog.get_fecha_entrega().strftime("%d/%m/%Y"),
+            'fecha_escaneo': dialog.fecha_escaneo_edit.date().toString("dd/MM/yyyy"),
+            'sucursal': dialog.sucursal_edit.currentText(),
+            'taller': dialog.taller_edit.currentText(),
+            'order_number': dialog.order_number_edit.text(),
+            'observaciones': dialog.observaciones_edit.toPlainText()
+        })
+        self.iniciar_reporte(patient_info, preparado)
+
+    def iniciar_reporte(self, patient_info, preparado=None):
+        # Snapshot the current feet; the job must not read window state from its thread
+        left_original = self.left_image_original
+        right_original = self.right_image_original
+        left_segmentation = self.left_segmentation
+        right_segmentation = self.right_segmentation
+        last_pdf_directory = self.last_pdf_directory
+        if preparado is not None and not (
+            preparado['originales'][0] is left_original and preparado['originales'][1] is right_original
+        ):
+            preparado = None
+
+        def preparar_pie(foot_side, original, segmentacion, reportar):
+            # Runs in the shared executor, one call per foot
+            nombre = "izquierdo" if foot_side == "left" else "derecho"
+            if segmentacion is None:
+                reportar(f"Segmentando pie {nombre}", 20)
+                segmentacion = result_cache.segmentar(original, foot_side)
+            reportar(f"Renderizando pie {nombre}", 50)
+            return segmentacion, (original, segmentacion.render_piel(), segmentacion.render_mapa_calor())
+
+        def preparar(reportar):
+            from pdf_report import codificar_imagenes_reporte
+            blank_image = np.ones((600,600,3), dtype=np.uint8) * 255
+
+            # Determine images to use. If an image is missing, use a blank image.
+            # Present feet are segmented and rendered in parallel.
+            segmentaciones = {}
+            imagenes = {}
+            pendientes = {}
+            for foot_side, original, segmentacion in (
+                ("left", left_original, left_segmentation),
+                ("right", right_original, right_segmentation),
+            ):
+                if original is None:
+                    original = blank_image.copy()
+                    imagenes[foot_side] = (original, original.copy(), original.copy())
+                else:
+                    # Waited for here, not in the shared executor the decode may still be queued on
+                    reportar("Leyendo imagen original", 10)
+                    original = resolver_original(original)
+                    pendientes[foot_side] = ejecutor().submit(
+                        preparar_pie, foot_side, original, segmentacion, reportar
+                    )
+            for foot_side, futuro in pendientes.items():
+                segmentaciones[foot_side], imagenes[foot_side] = futuro.result()
+
+            # Compute flag: if no feet images were uploaded at all.
+            no_feet = (left_original is None and right_original is None)
+            codificadas = None
+            if not no_feet:
+                reportar("Codificando imágenes", 60)
+                codificadas = codificar_imagenes_reporte(
+                    imagenes["left"][2], imagenes["right"][2], imagenes["left"][0], imagenes["right"][0]
+                )
+            return {
+                'originales': (left_original, right_original),
+                'imagenes': imagenes,
+                'no_feet': no_feet,
+                'codificadas': codificadas,
+            }, segmentaciones
+
+        def generar(reportar):
+            # ReportLab loads on the first report, in this worker thread, not at startup
+            from pdf_report import generate_pdf_report
+            # Images and page are timed apart: after editing only the patient
+            # fields the images are reused and only the page is rebuilt.
+            tiempos_imagenes = TiemposEjecucion()
+            with tiempos_imagenes:
+                datos, segmentaciones = (preparado, {}) if preparado is not None else preparar(reportar)
+            left_original_image, left_skin_image, left_heatmap_image = datos['imagenes']["left"]
+            right_original_image, right_skin_image, right_heatmap_image = datos['imagenes']["right"]
+
+            tiempos = TiemposEjecucion()
+            with tiempos:
+                # Render into memory; nothing is written until the preview is accepted
+                reportar("Generando vista previa", 80)
+                pdf = BytesIO()
+                generate_pdf_report(
+                    paciente=patient_info['paciente'],
+                    telefono=patient_info['telefono'],
+                    order_number=patient_info['order_number'],
+                    sucursal=patient_info['sucursal'],
+                    taller=patient_info['taller'],
+                    longitud_pie=patient_info['longitud_pie'],
+                    material=patient_info['material'],
+                    observaciones=patient_info['observaciones'],
+                    left_skin_image=left_skin_image,
+                    right_skin_image=right_skin_image,
+                    left_heatmap_image=left_heatmap_image,
+                    right_heatmap_image=right_heatmap_image,
+                    left_original_image=left_original_image,
+                    right_original_image=right_original_image,
+                    last_pdf_directory=last_pdf_directory,
+                    fecha_escaneo=patient_info['fecha_escaneo'],
+                    fecha_entrega=patient_info['entrega_date'],
+                    no_feet_report=datos['no_feet'],
+                    ruta_archivo=pdf,
+                    codificadas=datos['codificadas']
+                )
+            reutilizadas = " (reutilizadas)" if preparado is not None else ""
+            print(f"Reporte PDF en memoria: imágenes{reutilizadas} {tiempos_imagenes}; página {tiempos}")
+            return datos, pdf.getvalue(), segmentaciones, tiempos_imagenes, tiempos
+
+        def terminado(resultado):
+            datos, pdf, segmentaciones, tiempos_imagenes, tiempos = resultado
+            # Keep the full-resolution segmentations unless the foot changed meanwhile
+            if "left" in segmentaciones and self.left_image_original is left_original:
+                self.left_segmentation = segmentaciones["left"]
+            if "right" in segmentaciones and self.right_image_original is right_original:
+                self.right_segmentation = segmentaciones["right"]
+
+            self.statusBar().showMessage(
+                f"Vista previa del reporte lista: página en {tiempos.real:.2f} s, "
+                f"imágenes en {tiempos_imagenes.real:.2f} s", 10000
+            )
+            miniaturas = [c[0] if c is not None else None for c in datos['codificadas'] or []]
+            confirm_dialog = ConfirmationDialog(
                 paciente=patient_info['paciente'],
                 telefono=patient_info['telefono'],
                 longitud_pie=patient_info['longitud_pie'],
                 material=patient_info['material'],
                 entrega_date=patient_info['entrega_date'],
                 fecha_escaneo=patient_info['fecha_escaneo'],
-                sucursal=self.default_location,
+                sucursal=patient_info['sucursal'],
                 taller=patient_info['taller'],
                 order_number=patient_info['order_number'],
-                observaciones=patient_info['observaciones']
+                observaciones=patient_info['observaciones'],
+                miniaturas=miniaturas
             )
-            if dialog.exec_() == QDialog.Accepted:
-                paciente = dialog.paciente_edit.text()
-                telefono = dialog.telefono_edit.text()
-                longitud_pie = dialog.longitud_edit.text()
-                material = dialog.get_material()
-                entrega_date = dialog.get_fecha_entrega().strftime("%d/%m/%Y")
-                fecha_escaneo = dialog.fecha_escaneo_edit.date().toString("dd/MM/yyyy")
-                sucursal = dialog.sucursal_edit.currentText()
-                taller = dialog.taller_edit.currentText()
-                order_number = dialog.order_number_edit.text()
-                observaciones = dialog.observaciones_edit.toPlainText()
-
-                patient_info.update({
-                    'paciente': paciente,
-                    'telefono': telefono,
-                    'longitud_pie': longitud_pie,
-                    'material': material,
-                    'entrega_date': entrega_date,
-                    'fecha_escaneo': fecha_escaneo,
-                    'sucursal': sucursal,
-                    'taller': taller,
-                    'order_number': order_number,
-                    'observaciones': observaciones
-                })
-
-                confirm_dialog = ConfirmationDialog(
-                    paciente=paciente,
-                    telefono=telefono,
-                    longitud_pie=longitud_pie,
-                    material=material,
-                    entrega_date=entrega_date,
-                    fecha_escaneo=fecha_escaneo,
-                    sucursal=sucursal,
-                    taller=taller,
-                    order_number=order_number,
-                    observaciones=observaciones
-                )
-                if confirm_dialog.exec_() == QDialog.Accepted:
-                    ruta_logotipo = os.path.join('resources', 'logo_square.png')
-                    blank_image = np.ones((600,600,3), dtype=np.uint8) * 255
-
-                    # Determine images to use. If an image is missing, use a blank image.
-                    if self.left_image_original is None:
-                        left_original = blank_image.copy()
-                        left_skin_image = left_original.copy()
-                        left_heatmap_image = left_original.copy()
-                    else:
-                        left_original = self.left_image_original
-                        left_skin_image = procesar_imagen(
-                            ruta=None, ruta_logotipo=ruta_logotipo, recolor=False, image=self.left_image_original, foot_side="left"
-                        )
-                        left_heatmap_image = procesar_imagen(
-                            ruta=None, ruta_logotipo=ruta_logotipo, recolor=True, image=self.left_image_original, foot_side="left"
-                        )
-
-                    if self.right_image_original is None:
-                        right_original = blank_image.copy()
-                        right_skin_image = right_original.copy()
-                        right_heatmap_image = right_original.copy()
-                    else:
-                        right_original = self.right_image_original
-                        right_skin_image = procesar_imagen(
-                            ruta=None, ruta_logotipo=ruta_logotipo, recolor=False, image=self.right_image_original, foot_side="right"
-                        )
-                        right_heatmap_image = procesar_imagen(
-                            ruta=None, ruta_logotipo=ruta_logotipo, recolor=True, image=self.right_image_original, foot_side="right"
-                        )
-
-                    # Compute flag: if no feet images were uploaded at all.
-                    no_feet = (self.left_image_original is None and self.right_image_original is None)
-
-                    try:
-                        ruta_pdf = generate_pdf_report(
-                            paciente=paciente,
-                            telefono=telefono,
-                            order_number=order_number,
-                            sucursal=sucursal,
-                            taller=taller,
-                            longitud_pie=longitud_pie,
-                            material=material,
-                            observaciones=observaciones,
-                            left_skin_image=left_skin_image,
-                            right_skin_image=right_skin_image,
-                            left_heatmap_image=left_heatmap_image,
-                            right_heatmap_image=right_heatmap_image,
-                            left_original_image=left_original,
-                            right_original_image=right_original,
-                            last_pdf_directory=self.last_pdf_directory,
-                            fecha_escaneo=fecha_escaneo,
-                            fecha_entrega=entrega_date,
-                            no_feet_report=no_feet
-                        )
-                        QMessageBox.information(self, "Éxito", "Reporte PDF generado exitosamente.")
-
-                        if ruta_pdf:
-                            self.last_pdf_directory = os.path.dirname(ruta_pdf)
-                            self.settings.setValue("last_pdf_directory", self.last_pdf_directory)
-
-                    except Exception as e:
-                        QMessageBox.critical(self, "Error", f"No se pudo generar el reporte PDF.\n{str(e)}")
-                    break
-                else:
-                    continue
+            if confirm_dialog.exec_() == QDialog.Accepted:
+                self.guardar_reporte(patient_info, datos, pdf)
             else:
-                break
+                # Back to the form; the encoded images are reused for the next preview
+                self.pedir_datos_reporte(patient_info, datos)
+
+        self.trabajos.enviar(
+            "reporte", generar, terminado,
+            lambda mensaje: QMessageBox.critical(self, "Error", f"No se pudo generar el reporte PDF.\n{mensaje}")
+        )
+
+    def guardar_reporte(self, patient_info, datos, pdf):
+        """Escribe en disco el PDF `pdf` (bytes) de una vista previa aceptada."""
+        from pdf_report import solicitar_ruta_pdf
+        try:
+            ruta_archivo = solicitar_ruta_pdf(
+                patient_info['paciente'], patient_info['order_number'], self.last_pdf_directory, self
+            )
+            with open(ruta_archivo, 'wb') as archivo:
+                archivo.write(pdf)
+            # Written by a background thread; missing feet are placeholders, never exported
+            scan_export.exportar_originales(
+                ruta_archivo, patient_info['material'],
+                datos['imagenes']["left"][0], datos['imagenes']["right"][0],
+                left_is_placeholder=datos['originales'][0] is None,
+                right_is_placeholder=datos['originales'][1] is None
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo generar el reporte PDF.\n{str(e)}")
+            return
+        QMessageBox.information(self, "Éxito", "Reporte PDF generado exitosamente.")
+        self.last_pdf_directory = os.path.dirname(ruta_archivo)
+        self.settings.setValue("last_pdf_directory", self.last_pdf_directory)
 
     def show_help(self):
         help_text = (
@@ -527,6 +708,9 @@ class VentanaPrincipal(QMainWindow):
         self.settings.setValue("autoclicker_enabled", self.autoclicker_enabled)
 
     def closeEvent(self, event):
+        self.trabajos.cancelar_todos()
+        self.trabajos.esperar()
+        scan_export.esperar()
         self.save_preferences()
         event.accept()
 
@@ -537,28 +721,17 @@ class VentanaPrincipal(QMainWindow):
             super().keyPressEvent(event)
 
     def nuevo(self):
+        self.trabajos.cancelar_todos()
         self.left_image_original = None
         self.left_image_processed = None
+        self.left_segmentation = None
+        self.left_preview = None
         self.right_image_original = None
         self.right_image_processed = None
+        self.right_segmentation = None
+        self.right_preview = None
 
-        bg_left_path = os.path.join('resources', 'bg_left.png')
-        if os.path.exists(bg_left_path):
-            pixmap_bg_left = QPixmap(bg_left_path)
-            self.label_imagen_izquierda.setPixmap(pixmap_bg_left)
-        else:
-            self.label_imagen_izquierda.setText("Pie Izquierdo")
-            self.label_imagen_izquierda.setFont(QFont(self.font_family, 16))
-            self.label_imagen_izquierda.setStyleSheet("color: #1d3557;")
-
-        bg_right_path = os.path.join('resources', 'bg_right.png')
-        if os.path.exists(bg_right_path):
-            pixmap_bg_right = QPixmap(bg_right_path)
-            self.label_imagen_derecha.setPixmap(pixmap_bg_right)
-        else:
-            self.label_imagen_derecha.setText("Pie Derecho")
-            self.label_imagen_derecha.setFont(QFont(self.font_family, 16))
-            self.label_imagen_derecha.setStyleSheet("color: #1d3557;")
+        self.mostrar_fondos()
 
         self.boton_generar_reporte.setEnabled(True)
 
@@ -567,6 +740,7 @@ def main():
     import sys
     app = QApplication(sys.argv)
     ventana = VentanaPrincipal()
+    ventana.showMaximized()
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,133 @@
+# asset_registry.py
+"""Registro central de los recursos de la aplicación (fondos, iconos, logos y fuentes).
+
+Las rutas se resuelven respecto al paquete, no al directorio de trabajo, y
+cada recurso se carga una sola vez: los QPixmap, QIcon y la familia de la
+fuente se comparten entre quienes los piden (Qt comparte los datos de los
+QPixmap implícitamente, así que nadie los modifica). Opcionalmente los
+recursos pueden venir de un único archivo empaquetado (resources.zip o
+ORTOFLEX_RECURSOS): Qt los carga desde memoria y quien necesita una ruta
+(ReportLab, OpenCV) recibe una copia extraída una vez a la caché.
+
+Este módulo sólo importa PyQt5 al pedir un QPixmap, un QIcon o la fuente,
+así que los módulos sin interfaz pueden usarlo para las rutas.
+"""
+import functools
+import os
+import sys
+import threading
+import zipfile
+
+DIRECTORIO_PAQUETE = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_RECURSOS = os.path.join(DIRECTORIO_PAQUETE, 'resources')
+PAQUETE_RECURSOS = os.environ.get("ORTOFLEX_RECURSOS", os.path.join(DIRECTORIO_PAQUETE, 'resources.zip'))
+DIRECTORIO_EXTRAIDOS = os.path.join(
+    os.environ.get("ORTOFLEX_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "orto_flex")),
+    "recursos"
+)
+
+_cerrojo = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _paquete():
+    # Name -> bytes of every file in the bundle, read once; empty without a bundle
+    if not os.path.exists(PAQUETE_RECURSOS):
+        return {}
+    try:
+        with zipfile.ZipFile(PAQUETE_RECURSOS) as paquete:
+            return {os.path.basename(nombre): paquete.read(nombre)
+                    for nombre in paquete.namelist() if not nombre.endswith("/")}
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"No se pudo leer el paquete de recursos {PAQUETE_RECURSOS}: {e}")
+        return {}
+
+
+def datos_recurso(nombre):
+    """Bytes del recurso `nombre`, del paquete si lo hay o de resources/; None si no existe."""
+    datos = _paquete().get(nombre)
+    if datos is not None:
+        return datos
+    return _leer(os.path.join(DIRECTORIO_RECURSOS, nombre))
+
+
+def _leer(ruta):
+    try:
+        with open(ruta, "rb") as archivo:
+            return archivo.read()
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def ruta_recurso(nombre):
+    """Ruta absoluta del recurso `nombre` (exista o no) para quien lee archivos.
+
+    Con paquete, sus recursos se extraen una vez y se devuelve la copia.
+    """
+    datos = _paquete().get(nombre)
+    if datos is None:
+        return os.path.join(DIRECTORIO_RECURSOS, nombre)
+    extraido = os.path.join(DIRECTORIO_EXTRAIDOS, nombre)
+    with _cerrojo:
+        if _leer(extraido) != datos:
+            os.makedirs(DIRECTORIO_EXTRAIDOS, exist_ok=True)
+            temporal = f"{extraido}.{os.getpid()}.tmp"
+            with open(temporal, "wb") as archivo:
+                archivo.write(datos)
+            os.replace(temporal, extraido)
+    return extraido
+
+
+@functools.lru_cache(maxsize=None)
+def pixmap(nombre):
+    """QPixmap compartido del recurso `nombre`, o None si no existe o no se puede leer."""
+    from PyQt5.QtGui import QPixmap
+    datos = datos_recurso(nombre)
+    imagen = QPixmap()
+    if datos is None or not imagen.loadFromData(datos):
+        print(f"Recurso no encontrado o dañado: {nombre}")
+        return None
+    return imagen
+
+
+@functools.lru_cache(maxsize=None)
+def icono(nombre):
+    """QIcon compartido del recurso `nombre`, o None si no existe."""
+    from PyQt5.QtGui import QIcon
+    # From the file, so every size stored in an .ico is kept
+    ruta = ruta_recurso(nombre)
+    if not os.path.exists(ruta):
+        print(f"Recurso no encontrado: {nombre}")
+        return None
+    return QIcon(ruta)
+
+
+@functools.lru_cache(maxsize=None)
+def familia_fuente(nombre='Roboto-Regular.ttf', predeterminada="Arial"):
+    """Registra la fuente `nombre` en Qt una sola vez y devuelve su familia (o `predeterminada`)."""
+    from PyQt5.QtCore import QByteArray
+    from PyQt5.QtGui import QFontDatabase
+    datos = datos_recurso(nombre)
+    if datos is None:
+        print(f"{nombre} no se encontró en los recursos.")
+        return predeterminada
+    font_id = QFontDatabase.addApplicationFontFromData(QByteArray(datos))
+    if font_id == -1:
+        print(f"No se pudo cargar la fuente {nombre}.")
+        return predeterminada
+    return QFontDatabase.applicationFontFamilies(font_id)[0]
+
+
+def empaquetar(destino=PAQUETE_RECURSOS):
+    """Escribe todos los archivos de resources/ en el paquete `destino`."""
+    with zipfile.ZipFile(destino, "w", zipfile.ZIP_STORED) as paquete:
+        for nombre in sorted(os.listdir(DIRECTORIO_RECURSOS)):
+            ruta = os.path.join(DIRECTORIO_RECURSOS, nombre)
+            if os.path.isfile(ruta):
+                paquete.write(ruta, nombre)
+    return destino
+
+
+if __name__ == "__main__":
+    print(empaquetar(*sys.argv[1:2]))
@@ -0,0 +1,174 @@
+# batch.py
+"""Procesamiento por lotes de escaneos, sin interfaz gráfica.
+
+Uso:
+    python batch.py <carpeta_o_imagenes...> --salida <carpeta> [--pie left|right] [--procesos N ...]
+    python batch.py --manifiesto escaneos.csv --salida <carpeta>
+
+Por cada escaneo escribe <nombre>-<pie>-piel.png, <nombre>-<pie>-mapa.png y
+<nombre>-<pie>-lineas.json. Si los escaneos vienen de varias carpetas, las
+salidas conservan su subcarpeta relativa a la carpeta común de todos (así
+a/pie.jpg y b/pie.jpg no se pisan); dos escaneos que aún darían la misma
+salida, como pie.jpg y pie.png, se rechazan antes de empezar.
+
+Con varios valores en --procesos repite el lote con cada tamaño de pool y
+reporta imágenes por segundo para comparar.
+
+Este módulo no importa PyQt5, así que corre en servidores sin pantalla.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from image_io import leer_imagen, listar_imagenes
+from image_processing import segmentar_imagen
+
+LADOS = ("left", "right")
+
+
+def leer_manifiesto(ruta, columnas_ruta=("ruta",)):
+    """Filas de un manifiesto CSV (con encabezado) o JSON (lista de objetos o de rutas).
+
+    Las rutas relativas de las `columnas_ruta` se resuelven desde la carpeta del manifiesto.
+    """
+    base = os.path.dirname(os.path.abspath(ruta))
+    if ruta.lower().endswith(".json"):
+        with open(ruta, encoding="utf-8") as archivo:
+            filas = json.load(archivo)
+        filas = [fila if isinstance(fila, dict) else {'ruta': fila} for fila in filas]
+    else:
+        with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+            filas = list(csv.DictReader(archivo))
+    for fila in filas:
+        for columna in columnas_ruta:
+            if fila.get(columna):
+                fila[columna] = os.path.join(base, fila[columna])
+    return filas
+
+
+def bases_salida(escaneos, directorio_salida):
+    """Prefijo de salida (<carpeta>/<nombre>-<pie>) de cada (ruta, pie) de `escaneos`.
+
+    Las rutas se toman relativas a la carpeta común de todas, así que los
+    escaneos de una sola carpeta quedan directamente en `directorio_salida`.
+    Lanza ValueError si dos escaneos darían el mismo prefijo.
+    """
+    carpetas = [os.path.dirname(os.path.abspath(ruta)) for ruta, _ in escaneos]
+    try:
+        comun = os.path.commonpath(carpetas) if carpetas else ""
+    except ValueError:
+        # Paths on different drives have no common folder; keep only the names
+        comun = None
+    bases, origenes = [], {}
+    for (ruta, foot_side), carpeta in zip(escaneos, carpetas):
+        relativa = os.path.relpath(carpeta, comun) if comun is not None else os.curdir
+        nombre = f"{os.path.splitext(os.path.basename(ruta))[0]}-{foot_side}"
+        base = os.path.normpath(os.path.join(directorio_salida, relativa, nombre))
+        # Compared without case so names that differ only in case do not clash on Windows or macOS
+        anterior = origenes.setdefault(base.casefold(), ruta)
+        if anterior != ruta:
+            raise ValueError(f"{anterior} y {ruta} se escribirían en {base}-*")
+        bases.append(base)
+    return bases
+
+
+def procesar_escaneo(tarea):
+    """Segmenta un escaneo y escribe sus salidas con el prefijo `base`; se ejecuta en un proceso del pool."""
+    ruta, foot_side, base = tarea
+    inicio = time.perf_counter()
+    try:
+        imagen = leer_imagen(ruta)
+        # No workspace: its buffers would stay reserved in every pool process
+        # between scans and lower the peak by less than they hold (see workspace.py)
+        segmentacion = segmentar_imagen(image=imagen, foot_side=foot_side)
+
+        for sufijo, vista in (
+            ("piel", segmentacion.render_piel()),
+            ("mapa", segmentacion.render_mapa_calor()),
+        ):
+            if not cv2.imwrite(f"{base}-{sufijo}.png", vista):
+                raise OSError(f"No se pudo escribir {base}-{sufijo}.png")
+        with open(f"{base}-lineas.json", "w", encoding="utf-8") as archivo:
+            json.dump({
+                'imagen': ruta,
+                'foot_side': foot_side,
+                'forma': list(segmentacion.shape),
+                'lineas': segmentacion.lineas,
+            }, archivo, indent=2)
+        error = None
+    except Exception as e:
+        error = str(e)
+    return {'ruta': ruta, 'segundos': time.perf_counter() - inicio, 'error': error}
+
+
+def inicializar_proceso():
+    # One OpenCV thread per process; the pool already spreads the work over the cores
+    cv2.setNumThreads(1)
+
+
+def procesar_lote(tareas, procesos):
+    """Procesa `tareas` con `procesos` procesos; devuelve (resultados, segundos reales)."""
+    inicio = time.perf_counter()
+    if procesos <= 1:
+        resultados = [procesar_escaneo(tarea) for tarea in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=inicializar_proceso) as pool:
+            resultados = list(pool.map(procesar_escaneo, tareas, chunksize=1))
+    return resultados, time.perf_counter() - inicio
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Procesamiento por lotes de escaneos de Orto-Flex Scanner.")
+    parser.add_argument("rutas", nargs="*", help="Imágenes o carpetas de escaneos.")
+    parser.add_argument("--manifiesto", help="CSV o JSON con columnas 'ruta' y opcionalmente 'pie'.")
+    parser.add_argument("--salida", required=True, help="Carpeta donde escribir los resultados.")
+    parser.add_argument("--pie", default="right", choices=LADOS, help="Pie por omisión.")
+    parser.add_argument("--procesos", type=int, nargs="+", default=[os.cpu_count() or 1],
+                        help="Tamaño del pool; varios valores repiten el lote para comparar.")
+    args = parser.parse_args(argv)
+
+    escaneos = [(ruta, args.pie) for ruta in listar_imagenes(args.rutas)]
+    if args.manifiesto:
+        for fila in leer_manifiesto(args.manifiesto):
+            foot_side = (fila.get('pie') or args.pie).lower()
+            if foot_side not in LADOS:
+                parser.error(f"Pie desconocido en el manifiesto: {foot_side}")
+            escaneos.append((fila['ruta'], foot_side))
+    # The same scan listed twice (a folder and a file in it, say) is processed once
+    unicos = {}
+    for ruta, foot_side in escaneos:
+        unicos.setdefault((os.path.abspath(ruta), foot_side), (ruta, foot_side))
+    escaneos = list(unicos.values())
+    if not escaneos:
+        parser.error("No hay escaneos que procesar.")
+    try:
+        bases = bases_salida(escaneos, args.salida)
+    except ValueError as e:
+        parser.error(str(e))
+    for base in bases:
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+    tareas = [(ruta, foot_side, base) for (ruta, foot_side), base in zip(escaneos, bases)]
+
+    fallidos = []
+    print(f"{'procesos':>8} {'imágenes':>9} {'segundos':>9} {'img/s':>8} {'img/s/proceso':>14}")
+    for procesos in args.procesos:
+        procesos = max(1, procesos)
+        resultados, segundos = procesar_lote(tareas, procesos)
+        fallidos = [r for r in resultados if r['error']]
+        procesadas = len(tareas) - len(fallidos)
+        por_segundo = procesadas / segundos if segundos > 0 else 0.0
+        print(f"{procesos:>8} {procesadas:>9} {segundos:>9.2f} {por_segundo:>8.2f} "
+              f"{por_segundo / procesos:>14.2f}")
+    for resultado in fallidos:
+        print(f"Error en {resultado['ruta']}: {resultado['error']}", file=sys.stderr)
+    return 1 if fallidos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# benchmark.py
+"""Mediciones de rendimiento sobre un conjunto de imágenes de referencia.
+
+Uso:
+    python benchmark.py cierre <carpeta_o_imagenes...>
+    python benchmark.py memoria <carpeta_o_imagenes...>
+    python benchmark.py reporte <carpeta_o_imagenes...> [--dpi 0 150 200 300]
+"""
+import argparse
+import io
+import os
+import time
+import tracemalloc
+
+import cv2
+
+import shape_cache
+from image_io import listar_imagenes
+from image_processing import segmentar_imagen
+from morphology import METODOS_CIERRE, iou_mascaras
+from workspace import EspacioTrabajo
+
+
+def medir_cierre(rutas, foot_side="right", repeticiones=3):
+    """Compara cada motor de cierre con la referencia: tiempo e IoU de la máscara final."""
+    resultados = []
+    for ruta in rutas:
+        imagen = cv2.imread(ruta)
+        if imagen is None:
+            print(f"No se pudo cargar la imagen: {ruta}")
+            continue
+        mascaras = {}
+        tiempos = {}
+        for metodo in METODOS_CIERRE:
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                segmentacion = segmentar_imagen(image=imagen, foot_side=foot_side, metodo_cierre=metodo)
+            tiempos[metodo] = (time.perf_counter() - inicio) / repeticiones
+            mascaras[metodo] = segmentacion.mascara
+        for metodo in METODOS_CIERRE:
+            resultados.append({
+                'imagen': os.path.basename(ruta),
+                'metodo': metodo,
+                'segundos': tiempos[metodo],
+                'iou': iou_mascaras(mascaras[metodo], mascaras["referencia"]),
+            })
+    return resultados
+
+
+def _pico_memoria(funcion):
+    tracemalloc.start()
+    try:
+        funcion()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def medir_memoria(rutas, foot_side="right"):
+    """Pico de memoria (tracemalloc) al segmentar y renderizar ambas vistas, en MB por megapíxel.
+
+    Se mide sin espacio de trabajo y con un EspacioTrabajo ya reservado por
+    una llamada previa; también se reporta lo que ese espacio retiene.
+    """
+    resultados = []
+    for ruta in rutas:
+        imagen = cv2.imread(ruta)
+        if imagen is None:
+            print(f"No se pudo cargar la imagen: {ruta}")
+            continue
+        megapixeles = imagen.shape[0] * imagen.shape[1] / 1e6
+
+        def procesar(espacio=None):
+            segmentacion = segmentar_imagen(image=imagen, foot_side=foot_side, espacio=espacio)
+            segmentacion.render_mapa_calor(espacio=espacio)
+            segmentacion.render_piel(espacio=espacio)
+
+        espacio = EspacioTrabajo(imagen.shape)
+        procesar(espacio)
+        resultados.append({
+            'imagen': os.path.basename(ruta),
+            'megapixeles': megapixeles,
+            'sin_espacio': _pico_memoria(procesar) / 1e6 / megapixeles,
+            'con_espacio': _pico_memoria(lambda: procesar(espacio)) / 1e6 / megapixeles,
+            'retenido': espacio.bytes_reservados / 1e6 / megapixeles,
+        })
+    return resultados
+
+
+def medir_reporte(rutas, dpis, repeticiones=3):
+    """Tamaño y tiempo de un reporte con la imagen en ambos pies, para cada dpi (None = resolución completa).
+
+    `segundos_texto` es el tiempo de volver a generarlo cambiando sólo los
+    datos del paciente, con las imágenes ya codificadas.
+    """
+    # Imported here so the other commands do not need ReportLab
+    from pdf_report import codificar_imagenes_reporte, generate_pdf_report
+
+    resultados = []
+    for ruta in rutas:
+        imagen = cv2.imread(ruta)
+        if imagen is None:
+            print(f"No se pudo cargar la imagen: {ruta}")
+            continue
+        segmentacion = segmentar_imagen(image=imagen)
+        piel = segmentacion.render_piel()
+        mapa = segmentacion.render_mapa_calor()
+
+        def generar(dpi, paciente, codificadas=None):
+            destino = io.BytesIO()
+            generate_pdf_report(
+                paciente=paciente, telefono="", order_number="1", sucursal="", taller="",
+                longitud_pie="", material="", observaciones="",
+                left_skin_image=piel, right_skin_image=piel,
+                left_heatmap_image=mapa, right_heatmap_image=mapa,
+                left_original_image=imagen, right_original_image=imagen,
+                last_pdf_directory="", fecha_escaneo="01/01/2025", fecha_entrega="01/01/2025",
+                ruta_archivo=destino, dpi=dpi, codificadas=codificadas,
+            )
+            return destino.getbuffer().nbytes
+
+        for dpi in dpis:
+            segundos = segundos_texto = 0.0
+            # Encoded once, as the app keeps them between previews of the same feet
+            codificadas = codificar_imagenes_reporte(mapa, mapa, imagen, imagen, dpi=dpi)
+            for repeticion in range(repeticiones):
+                inicio = time.perf_counter()
+                tamano = generar(dpi, "Paciente")
+                segundos += time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                generar(dpi, f"Paciente {repeticion}", codificadas)
+                segundos_texto += time.perf_counter() - inicio
+            resultados.append({
+                'imagen': os.path.basename(ruta),
+                'dpi': dpi,
+                'segundos': segundos / repeticiones,
+                'segundos_texto': segundos_texto / repeticiones,
+                'bytes': tamano,
+            })
+    return resultados
+
+
+def imprimir_caches():
+    for nombre, info in shape_cache.estadisticas().items():
+        print(f"caché {nombre}: {info['aciertos']} aciertos, {info['fallos']} fallos, {info['tamano']} entradas")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mediciones de rendimiento de Orto-Flex Scanner.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    cierre = subparsers.add_parser("cierre", help="Tiempo e IoU de los motores de cierre de máscara.")
+    cierre.add_argument("rutas", nargs="+", help="Imágenes o carpetas de referencia.")
+    cierre.add_argument("--pie", default="right", choices=["left", "right"])
+    cierre.add_argument("--repeticiones", type=int, default=3)
+
+    memoria = subparsers.add_parser("memoria", help="Pico de memoria por megapíxel con y sin espacio de trabajo.")
+    memoria.add_argument("rutas", nargs="+", help="Imágenes o carpetas de referencia.")
+    memoria.add_argument("--pie", default="right", choices=["left", "right"])
+
+    reporte = subparsers.add_parser("reporte", help="Tamaño y tiempo del PDF según los dpi de las imágenes.")
+    reporte.add_argument("rutas", nargs="+", help="Imágenes o carpetas de referencia.")
+    reporte.add_argument("--dpi", type=int, nargs="+", default=[0, 150, 200, 300],
+                         help="Resoluciones a comparar; 0 es resolución completa.")
+    reporte.add_argument("--repeticiones", type=int, default=3)
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "cierre":
+        resultados = medir_cierre(listar_imagenes(args.rutas), args.pie, args.repeticiones)
+        print(f"{'imagen':<30} {'metodo':<14} {'ms':>9} {'IoU':>9}")
+        for fila in resultados:
+            print(f"{fila['imagen']:<30} {fila['metodo']:<14} {fila['segundos'] * 1000:>9.1f} {fila['iou']:>9.5f}")
+
+    elif args.comando == "memoria":
+        resultados = medir_memoria(listar_imagenes(args.rutas), args.pie)
+        print(f"{'imagen':<30} {'MP':>6} {'MB/MP sin':>10} {'MB/MP con':>10} {'retenido':>9}")
+        for fila in resultados:
+            print(f"{fila['imagen']:<30} {fila['megapixeles']:>6.1f} {fila['sin_espacio']:>10.1f} "
+                  f"{fila['con_espacio']:>10.1f} {fila['retenido']:>9.1f}")
+
+    elif args.comando == "reporte":
+        dpis = [dpi or None for dpi in args.dpi]
+        resultados = medir_reporte(listar_imagenes(args.rutas), dpis, args.repeticiones)
+        print(f"{'imagen':<30} {'dpi':>9} {'ms':>9} {'ms texto':>9} {'KB':>9}")
+        for fila in resultados:
+            dpi = fila['dpi'] or "completa"
+            print(f"{fila['imagen']:<30} {dpi:>9} {fila['segundos'] * 1000:>9.1f} "
+                  f"{fila['segundos_texto'] * 1000:>9.1f} {fila['bytes'] / 1024:>9.0f}")
+
+    imprimir_caches()
+
+
+if __name__ == "__main__":
+    main()
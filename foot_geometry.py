@@ -0,0 +1,120 @@
+# foot_geometry.py
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class PerfilPie:
+    """Tabla de extremos por fila (x mínima y x máxima) de los vértices del contorno de un pie.
+
+    Los puntos de referencia son vértices del contorno (CHAIN_APPROX_SIMPLE),
+    los mismos que elegía el agregar_lineas original: la tabla y el índice de
+    vértices por fila se construyen en una sola pasada vectorizada y las
+    consultas de talón, dedos, ancho del talón y línea metatarsal son después
+    búsquedas binarias, mínimos y máximos en ventana o argmax.
+    """
+
+    def __init__(self, puntos):
+        self.puntos = np.asarray(puntos).reshape(-1, 2)
+        if len(self.puntos) == 0:
+            raise ValueError("El contorno del pie está vacío.")
+        ys = self.puntos[:, 1]
+        self.fila_superior = int(ys.min())
+        self.fila_inferior = int(ys.max())
+        filas = ys - self.fila_superior
+        # Rows without vertices must never win a min/max query
+        self.x_min = np.full(self.alto + 1, np.iinfo(np.int64).max, dtype=np.int64)
+        self.x_max = np.full(self.alto + 1, -1, dtype=np.int64)
+        np.minimum.at(self.x_min, filas, self.puntos[:, 0])
+        np.maximum.at(self.x_max, filas, self.puntos[:, 0])
+        # Vertex indices sorted by row, in contour order within each row
+        self._orden = np.argsort(ys, kind="stable")
+        self._ys_ordenadas = ys[self._orden]
+
+    @classmethod
+    def desde_contorno(cls, foot_contour):
+        return cls(foot_contour)
+
+    @property
+    def alto(self):
+        return self.fila_inferior - self.fila_superior
+
+    def _vertices(self, desde, hasta):
+        """Vértices con desde <= y <= hasta, en el orden del contorno."""
+        inicio = np.searchsorted(self._ys_ordenadas, desde, side="left")
+        fin = np.searchsorted(self._ys_ordenadas, hasta, side="right")
+        return self.puntos[np.sort(self._orden[inicio:fin])]
+
+    def extremos(self, y, tolerancia=0):
+        """Vértices más a la izquierda y a la derecha entre y-tolerancia e y+tolerancia.
+
+        Como al ordenar por x: con empates, el primero del contorno a la
+        izquierda y el último a la derecha. None si no hay vértices.
+        """
+        cercanos = self._vertices(y - tolerancia, y + tolerancia)
+        if len(cercanos) == 0:
+            return None
+        izquierdo = cercanos[cercanos[:, 0].argmin()]
+        derecho = cercanos[len(cercanos) - 1 - cercanos[::-1, 0].argmax()]
+        return (int(izquierdo[0]), int(izquierdo[1])), (int(derecho[0]), int(derecho[1]))
+
+    def anchos(self, tolerancia=0):
+        """Distancia entre los vértices extremos de cada fila, tomados en ±tolerancia filas.
+
+        Negativa en las filas sin vértices cerca.
+        """
+        if tolerancia <= 0:
+            return self.x_max - self.x_min
+        ventana = 2 * tolerancia + 1
+        x_min = np.pad(self.x_min, tolerancia, constant_values=np.iinfo(self.x_min.dtype).max)
+        x_max = np.pad(self.x_max, tolerancia, constant_values=-1)
+        return (sliding_window_view(x_max, ventana).max(axis=1)
+                - sliding_window_view(x_min, ventana).min(axis=1))
+
+    def talon(self):
+        """Vértice más bajo del contorno (el primero en su orden si hay varios)."""
+        x, y = self._vertices(self.fila_inferior, self.fila_inferior)[0]
+        return (int(x), int(y))
+
+    def dedos(self, alto_imagen, foot_side="right"):
+        """Devuelve (dedo_gordo, dedo_pequeno) buscando en la franja superior del 5% de la imagen."""
+        superiores = self._vertices(self.fila_superior, self.fila_superior + 0.05 * alto_imagen)
+        izquierdo = superiores[superiores[:, 0].argmin()]
+        derecho = superiores[superiores[:, 0].argmax()]
+        izquierdo, derecho = (int(izquierdo[0]), int(izquierdo[1])), (int(derecho[0]), int(derecho[1]))
+        if foot_side.lower() == "right":
+            return izquierdo, derecho
+        return derecho, izquierdo
+
+    def linea_talon(self, fraccion=0.1, tolerancia=5):
+        """Línea a `fraccion` del largo del pie por encima del talón, entre los vértices extremos cercanos."""
+        y = self.fila_inferior - int(fraccion * self.alto)
+        return self.extremos(y, tolerancia) or self._ancho_total(y)
+
+    def linea_metatarso(self, desde_y, tolerancia=5, paso=5):
+        """Fila más ancha entre desde_y y el talón, probando cada `paso` filas, con sus extremos."""
+        filas = np.arange(int(desde_y), self.fila_inferior, paso)
+        y = int(desde_y)
+        if len(filas):
+            anchos = self.anchos(tolerancia)[filas - self.fila_superior]
+            i = int(anchos.argmax())
+            # A row only counts if its vertices span some width
+            if anchos[i] > 0:
+                y = int(filas[i])
+        (x_izq, _), (x_der, _) = self.extremos(y, tolerancia) or self._ancho_total(y)
+        return (x_izq, y), (x_der, y)
+
+    def _ancho_total(self, y):
+        return (int(self.puntos[:, 0].min()), int(y)), (int(self.puntos[:, 0].max()), int(y))
+
+    def lineas(self, alto_imagen, foot_side="right"):
+        """Puntos de las líneas de referencia que dibuja image_processing.dibujar_lineas."""
+        talon = self.talon()
+        dedo_gordo, dedo_pequeno = self.dedos(alto_imagen, foot_side)
+        return {
+            'talon': talon,
+            'dedo_gordo': dedo_gordo,
+            'dedo_pequeno': dedo_pequeno,
+            'linea_talon': self.linea_talon(),
+            'linea_metatarso': self.linea_metatarso(dedo_gordo[1]),
+        }
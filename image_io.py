@@ -0,0 +1,223 @@
+# image_io.py
+"""Lectura de escaneos desde disco.
+
+Cada archivo se decodifica una vez y el arreglo se comparte. Para las vistas
+previas se puede pedir una decodificación reducida (IMREAD_REDUCED_COLOR_*:
+con JPEG libjpeg escala los bloques DCT y no llega a reconstruir la imagen
+completa), de modo que el tiempo de carga depende de lo que se muestra. Los
+BMP y TIFF sin comprimir se leen con np.memmap en lugar de pasar por el
+decodificador: una sola pasada copia las filas (invirtiéndolas o pasando de
+RGB/gris a BGR si hace falta) a un arreglo propio. El mapa se cierra antes
+de devolver la imagen, así que el archivo no queda abierto (en Windows
+quedaría bloqueado) y sobrescribirlo después no cambia la imagen leída.
+"""
+import glob
+import io
+import os
+import struct
+
+import cv2
+import numpy as np
+
+REDUCCIONES = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+EXTENSIONES_IMAGEN = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+# TIFF tags used to find the image data
+_ANCHO, _ALTO, _BITS, _COMPRESION, _FOTOMETRICA = 256, 257, 258, 259, 262
+_OFFSETS_TIRAS, _MUESTRAS, _BYTES_TIRAS, _PLANAR = 273, 277, 279, 284
+_ORIENTACION = 274
+# EXIF orientations that rotate the image by 90 degrees, swapping its sides
+_ORIENTACIONES_GIRADAS = (5, 6, 7, 8)
+_TIPOS_TIFF = {3: "H", 4: "I"}
+
+
+def listar_imagenes(rutas):
+    """Rutas de imagen de `rutas`: las carpetas se expanden a sus imágenes, en orden alfabético."""
+    imagenes = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            for nombre in sorted(glob.glob(os.path.join(ruta, "*"))):
+                if nombre.lower().endswith(EXTENSIONES_IMAGEN):
+                    imagenes.append(nombre)
+        else:
+            imagenes.append(ruta)
+    return imagenes
+
+
+def leer_imagen(ruta, reduccion=1, mapear=True):
+    """Imagen BGR de `ruta`, con cada lado dividido entre `reduccion` (1, 2, 4 u 8).
+
+    Con `mapear`, los BMP y TIFF sin comprimir se leen por np.memmap a
+    resolución completa. Lanza FileNotFoundError si no se puede leer.
+    """
+    if reduccion not in REDUCCIONES:
+        raise ValueError(f"Reducción no soportada: {reduccion}")
+    imagen = leer_sin_comprimir(ruta) if mapear and reduccion == 1 else None
+    if imagen is None:
+        imagen = cv2.imread(ruta, REDUCCIONES[reduccion])
+    if imagen is None:
+        raise FileNotFoundError(f"No se pudo cargar la imagen: {ruta}")
+    return imagen
+
+
+def reduccion_para(tamano, lado_minimo):
+    """La mayor reducción que deja el lado mayor de `tamano` en al menos `lado_minimo`."""
+    lado = max(tamano)
+    return max((r for r in REDUCCIONES if lado // r >= lado_minimo), default=1)
+
+
+def leer_vista_previa(ruta, lado_minimo):
+    """(imagen reducida, (alto, ancho) del archivo) para mostrar un JPEG con lado mayor `lado_minimo`.
+
+    Devuelve None si reducir no ahorra nada: los demás formatos se decodifican
+    completos de todos modos, así que conviene reducir la imagen completa.
+    """
+    if not es_jpeg(ruta):
+        return None
+    tamano = tamano_imagen(ruta)
+    if tamano is None or reduccion_para(tamano, lado_minimo) == 1:
+        return None
+    return leer_imagen(ruta, reduccion_para(tamano, lado_minimo)), tamano
+
+
+def es_jpeg(ruta):
+    try:
+        with open(ruta, "rb") as archivo:
+            return archivo.read(2) == b"\xff\xd8"
+    except OSError:
+        return False
+
+
+def tamano_imagen(ruta):
+    """(alto, ancho) leídos de la cabecera de un JPEG, PNG, BMP o TIFF, o None.
+
+    Es el tamaño que devuelve cv2.imread: en un JPEG con orientación EXIF
+    girada se intercambian alto y ancho, como al decodificarlo.
+    """
+    try:
+        with open(ruta, "rb") as archivo:
+            cabecera = archivo.read(32)
+            if cabecera[:8] == b"\x89PNG\r\n\x1a\n":
+                ancho, alto = struct.unpack(">II", cabecera[16:24])
+                return alto, ancho
+            if cabecera[:2] == b"BM":
+                ancho, alto = struct.unpack("<ii", cabecera[18:26])
+                return abs(alto), ancho
+            if cabecera[:2] == b"\xff\xd8":
+                return _tamano_jpeg(archivo)
+            if cabecera[:4] in (b"II*\x00", b"MM\x00*"):
+                etiquetas = _etiquetas_tiff(archivo, cabecera)
+                return etiquetas[_ALTO][0], etiquetas[_ANCHO][0]
+    except (OSError, struct.error, KeyError, IndexError):
+        pass
+    return None
+
+
+def leer_sin_comprimir(ruta):
+    """Imagen BGR de un BMP de 24 bits o un TIFF de 8 bits sin comprimir, copiada de un np.memmap.
+
+    Devuelve None para cualquier otro archivo, que entonces pasa por cv2.imread.
+    """
+    try:
+        with open(ruta, "rb") as archivo:
+            cabecera = archivo.read(54)
+            if cabecera[:2] == b"BM":
+                return _mapear_bmp(ruta, cabecera)
+            if cabecera[:4] in (b"II*\x00", b"MM\x00*"):
+                return _mapear_tiff(ruta, _etiquetas_tiff(archivo, cabecera))
+    except (OSError, ValueError, struct.error, KeyError, IndexError):
+        pass
+    return None
+
+
+def _mapear_bmp(ruta, cabecera):
+    inicio_datos, tamano_dib = struct.unpack("<II", cabecera[10:18])
+    if tamano_dib < 40:
+        return None
+    ancho, alto, _, bits, compresion = struct.unpack("<iiHHI", cabecera[18:34])
+    if bits != 24 or compresion != 0 or ancho <= 0 or alto == 0:
+        return None
+    # Rows are padded to 4 bytes; positive heights are stored bottom-up
+    paso = (ancho * 3 + 3) & ~3
+    filas = np.memmap(ruta, dtype=np.uint8, mode="r", offset=inicio_datos, shape=(abs(alto), paso))
+    imagen = np.ndarray((abs(alto), ancho, 3), dtype=np.uint8, buffer=filas, strides=(paso, 3, 1))
+    # Copied so the result does not keep the file mapped; bottom-up rows are put in order on the way
+    return np.array(imagen[::-1] if alto > 0 else imagen)
+
+
+def _mapear_tiff(ruta, etiquetas):
+    if etiquetas.get(_COMPRESION, (1,))[0] != 1 or etiquetas.get(_PLANAR, (1,))[0] != 1:
+        return None
+    # Oriented files are left to OpenCV, which decides whether to rotate them
+    if etiquetas.get(_ORIENTACION, (1,))[0] != 1:
+        return None
+    muestras = etiquetas.get(_MUESTRAS, (1,))[0]
+    fotometrica = etiquetas[_FOTOMETRICA][0]
+    if set(etiquetas.get(_BITS, (1,))) != {8} or (fotometrica, muestras) not in ((1, 1), (2, 3)):
+        return None
+    ancho, alto = etiquetas[_ANCHO][0], etiquetas[_ALTO][0]
+    offsets, cuentas = etiquetas[_OFFSETS_TIRAS], etiquetas[_BYTES_TIRAS]
+    # Only strips stored back to back form a single array
+    if any(o + c != siguiente for o, c, siguiente in zip(offsets, cuentas, offsets[1:])):
+        return None
+    if sum(cuentas) < ancho * alto * muestras:
+        return None
+    datos = np.memmap(ruta, dtype=np.uint8, mode="r", offset=offsets[0], shape=(alto, ancho, muestras))
+    codigo = cv2.COLOR_GRAY2BGR if muestras == 1 else cv2.COLOR_RGB2BGR
+    return cv2.cvtColor(datos, codigo)
+
+
+def _etiquetas_tiff(archivo, cabecera):
+    orden = "<" if cabecera[:2] == b"II" else ">"
+    (inicio,) = struct.unpack(orden + "I", cabecera[4:8])
+    archivo.seek(inicio)
+    (cantidad,) = struct.unpack(orden + "H", archivo.read(2))
+    entradas = archivo.read(12 * cantidad)
+    etiquetas = {}
+    for i in range(cantidad):
+        etiqueta, tipo, cuenta = struct.unpack(orden + "HHI", entradas[12 * i:12 * i + 8])
+        formato = _TIPOS_TIFF.get(tipo)
+        if formato is None:
+            continue
+        bytes_valor = struct.calcsize(formato) * cuenta
+        valor = entradas[12 * i + 8:12 * i + 12]
+        if bytes_valor > 4:
+            (desplazamiento,) = struct.unpack(orden + "I", valor)
+            archivo.seek(desplazamiento)
+            valor = archivo.read(bytes_valor)
+        etiquetas[etiqueta] = struct.unpack(orden + formato * cuenta, valor[:bytes_valor])
+    return etiquetas
+
+
+def _tamano_jpeg(archivo):
+    archivo.seek(2)
+    orientacion = 1
+    while True:
+        marcador = archivo.read(2)
+        if len(marcador) < 2 or marcador[0] != 0xFF:
+            return None
+        tipo = marcador[1]
+        while tipo == 0xFF:
+            tipo = archivo.read(1)[0]
+        (longitud,) = struct.unpack(">H", archivo.read(2))
+        # Start-of-frame markers, excluding DHT, JPG and DAC
+        if 0xC0 <= tipo <= 0xCF and tipo not in (0xC4, 0xC8, 0xCC):
+            _, alto, ancho = struct.unpack(">BHH", archivo.read(5))
+            if orientacion in _ORIENTACIONES_GIRADAS:
+                return ancho, alto
+            return alto, ancho
+        if tipo == 0xE1:
+            segmento = archivo.read(longitud - 2)
+            if segmento[:6] == b"Exif\0\0":
+                # The EXIF block is a TIFF whose offsets start after the "Exif" prefix
+                exif = segmento[6:]
+                etiquetas = _etiquetas_tiff(io.BytesIO(exif), exif[:8])
+                orientacion = etiquetas.get(_ORIENTACION, (1,))[0]
+            continue
+        archivo.seek(longitud - 2, os.SEEK_CUR)
@@ -3,150 +3,383 @@
 import cv2
 import numpy as np
 
-def procesar_imagen(ruta, ruta_logotipo, recolor=True, image=None, foot_side="right"):
+from foot_geometry import PerfilPie
+from image_io import leer_imagen
+from morphology import cerrar_mascara
+from shape_cache import colores_colormap, elemento_estructurante, mascara_elipse
+from workspace import bufer
+
+
+class SegmentacionPie:
+    """Resultado de segmentar un pie una sola vez.
+
+    Guarda la máscara refinada, el contorno más grande, su PerfilPie, las
+    líneas de referencia y sólo el recorte de la imagen (ya con la elipse
+    aplicada) que contiene el pie. Las vistas de piel y mapa de calor se
+    generan a partir de estos datos sin volver a segmentar.
+    """
+
+    def __init__(self, imagen_region, region, mascara, contorno, perfil, lineas, foot_side="right",
+                 tamano_completo=None):
+        self.imagen_region = imagen_region
+        self.region = region
+        self.mascara = mascara
+        self.contorno = contorno
+        self.perfil = perfil
+        self.lineas = lineas
+        self.foot_side = foot_side
+        # (alto, ancho) of the original image when this is a reduced preview
+        self.tamano_completo = tuple(tamano_completo or mascara.shape[:2])
+        self._vistas = {}
+
+    @property
+    def shape(self):
+        return self.mascara.shape[:2] + self.imagen_region.shape[2:]
+
+    @property
+    def escala(self):
+        """Ancho de esta segmentación entre el de la imagen original (1.0 a resolución completa)."""
+        return self.mascara.shape[1] / self.tamano_completo[1]
+
+    @property
+    def imagen(self):
+        """Cuadro completo con la elipse aplicada; fuera de `region` queda en negro."""
+        if self.imagen_region.shape[:2] == self.mascara.shape[:2]:
+            return self.imagen_region
+        x0, y0, x1, y1 = self.region
+        imagen = np.zeros(self.shape, dtype=self.imagen_region.dtype)
+        imagen[y0:y1, x0:x1] = self.imagen_region
+        return imagen
+
+    def render(self, recolor=True, con_lineas=True, colormap=cv2.COLORMAP_JET, rango=None, espacio=None):
+        """Devuelve la vista de mapa de calor (recolor=True) o de piel.
+
+        `colormap` y `rango` sólo aplican al mapa de calor; ver render_mapa_calor.
+        """
+        if rango is not None:
+            rango = tuple(rango)
+        if recolor:
+            clave = (True, bool(con_lineas), colormap, rango)
+        else:
+            clave = (False, bool(con_lineas))
+        if clave not in self._vistas:
+            caja = self.caja()
+            origen = self.region[:2]
+            if recolor:
+                vista = render_mapa_calor(self.imagen_region, self.mascara, colormap=colormap, rango=rango,
+                                          caja=caja, origen=origen, espacio=espacio)
+            else:
+                vista = render_piel(self.imagen_region, self.mascara, caja=caja, origen=origen, espacio=espacio)
+            if con_lineas:
+                vista = dibujar_lineas(vista, self.lineas, copiar=False, escala=self.escala)
+            self._vistas[clave] = vista
+        return self._vistas[clave]
+
+    def render_piel(self, con_lineas=True, espacio=None):
+        return self.render(recolor=False, con_lineas=con_lineas, espacio=espacio)
+
+    def render_mapa_calor(self, con_lineas=True, colormap=cv2.COLORMAP_JET, rango=None, espacio=None):
+        return self.render(recolor=True, con_lineas=con_lineas, colormap=colormap, rango=rango, espacio=espacio)
+
+    def caja(self):
+        """Rectángulo (x, y, ancho, alto) que contiene la máscara refinada."""
+        return cv2.boundingRect(self.contorno)
+
+
+def tabla_mapa_calor(minimo, maximo, colormap=cv2.COLORMAP_JET):
+    """LUT BGR de 256 entradas que normaliza [minimo, maximo] a [0, 255] y aplica el mapa de color.
+
+    Reproduce cv2.normalize(NORM_MINMAX), que redondea escala y desplazamiento a
+    float32, seguido de cv2.applyColorMap.
+    """
+    valores = np.arange(256, dtype=np.float64)
+    if maximo > minimo:
+        escala = 255.0 / (maximo - minimo)
+        desplazamiento = -minimo * escala
+        normalizada = valores * np.float64(np.float32(escala)) + np.float64(np.float32(desplazamiento))
+        normalizada = np.clip(np.rint(normalizada.astype(np.float32)), 0, 255).astype(np.uint8)
+    else:
+        normalizada = np.zeros(256, dtype=np.uint8)
+    return colores_colormap(colormap)[normalizada]
+
+
+def render_mapa_calor(imagen, mascara, colormap=cv2.COLORMAP_JET, rango=None, out=None, caja=None,
+                      origen=(0, 0), espacio=None):
+    """Mapa de calor del pie sobre fondo blanco, en una sola pasada sobre la región del pie.
+
+    Con `rango=None` normaliza entre el mínimo y el máximo de gris del pie
+    compuesto sobre fondo blanco (como cv2.normalize sobre la imagen completa);
+    con `rango=(minimo, maximo)` usa ese intervalo fijo. `out` puede ser un
+    búfer (alto, ancho, 3) uint8 reutilizable y `caja` el boundingRect de la
+    máscara si ya se conoce. `imagen` puede cubrir sólo la parte de la máscara
+    que empieza en `origen`, siempre que contenga la caja.
+    """
+    height, width = mascara.shape[:2]
+    out = _lienzo_blanco(out, height, width)
+    x, y, w, h = caja if caja is not None else cv2.boundingRect(mascara)
+    if w == 0 or h == 0:
+        return out
+
+    mascara_region = mascara[y:y + h, x:x + w]
+    gris = cv2.cvtColor(_subregion(imagen, x, y, w, h, origen), cv2.COLOR_BGR2GRAY,
+                        dst=bufer(espacio, "gris", (h, w)))
+    if rango is None:
+        minimo, maximo = cv2.minMaxLoc(gris, mascara_region)[:2]
+        if (w, h) != (width, height) or cv2.countNonZero(mascara_region) < w * h:
+            # The white background takes part in the normalization
+            maximo = 255
+    else:
+        minimo, maximo = rango
+
+    tabla = tabla_mapa_calor(minimo, maximo, colormap).reshape(256, 1, 3)
+    gris_bgr = cv2.cvtColor(gris, cv2.COLOR_GRAY2BGR, dst=bufer(espacio, "gris_bgr", (h, w, 3)))
+    # Written straight into the output, so no crop-sized color copy is needed
+    region = out[y:y + h, x:x + w]
+    cv2.LUT(gris_bgr, tabla, dst=region)
+    fondo = cv2.bitwise_not(mascara_region, dst=bufer(espacio, "fondo", (h, w)))
+    cv2.bitwise_or(region, (255, 255, 255, 0), dst=region, mask=fondo)
+    return out
+
+
+def render_piel(imagen, mascara, out=None, caja=None, origen=(0, 0), espacio=None):
+    """Imagen del pie sobre fondo blanco; mismos parámetros que render_mapa_calor."""
+    height, width = mascara.shape[:2]
+    out = _lienzo_blanco(out, height, width)
+    x, y, w, h = caja if caja is not None else cv2.boundingRect(mascara)
+    if w == 0 or h == 0:
+        return out
+    region = out[y:y + h, x:x + w]
+    np.copyto(region, _subregion(imagen, x, y, w, h, origen))
+    fondo = cv2.bitwise_not(mascara[y:y + h, x:x + w], dst=bufer(espacio, "fondo", (h, w)))
+    cv2.bitwise_or(region, (255, 255, 255, 0), dst=region, mask=fondo)
+    return out
+
+
+def _subregion(imagen, x, y, w, h, origen):
+    x -= origen[0]
+    y -= origen[1]
+    return imagen[y:y + h, x:x + w]
+
+
+def _lienzo_blanco(out, height, width):
+    if out is None:
+        return np.full((height, width, 3), 255, dtype=np.uint8)
+    if out.shape != (height, width, 3) or out.dtype != np.uint8:
+        raise ValueError("El búfer de salida debe ser uint8 con forma (alto, ancho, 3).")
+    out.fill(255)
+    return out
+
+
+# HSV range considered skin on the scanner bed
+LOWER_SKIN = np.array([0, 100, 100], dtype=np.uint8)
+UPPER_SKIN = np.array([140, 255, 255], dtype=np.uint8)
+
+ITERACIONES_CIERRE = 35
+RADIO_DESENFOQUE = 3  # GaussianBlur (7, 7)
+
+
+def segmentar_imagen(ruta=None, image=None, foot_side="right", metodo_cierre="descompuesto", roi=True,
+                     espacio=None, tamano_completo=None):
+    """Segmenta el pie de una imagen o ruta y devuelve un SegmentacionPie.
+
+    `metodo_cierre` selecciona el motor de morphology.cerrar_mascara. Con
+    `roi=True` las etapas costosas sólo se ejecutan sobre el recorte que
+    encuentra region_interes; el resultado es el mismo que con el cuadro
+    completo, al que se vuelve si la piel detectada llega al borde del recorte.
+    `espacio` es un workspace.EspacioTrabajo opcional para los intermedios.
+    Si la imagen es una copia reducida, `tamano_completo` es el (alto, ancho)
+    de la original; el desenfoque y el cierre se reducen en la misma proporción.
+    """
     if image is not None:
-        imagen = image.copy()
+        imagen = image
     elif ruta:
-        imagen = cv2.imread(ruta)
+        imagen = leer_imagen(ruta)
     else:
         raise ValueError("Debe proporcionar una ruta de imagen o una imagen.")
 
     if imagen is None:
         raise FileNotFoundError(f"No se pudo cargar la imagen: {ruta}")
 
-    # Flip horizontally to maintain orientation
-    imagen = cv2.flip(imagen, 1)
-
+    # The result is flipped horizontally to maintain orientation. Regions are
+    # found on a flipped view and only the crop that is segmented gets copied
+    # flipped (in _segmentar_region), never the whole frame.
     height, width = imagen.shape[:2]
-    mask_ellipse = np.zeros((height, width), dtype=np.uint8)
-    center = (width // 2, height // 2)
-    axes = (width // 3, height)
-    cv2.ellipse(mask_ellipse, center, axes, 0, 0, 360, 255, -1)
-    imagen = cv2.bitwise_and(imagen, imagen, mask=mask_ellipse)
+    escala = width / tamano_completo[1] if tamano_completo else 1.0
+    iteraciones, radio = _parametros_escala(escala)
+    region = region_interes(imagen[:, ::-1], max(2, round(8 * escala)), iteraciones, radio) if roi else None
+    resultado = None
+    if region is not None:
+        resultado = _segmentar_region(imagen, region, metodo_cierre, espacio, iteraciones, radio)
+    if resultado is None:
+        region = (0, 0, width, height)
+        resultado = _segmentar_region(imagen, region, metodo_cierre, espacio, iteraciones, radio)
+
+    imagen_region, largest_contour = resultado
+    if largest_contour is None:
+        raise ValueError("No se encontró ninguna forma de pie en la imagen.")
 
-    hsv = cv2.cvtColor(imagen, cv2.COLOR_BGR2HSV)
+    refined_mask = np.zeros((height, width), dtype=np.uint8)
+    cv2.drawContours(refined_mask, [largest_contour], -1, 255, thickness=cv2.FILLED)
 
-    lower_skin = np.array([0, 100, 100], dtype=np.uint8)
-    upper_skin = np.array([140, 255, 255], dtype=np.uint8)
+    perfil = PerfilPie.desde_contorno(largest_contour)
+    lineas = perfil.lineas(height, foot_side)
+    return SegmentacionPie(imagen_region, region, refined_mask, largest_contour, perfil, lineas, foot_side,
+                           tamano_completo)
 
-    mask = cv2.inRange(hsv, lower_skin, upper_skin)
-    mask = cv2.GaussianBlur(mask, (7, 7), 0)
 
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=35)
+LADO_VISTA_PREVIA = 800
 
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    refined_mask = np.zeros_like(mask)
-    if contours:
-        largest_contour = max(contours, key=cv2.contourArea)
-        cv2.drawContours(refined_mask, [largest_contour], -1, 255, thickness=cv2.FILLED)
-    else:
-        raise ValueError("No se encontró ninguna forma de pie en la imagen.")
 
-    imagen_sin_fondo = cv2.bitwise_and(imagen, imagen, mask=refined_mask)
+def segmentar_vista_previa(image, foot_side="right", lado_maximo=LADO_VISTA_PREVIA, espacio=None,
+                           tamano_completo=None):
+    """Segmenta una copia reducida de `image` (lado mayor `lado_maximo`) para mostrarla en pantalla.
 
-    if recolor:
-        fondo_blanco = np.ones_like(imagen) * 255
-        mask_inv = cv2.bitwise_not(refined_mask)
-        fondo = cv2.bitwise_and(fondo_blanco, fondo_blanco, mask=mask_inv)
-        imagen_con_fondo_blanco = cv2.add(fondo, imagen_sin_fondo)
+    Tarda una fracción de la segmentación completa; el resultado lleva
+    `tamano_completo`, con el que sus líneas se dibujan a la escala de la copia.
+    Si `image` ya es una copia reducida (p. ej. una decodificación reducida
+    de image_io), `tamano_completo` es el (alto, ancho) del archivo.
+    """
+    height, width = image.shape[:2]
+    tamano_completo = tuple(tamano_completo or (height, width))
+    escala = lado_maximo / max(height, width)
+    if escala < 1.0:
+        image = cv2.resize(image, (max(1, round(width * escala)), max(1, round(height * escala))),
+                           interpolation=cv2.INTER_AREA)
+    if image.shape[:2] == tamano_completo:
+        return segmentar_imagen(image=image, foot_side=foot_side, espacio=espacio)
+    return segmentar_imagen(image=image, foot_side=foot_side, espacio=espacio,
+                            tamano_completo=tamano_completo)
 
-        imagen_gris = cv2.cvtColor(imagen_con_fondo_blanco, cv2.COLOR_BGR2GRAY)
-        imagen_normalizada = cv2.normalize(imagen_gris, None, 0, 255, cv2.NORM_MINMAX)
 
-        heatmap = cv2.applyColorMap(imagen_normalizada, cv2.COLORMAP_JET)
-        refined_mask_3ch = cv2.cvtColor(refined_mask, cv2.COLOR_GRAY2BGR)
-        heatmap_foreground = cv2.bitwise_and(heatmap, refined_mask_3ch)
-        final_image = cv2.add(fondo, heatmap_foreground)
-    else:
-        fondo_blanco = np.ones_like(imagen) * 255
-        mask_inv = cv2.bitwise_not(refined_mask)
-        fondo = cv2.bitwise_and(fondo_blanco, fondo_blanco, mask=mask_inv)
-        final_image = cv2.add(fondo, imagen_sin_fondo)
-
-    final_image = agregar_lineas(final_image, largest_contour, foot_side)
+def _parametros_escala(escala):
+    # Blur and closing are defined in full-resolution pixels
+    if escala >= 1.0:
+        return ITERACIONES_CIERRE, RADIO_DESENFOQUE
+    return max(1, round(ITERACIONES_CIERRE * escala)), max(1, round(RADIO_DESENFOQUE * escala))
 
-    # Removed the logo addition from image processing
-    # if ruta_logotipo and os.path.exists(ruta_logotipo):
-    #     final_image = agregar_logotipo(final_image, ruta_logotipo)
 
-    return final_image
+def region_interes(imagen, factor=8, iteraciones=ITERACIONES_CIERRE, radio=RADIO_DESENFOQUE):
+    """Caja (x0, y0, x1, y1) que contiene la piel detectada en una pasada a baja resolución.
 
-def agregar_lineas(imagen, foot_contour, foot_side="right"):
+    Incluye el margen que necesitan el desenfoque y el cierre para que el
+    recorte dé el mismo resultado que el cuadro completo. Devuelve None si no
+    se detecta piel.
+    """
     height, width = imagen.shape[:2]
-    line_thickness = 5
+    # Plain decimation: sampling every `factor` pixels is enough to find a
+    # foot-sized region and avoids filtering the whole frame.
+    small = np.ascontiguousarray(imagen[::factor, ::factor])
+    small_height, small_width = small.shape[:2]
+    small = cv2.bitwise_and(small, small, mask=mascara_elipse(small_height, small_width))
+    mask = cv2.inRange(cv2.cvtColor(small, cv2.COLOR_BGR2HSV), LOWER_SKIN, UPPER_SKIN)
+    # Grow the coarse mask by one sample to cover skin between samples
+    mask = cv2.dilate(mask, elemento_estructurante(cv2.MORPH_RECT, 3, 3))
+    x, y, w, h = cv2.boundingRect(mask)
+    if w == 0 or h == 0:
+        return None
+    margen = _margen_region(iteraciones, radio) + factor
+    return (
+        max(x * factor - margen, 0),
+        max(y * factor - margen, 0),
+        min((x + w) * factor + margen, width),
+        min((y + h) * factor + margen, height),
+    )
+
+
+def _margen_region(iteraciones=ITERACIONES_CIERRE, radio=RADIO_DESENFOQUE):
+    # The closing reaches 2 px per iteration and its erosion looks as far
+    # again; the blur adds its own radius.
+    return 2 * 2 * iteraciones + radio
+
+
+def _segmentar_region(imagen, region, metodo_cierre, espacio=None, iteraciones=ITERACIONES_CIERRE,
+                      radio=RADIO_DESENFOQUE):
+    """Segmenta el recorte `region` = (x0, y0, x1, y1) de `imagen` volteada horizontalmente.
+
+    Devuelve (recorte volteado con la elipse aplicada, contorno más grande en
+    coordenadas del cuadro completo volteado o None), o None si la piel llega
+    tan cerca de un borde interior del recorte que el resultado podría diferir.
+    """
+    height, width = imagen.shape[:2]
+    x0, y0, x1, y1 = region
+    # Columns x0..x1 of the flipped frame are width-x1..width-x0 of the original
+    recorte = imagen[y0:y1, width - x1:width - x0]
+    recorte = cv2.flip(recorte, 1, dst=bufer(espacio, "volteada", recorte.shape))
+    forma = recorte.shape[:2]
+
+    mask_ellipse = mascara_elipse(height, width)[y0:y1, x0:x1]
+    # The masked crop outlives this call (it backs the renders), so it is
+    # never taken from the workspace.
+    recorte = cv2.bitwise_and(recorte, recorte, mask=mask_ellipse)
+
+    hsv = cv2.cvtColor(recorte, cv2.COLOR_BGR2HSV, dst=bufer(espacio, "hsv", recorte.shape))
+    mask = cv2.inRange(hsv, LOWER_SKIN, UPPER_SKIN, dst=bufer(espacio, "piel", forma))
+
+    if (x1 - x0, y1 - y0) != (width, height):
+        x, y, w, h = cv2.boundingRect(mask)
+        margen = _margen_region(iteraciones, radio)
+        if w and h and (
+            (x0 > 0 and x < margen) or (y0 > 0 and y < margen)
+            or (x1 < width and x + w > recorte.shape[1] - margen)
+            or (y1 < height and y + h > recorte.shape[0] - margen)
+        ):
+            return None
+
+    tamano_desenfoque = (2 * radio + 1, 2 * radio + 1)
+    mask = cv2.GaussianBlur(mask, tamano_desenfoque, 0, dst=bufer(espacio, "desenfoque", forma))
+    mask = cerrar_mascara(mask, iteraciones=iteraciones, metodo=metodo_cierre, espacio=espacio)
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
+    if not contours:
+        return recorte, None
+    return recorte, max(contours, key=cv2.contourArea)
+
+
+def procesar_imagen(ruta, ruta_logotipo, recolor=True, image=None, foot_side="right"):
+    # Removed the logo addition from image processing; ruta_logotipo is kept
+    # for compatibility with existing callers.
+    segmentacion = segmentar_imagen(ruta=ruta, image=image, foot_side=foot_side)
+    return segmentacion.render(recolor=recolor)
+
+
+def calcular_lineas(foot_contour, height, foot_side="right"):
+    """Calcula los puntos de las líneas de referencia a partir del contorno."""
+    return PerfilPie.desde_contorno(foot_contour).lineas(height, foot_side)
+
+
+def dibujar_lineas(imagen, lineas, copiar=True, escala=1.0):
+    """Dibuja las líneas calculadas por calcular_lineas (sobre una copia si `copiar`).
+
+    Grosores y cruces están en píxeles de resolución completa; en una copia
+    reducida (`escala` < 1, ver SegmentacionPie.escala) se reducen igual, para
+    que se vean como en la imagen completa reducida.
+    """
+    if copiar:
+        imagen = imagen.copy()
+    line_thickness = max(1, round(5 * escala))
+    cross_size = max(2, round(20 * escala))
+    cross_thickness = max(1, round(2 * escala))
     white_color = (255, 255, 255)
     red_color = (0, 0, 255)
 
-    contour_points = foot_contour.reshape(-1, 2)
-    heel_point = contour_points[contour_points[:, 1].argmax()]
-    heel_x, heel_y = heel_point
+    talon = lineas['talon']
+    dedo_gordo = lineas['dedo_gordo']
+    cv2.line(imagen, talon, dedo_gordo, white_color, line_thickness)
+    imagen = dibujar_cruz(imagen, talon, red_color, size=cross_size, thickness=cross_thickness)
+    imagen = dibujar_cruz(imagen, dedo_gordo, red_color, size=cross_size, thickness=cross_thickness)
 
-    top_points = contour_points[contour_points[:, 1] <= contour_points[:, 1].min() + 0.05 * height]
+    for start_point, end_point in (lineas['linea_talon'], lineas['linea_metatarso']):
+        cv2.line(imagen, start_point, end_point, white_color, line_thickness)
+        imagen = dibujar_cruz(imagen, start_point, red_color, size=cross_size, thickness=cross_thickness)
+        imagen = dibujar_cruz(imagen, end_point, red_color, size=cross_size, thickness=cross_thickness)
 
-    if foot_side.lower() == "right":
-        big_toe_point = top_points[top_points[:, 0].argmin()]
-        little_toe_point = top_points[top_points[:, 0].argmax()]
-    else:
-        big_toe_point = top_points[top_points[:, 0].argmax()]
-        little_toe_point = top_points[top_points[:, 0].argmin()]
-
-    thumb_x, thumb_y = big_toe_point
-    little_x, little_y = little_toe_point
-
-    cv2.line(imagen, (int(heel_x), int(heel_y)), (int(thumb_x), int(thumb_y)), white_color, line_thickness)
-    imagen = dibujar_cruz(imagen, (int(heel_x), int(heel_y)), red_color, size=20, thickness=2)
-    imagen = dibujar_cruz(imagen, (int(thumb_x), int(thumb_y)), red_color, size=20, thickness=2)
-
-    heel_y = int(heel_y)
-    foot_height = heel_y - contour_points[:, 1].min()
-    horizontal_line_y = heel_y - int(0.1 * foot_height)
-
-    tolerance = 5
-    horizontal_points = contour_points[np.abs(contour_points[:, 1] - horizontal_line_y) <= tolerance]
-    if horizontal_points.size >= 2:
-        horizontal_points = horizontal_points[horizontal_points[:, 0].argsort()]
-        start_point = horizontal_points[0]
-        end_point = horizontal_points[-1]
-    else:
-        x_min = contour_points[:, 0].min()
-        x_max = contour_points[:, 0].max()
-        start_point = (x_min, horizontal_line_y)
-        end_point = (x_max, horizontal_line_y)
-
-    cv2.line(imagen, (int(start_point[0]), int(start_point[1])), (int(end_point[0]), int(end_point[1])), white_color, line_thickness)
-    imagen = dibujar_cruz(imagen, (int(start_point[0]), int(start_point[1])), red_color, size=20, thickness=2)
-    imagen = dibujar_cruz(imagen, (int(end_point[0]), int(end_point[1])), red_color, size=20, thickness=2)
-
-    y_values = np.arange(int(thumb_y), heel_y, 5)
-    max_width = 0
-    metatarsal_line_y = thumb_y
-
-    for y in y_values:
-        points_at_y = contour_points[np.abs(contour_points[:, 1] - y) <= tolerance]
-        if points_at_y.size >= 2:
-            x_coords = points_at_y[:, 0]
-            width_at_y = x_coords.max() - x_coords.min()
-            if width_at_y > max_width:
-                max_width = width_at_y
-                metatarsal_line_y = y
-
-    metatarsal_points = contour_points[np.abs(contour_points[:, 1] - metatarsal_line_y) <= tolerance]
-    if metatarsal_points.size >= 2:
-        metatarsal_points = metatarsal_points[metatarsal_points[:, 0].argsort()]
-        start_point = metatarsal_points[0]
-        end_point = metatarsal_points[-1]
-    else:
-        x_min = contour_points[:, 0].min()
-        x_max = contour_points[:, 0].max()
-        start_point = (x_min, metatarsal_line_y)
-        end_point = (x_max, metatarsal_line_y)
+    return imagen
 
-    cv2.line(imagen, (int(start_point[0]), int(metatarsal_line_y)), (int(end_point[0]), int(metatarsal_line_y)), white_color, line_thickness)
-    imagen = dibujar_cruz(imagen, (int(start_point[0]), int(metatarsal_line_y)), red_color, size=20, thickness=2)
-    imagen = dibujar_cruz(imagen, (int(end_point[0]), int(metatarsal_line_y)), red_color, size=20, thickness=2)
 
-    return imagen
+def agregar_lineas(imagen, foot_contour, foot_side="right"):
+    lineas = calcular_lineas(foot_contour, imagen.shape[0], foot_side)
+    return dibujar_lineas(imagen, lineas)
+
 
 def dibujar_cruz(imagen, punto, color, size=20, thickness=2):
     x, y = punto
@@ -1,14 +1,79 @@
 # main.py
+"""Punto de entrada de Orto-Flex Scanner.
+
+Uso:
+    python main.py [--profile-startup]
+
+Con --profile-startup imprime, al terminar el primer ciclo de eventos, cuánto
+tardó cada etapa del arranque (importaciones, QApplication, fuentes, ventana
+y su primera presentación). ReportLab no forma parte del arranque: se
+importa al pedir el primer reporte.
+"""
+import importlib
 import sys
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QFont
-from app import VentanaPrincipal
-from utils import load_fonts
+import time
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+INICIO = time.perf_counter()
+
+
+class LineaTiempo:
+    """Marcas de tiempo del arranque; sólo registra si está activa."""
+
+    def __init__(self, activa):
+        self.activa = activa
+        self.marcas = []
+        self._anterior = INICIO
+
+    def marcar(self, etapa):
+        if not self.activa:
+            return
+        ahora = time.perf_counter()
+        self.marcas.append((etapa, ahora - self._anterior, ahora - INICIO))
+        self._anterior = ahora
+
+    def imprimir(self):
+        print(f"{'Etapa del arranque':<24}{'ms':>8}{'acumulado':>12}")
+        for etapa, segundos, acumulado in self.marcas:
+            print(f"{etapa:<24}{1000 * segundos:>8.1f}{1000 * acumulado:>12.1f}")
+        print(f"ReportLab cargado: {'sí' if 'reportlab' in sys.modules else 'no'}")
+
+
+def main(argv=None):
+    argv = list(sys.argv if argv is None else argv)
+    linea = LineaTiempo("--profile-startup" in argv)
+    argv = [arg for arg in argv if arg != "--profile-startup"]
+
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtGui import QFont
+    from PyQt5.QtWidgets import QApplication
+    linea.marcar("import PyQt5")
+    # Loaded ahead of app (which imports them anyway) only so the timeline
+    # shows their cost apart from what the app module itself costs
+    for modulo in ("numpy", "cv2"):
+        importlib.import_module(modulo)
+        linea.marcar(f"import {modulo}")
+    from app import VentanaPrincipal
+    from utils import load_fonts
+    linea.marcar("import app")
+
+    app = QApplication(argv)
+    linea.marcar("QApplication")
     font_family = load_fonts()
     app.setFont(QFont(font_family, 12))
+    linea.marcar("fuentes")
     ventana = VentanaPrincipal()
+    linea.marcar("VentanaPrincipal")
+    # The window is shown once, after it is fully built, so it is laid out a single time
     ventana.showMaximized()
-    sys.exit(app.exec_())
+    linea.marcar("showMaximized")
+    if linea.activa:
+        def primer_ciclo():
+            linea.marcar("primer ciclo de eventos")
+            linea.imprimir()
+
+        QTimer.singleShot(0, primer_ciclo)
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
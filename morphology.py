@@ -0,0 +1,128 @@
+# morphology.py
+
+import cv2
+import numpy as np
+
+from shape_cache import elemento_estructurante
+from workspace import bufer
+
+METODOS_CIERRE = ("referencia", "descompuesto")
+
+# Ellipse kernel used by the segmentation pipeline
+KERNEL_CIERRE = elemento_estructurante(cv2.MORPH_ELLIPSE, 5, 5)
+
+# The 5x5 ellipse iterated n times is the lattice hexagon
+# {max(|x|, |x|/2 + |y|) <= 2n}, which equals a vertical segment of
+# radius n dilated by the rhombus {|x| + 2|y| <= 2n}. The rhombus is two
+# diagonal segments along (2, 1) and (2, -1) plus one or two passes of this
+# cross, which fills the lattice points the diagonals skip.
+_CRUZ = np.array([
+    [0, 0, 1, 0, 0],
+    [1, 1, 1, 1, 1],
+    [0, 0, 1, 0, 0],
+], dtype=np.uint8)
+
+
+def cerrar_mascara(mask, iteraciones=35, metodo="descompuesto", espacio=None):
+    """Equivalente a MORPH_CLOSE con la elipse 5x5 y `iteraciones` pasadas.
+
+    - "referencia": cv2.morphologyEx sobre todo el cuadro.
+    - "descompuesto": mismo resultado binario que la referencia, con el
+      elemento estructurante descompuesto en segmentos y limitado al
+      rectángulo que rodea la máscara. `python benchmark.py cierre` reporta
+      el IoU frente a la referencia sobre un conjunto de imágenes.
+
+    Devuelve una máscara binaria (0/255). findContours sólo distingue cero de
+    no cero, así que el contorno resultante es el mismo que con la máscara en
+    escala de grises de la referencia. Con un EspacioTrabajo en `espacio` los
+    intermedios y el resultado usan sus búferes.
+    """
+    if metodo == "referencia":
+        return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, KERNEL_CIERRE, iterations=iteraciones)
+    if metodo == "descompuesto":
+        return _cerrar_descompuesto(mask, iteraciones, espacio)
+    raise ValueError(f"Método de cierre desconocido: {metodo}")
+
+
+def iou_mascaras(mask_a, mask_b):
+    """Intersección sobre unión de dos máscaras (no cero = primer plano)."""
+    a = mask_a > 0
+    b = mask_b > 0
+    union = np.count_nonzero(a | b)
+    if union == 0:
+        return 1.0
+    return np.count_nonzero(a & b) / union
+
+
+def _cerrar_descompuesto(mask, iteraciones, espacio=None):
+    height, width = mask.shape[:2]
+    closed = bufer(espacio, "cierre", (height, width))
+    closed.fill(0)
+    x, y, w, h = cv2.boundingRect(mask)
+    if w == 0 or h == 0:
+        return closed
+
+    # Dilation reaches `alcance` pixels and the erosion looks `alcance` further,
+    # so nothing beyond twice the reach from the mask can change.
+    alcance = 2 * iteraciones
+    x0, y0 = max(x - 2 * alcance, 0), max(y - 2 * alcance, 0)
+    x1, y1 = min(x + w + 2 * alcance, width), min(y + h + 2 * alcance, height)
+    h_rec, w_rec = y1 - y0, x1 - x0
+    forma = (h_rec + 2 * alcance, w_rec + 2 * alcance)
+
+    # Zero padding lets the decomposed passes leave the frame and come back,
+    # which matches the clipped iterative result of cv2.morphologyEx.
+    trabajo = bufer(espacio, "cierre_trabajo", forma)
+    cv2.copyMakeBorder(mask[y0:y1, x0:x1], alcance, alcance, alcance, alcance,
+                       cv2.BORDER_CONSTANT, dst=trabajo, value=0)
+    cv2.threshold(trabajo, 0, 255, cv2.THRESH_BINARY, dst=trabajo)
+    dilatada = _dilatar_hexagono(trabajo, iteraciones, bufer(espacio, "cierre_auxiliar", forma))
+
+    # Erosion is the complement of dilating the complement. OpenCV treats the
+    # outside of the image as foreground when eroding, so the padding stays 0.
+    complemento = bufer(espacio, "cierre_complemento", forma)
+    complemento.fill(0)
+    interior = (slice(alcance, alcance + h_rec), slice(alcance, alcance + w_rec))
+    np.subtract(255, dilatada[interior], out=complemento[interior])
+    erosion = _dilatar_hexagono(complemento, iteraciones, bufer(espacio, "cierre_auxiliar_2", forma))
+
+    np.subtract(255, erosion[interior], out=erosion[interior])
+    np.bitwise_and(dilatada[interior], erosion[interior], out=closed[y0:y1, x0:x1])
+    return closed
+
+
+def _dilatar_hexagono(mask, iteraciones, auxiliar):
+    # Ping-pongs between `mask` and `auxiliar`; returns whichever holds the result
+    mitad = (iteraciones - 1) // 2
+    mask, auxiliar = _dilatar_segmento(mask, auxiliar, 2, 1, mitad)
+    mask, auxiliar = _dilatar_segmento(mask, auxiliar, 2, -1, mitad)
+    for _ in range(iteraciones - 2 * mitad):
+        cv2.dilate(mask, _CRUZ, dst=auxiliar)
+        mask, auxiliar = auxiliar, mask
+    vertical = elemento_estructurante(cv2.MORPH_RECT, 1, 2 * iteraciones + 1)
+    cv2.dilate(mask, vertical, dst=auxiliar)
+    return auxiliar
+
+
+def _dilatar_segmento(mask, auxiliar, dx, dy, alcance):
+    # Dilate by {-alcance..alcance} * (dx, dy) using symmetric three-point
+    # steps of size 1, 3, 9, ... so the cost grows with log3(alcance).
+    cubierto = 0
+    while cubierto < alcance:
+        paso = min(2 * cubierto + 1, alcance - cubierto)
+        np.copyto(auxiliar, mask)
+        _max_desplazado(mask, auxiliar, dx * paso, dy * paso)
+        _max_desplazado(mask, auxiliar, -dx * paso, -dy * paso)
+        mask, auxiliar = auxiliar, mask
+        cubierto += paso
+    return mask, auxiliar
+
+
+def _max_desplazado(origen, destino, dx, dy):
+    # destino[p] = max(destino[p], origen[p - (dx, dy)]) where both are inside
+    height, width = origen.shape
+    filas_d = slice(max(dy, 0), height + min(dy, 0))
+    cols_d = slice(max(dx, 0), width + min(dx, 0))
+    filas_o = slice(max(-dy, 0), height + min(-dy, 0))
+    cols_o = slice(max(-dx, 0), width + min(-dx, 0))
+    np.maximum(destino[filas_d, cols_d], origen[filas_o, cols_o], out=destino[filas_d, cols_d])
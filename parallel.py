@@ -0,0 +1,76 @@
+# parallel.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+_cerrojo = threading.Lock()
+_ejecutor = None
+_tamano_ejecutor = 0
+
+
+def hilos_disponibles():
+    """Hilos para trabajos en paralelo: los núcleos de la máquina, limitados por cv2.setNumThreads.
+
+    cv2.setNumThreads(0) o (1) deja la preparación del reporte en serie.
+    """
+    return max(1, min(os.cpu_count() or 1, cv2.getNumThreads()))
+
+
+def ejecutor():
+    """ThreadPoolExecutor compartido, del tamaño que da hilos_disponibles().
+
+    OpenCV y cv2.imencode liberan el GIL, así que los trabajos por pie y por
+    imagen aprovechan los núcleos libres. Si cambia cv2.setNumThreads se crea
+    un ejecutor nuevo con el tamaño actualizado.
+    """
+    global _ejecutor, _tamano_ejecutor
+    tamano = hilos_disponibles()
+    with _cerrojo:
+        if _ejecutor is None or _tamano_ejecutor != tamano:
+            if _ejecutor is not None:
+                _ejecutor.shutdown(wait=False)
+            _ejecutor = ThreadPoolExecutor(max_workers=tamano, thread_name_prefix="orto-flex")
+            _tamano_ejecutor = tamano
+        return _ejecutor
+
+
+def _reiniciar_en_hijo():
+    # A forked pool process inherits the executor but not its threads
+    global _cerrojo, _ejecutor, _tamano_ejecutor
+    _cerrojo = threading.Lock()
+    _ejecutor = None
+    _tamano_ejecutor = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
+
+def mapear(funcion, *iterables):
+    """Como map(), pero en el ejecutor compartido; devuelve una lista en el mismo orden."""
+    return list(ejecutor().map(funcion, *iterables))
+
+
+class TiemposEjecucion:
+    """Tiempo real y tiempo de CPU (todos los hilos del proceso) de un bloque `with`."""
+
+    def __enter__(self):
+        self.real = self.cpu = 0.0
+        self._inicio_real = time.perf_counter()
+        self._inicio_cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.real = time.perf_counter() - self._inicio_real
+        self.cpu = time.process_time() - self._inicio_cpu
+        return False
+
+    @property
+    def paralelismo(self):
+        return self.cpu / self.real if self.real > 0 else 0.0
+
+    def __str__(self):
+        return f"{self.real:.2f} s reales, {self.cpu:.2f} s de CPU ({self.paralelismo:.1f}x)"
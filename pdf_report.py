@@ -5,15 +5,16 @@ import re
 from io import BytesIO
 from reportlab.platypus import Paragraph, Spacer, Image as RLImage, Table, TableStyle
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm
 from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate
-from PyQt5.QtWidgets import QFileDialog
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, NextPageTemplate, PageBreak
 import datetime
 import numpy as np
+from asset_registry import ruta_recurso
+from parallel import mapear
+from report_resources import FONDO_REPORTE, FONDO_SIN_PIES, fondo_pagina, recursos_reporte
+from scan_export import exportar_originales
+from watermark import aplicar_marca
 
 def sanitize_filename(name):
     return re.sub(r'[^A-Za-z0-9\s_-]', '', name).strip()
@@ -88,145 +89,186 @@ def create_patient_info_table(paciente, telefono, order_number, sucursal,
     ]))
     return table_patient_info
 
-def generate_pdf_report(
-    paciente, telefono, order_number, sucursal, taller,
-    longitud_pie, material, observaciones,
-    left_skin_image, right_skin_image,
-    left_heatmap_image, right_heatmap_image,
-    left_original_image, right_original_image,
-    last_pdf_directory, fecha_escaneo,
-    fecha_entrega,
-    no_feet_report=False
-):
-    # Validate input types for directories and dates
-    if not isinstance(last_pdf_directory, (str, bytes, os.PathLike)):
-        raise TypeError("El parámetro 'last_pdf_directory' debe ser una cadena que representa una ruta válida.")
-    if not isinstance(fecha_entrega, (datetime.date, datetime.datetime, str)):
-        raise TypeError("El parámetro 'fecha_entrega' debe ser una cadena con formato 'dd/mm/yyyy' o un objeto datetime.")
-    if not isinstance(fecha_escaneo, (datetime.date, datetime.datetime, str)):
-        raise TypeError("El parámetro 'fecha_escaneo' debe ser una cadena con formato 'dd/mm/yyyy' o un objeto datetime.")
-
-    # Process dates
-    if isinstance(fecha_entrega, (datetime.date, datetime.datetime)):
-        entrega_date_str = fecha_entrega.strftime("%d/%m/%Y")
-    elif isinstance(fecha_entrega, str):
-        entrega_date_str = fecha_entrega
-    else:
-        raise ValueError("fecha_entrega debe ser una cadena con formato 'dd/mm/yyyy' o un objeto datetime.")
-    entrega_date_formatted = format_date_spanish(entrega_date_str)
+# Print resolution of the embedded images; None embeds the full-resolution scans as PNG
+DPI_IMAGENES = 200
+CALIDAD_JPEG = 90
+COMPRESION_PNG = 6
+
+# Size in points of an image fitted into max_width x max_height, keeping its aspect
+def tamano_en_marco(ancho, alto, max_width, max_height):
+    aspect = alto / float(ancho)
+    draw_width, draw_height = float(ancho), float(alto)
+    if draw_width > max_width:
+        draw_width = max_width
+        draw_height = max_width * aspect
+    if draw_height > max_height:
+        draw_height = max_height
+        draw_width = max_height / aspect
+    return draw_width, draw_height
 
-    if isinstance(fecha_escaneo, (datetime.date, datetime.datetime)):
-        fecha_escaneo_str = fecha_escaneo.strftime("%d/%m/%Y")
-    elif isinstance(fecha_escaneo, str):
-        fecha_escaneo_str = fecha_escaneo
+# Resize an image to the pixels it covers in its frame at `dpi` (never enlarges it)
+def ajustar_a_marco(cv_image, max_width, max_height, dpi):
+    alto, ancho = cv_image.shape[:2]
+    draw_width, draw_height = tamano_en_marco(ancho, alto, max_width, max_height)
+    if dpi is not None:
+        ancho_px = max(1, round(draw_width * dpi / 72))
+        alto_px = max(1, round(draw_height * dpi / 72))
+        if ancho_px < ancho and alto_px < alto:
+            cv_image = cv2.resize(cv_image, (ancho_px, alto_px), interpolation=cv2.INTER_AREA)
+    return cv_image, draw_width, draw_height
+
+# Overlay the logo on a heatmap, fit it to its frame and encode it as PNG
+# (flat colours compress well and stay sharp); runs in a worker thread
+def codificar_mapa_calor(cv_image, logo_path, position, max_width, max_height, dpi=DPI_IMAGENES):
+    if not isinstance(cv_image, np.ndarray):
+        raise TypeError("cv_image debe ser un objeto ndarray de OpenCV.")
+    # The logo goes on at full resolution so it looks the same at any dpi
+    cv_image_with_logo = aplicar_marca(cv_image.copy(), logo_path, position=position, scale=0.2)
+    cv_image_with_logo, draw_width, draw_height = ajustar_a_marco(cv_image_with_logo, max_width, max_height, dpi)
+    is_success, buffer = cv2.imencode(".png", cv_image_with_logo, [cv2.IMWRITE_PNG_COMPRESSION, COMPRESION_PNG])
+    if not is_success:
+        raise Exception("No se pudo convertir la imagen.")
+    return buffer, draw_width, draw_height
+
+# Flip an original image horizontally, fit it to its frame and encode it as
+# JPEG (PNG at full resolution); None if there is no image
+def codificar_original(cv_image, max_width, max_height, dpi=DPI_IMAGENES, calidad_jpeg=CALIDAD_JPEG):
+    if cv_image is None or not isinstance(cv_image, np.ndarray):
+        return None
+    reducida, draw_width, draw_height = ajustar_a_marco(cv_image, max_width, max_height, dpi)
+    flipped_image = cv2.flip(reducida, 1)
+    if dpi is None:
+        is_success, buffer = cv2.imencode(".png", flipped_image)
     else:
-        raise ValueError("fecha_escaneo debe ser una cadena con formato 'dd/mm/yyyy' o un objeto datetime.")
-    fecha_escaneo_formatted = format_date_spanish(fecha_escaneo_str)
+        is_success, buffer = cv2.imencode(".jpg", flipped_image, [cv2.IMWRITE_JPEG_QUALITY, calidad_jpeg])
+    if not is_success:
+        raise Exception("No se pudo convertir la imagen original.")
+    return buffer, draw_width, draw_height
+
+# RL image of an encoded (buffer, width, height), drawn at that size in points
+def codificada_a_rlImage(codificada):
+    buffer, draw_width, draw_height = codificada
+    return RLImage(BytesIO(buffer), width=draw_width, height=draw_height)
+
+# Used when the order number is left empty
+DEFAULT_ORDER_NUMBER = "52763"
 
-    # Generate safe file name. If order number is empty, default to 52763.
+# Default report file name: <paciente>-<orden>.pdf
+def nombre_archivo_reporte(paciente, order_number):
     safe_paciente = sanitize_filename(paciente).replace(' ', '_') if paciente.strip() else "Paciente"
     if not order_number.strip():
-        order_number = "52763"
+        order_number = DEFAULT_ORDER_NUMBER
     safe_order_number = sanitize_filename(order_number)
-    default_filename = f"{safe_paciente}-{safe_order_number}.pdf"
-    initial_path = os.path.join(last_pdf_directory, default_filename)
+    return f"{safe_paciente}-{safe_order_number}.pdf"
+
+def solicitar_ruta_pdf(paciente, order_number, last_pdf_directory, parent=None):
+    """Pregunta dónde guardar el reporte, proponiendo <paciente>-<orden>.pdf."""
+    # Imported here so the rest of the module works without Qt
+    from PyQt5.QtWidgets import QFileDialog
+
+    initial_path = os.path.join(last_pdf_directory, nombre_archivo_reporte(paciente, order_number))
 
     opciones = QFileDialog.Options()
     ruta_archivo, _ = QFileDialog.getSaveFileName(
-        None, "Guardar Reporte PDF", initial_path,
+        parent, "Guardar Reporte PDF", initial_path,
         "PDF (*.pdf)", options=opciones
     )
     if not ruta_archivo:
         raise Exception("No se seleccionó ninguna ruta para guardar el PDF.")
     if not ruta_archivo.lower().endswith('.pdf'):
         ruta_archivo += '.pdf'
+    return ruta_archivo
 
-    # Register fonts. Try to register both Roboto (regular) and Roboto-Bold.
-    try:
-        font_path = os.path.join('resources', 'Roboto-Regular.ttf')
-        if os.path.exists(font_path):
-            pdfmetrics.registerFont(TTFont('Roboto', font_path))
-        else:
-            print("Roboto font not found. Using default fonts.")
-        bold_font_path = os.path.join('resources', 'Roboto-Bold.ttf')
-        if os.path.exists(bold_font_path):
-            pdfmetrics.registerFont(TTFont('Roboto-Bold', bold_font_path))
-        else:
-            print("Roboto-Bold font not found. Bold tags might not render as expected.")
-    except Exception as e:
-        print(f"Error al registrar la fuente: {e}")
-
-    styles = getSampleStyleSheet()
-    if 'Roboto' in pdfmetrics.getRegisteredFontNames():
-        title_style = ParagraphStyle('Title', parent=styles['Title'], fontName='Roboto')
-        normal_style = ParagraphStyle('Normal', parent=styles['Normal'], fontName='Roboto', fontSize=12)
-        heading_style = ParagraphStyle(
-            'Heading', parent=styles['Heading1'], fontName='Roboto',
-            fontSize=14, leading=16, spaceAfter=12, alignment=1
-        )
-    else:
-        title_style = styles['Title']
-        normal_style = styles['Normal']
-        heading_style = ParagraphStyle(
-            name='Heading', fontSize=14, leading=16, spaceAfter=12,
-            alignment=1, fontName='Helvetica-Bold'
-        )
+# Page size of the no-feet report
+PAGINA_SIN_PIES = (1587, 2245)
 
-    # Determine which bold font to use for field labels.
-    if 'Roboto-Bold' in pdfmetrics.getRegisteredFontNames():
-        bold_font = "Roboto-Bold"
-    else:
-        bold_font = "Helvetica-Bold"
+# Validate a date (dd/mm/yyyy string or date) and spell it out in Spanish
+def formatear_fecha(fecha, nombre):
+    if isinstance(fecha, (datetime.date, datetime.datetime)):
+        fecha = fecha.strftime("%d/%m/%Y")
+    elif not isinstance(fecha, str):
+        raise TypeError(f"El parámetro '{nombre}' debe ser una cadena con formato 'dd/mm/yyyy' o un objeto datetime.")
+    return format_date_spanish(fecha)
 
+def plantilla_reporte(doc, no_feet_report=False):
+    """PageTemplate con el marco y el fondo de un reporte normal ('test') o sin pies ('no_feet')."""
+    if no_feet_report:
+        fondo = fondo_pagina(FONDO_SIN_PIES)
+        # Frame covering bottom half of the page
+        frame = Frame(doc.leftMargin, 0, doc.width, PAGINA_SIN_PIES[1] / 2, id='bottom')
+        return PageTemplate(id='no_feet', frames=frame, pagesize=PAGINA_SIN_PIES,
+                            onPage=lambda canvas_obj, doc: fondo.dibujar(canvas_obj, *PAGINA_SIN_PIES))
+    fondo = fondo_pagina(FONDO_REPORTE)
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+    return PageTemplate(id='test', frames=frame, pagesize=landscape(A4),
+                        onPage=lambda canvas_obj, doc: fondo.dibujar(canvas_obj, *landscape(A4)))
+
+def documento_reporte(destino, no_feet_report=False):
+    """BaseDocTemplate de un reporte normal (A4 apaisado) o sin pies, con su plantilla."""
     if no_feet_report:
-        PAGE_WIDTH = 1587
-        PAGE_HEIGHT = 2245
         # Set margins: 2cm left/right, 2cm top, and 0 for bottom
         doc = BaseDocTemplate(
-            ruta_archivo, 
-            pagesize=(PAGE_WIDTH, PAGE_HEIGHT),
+            destino,
+            pagesize=PAGINA_SIN_PIES,
             leftMargin=2*cm,
             rightMargin=2*cm,
             topMargin=2*cm,
             bottomMargin=0
         )
-        
-        def add_no_feet_background(canvas_obj, doc):
-            bg_image_path = os.path.join('resources', 'bg_no_feet.jpg')
-            if os.path.exists(bg_image_path):
-                canvas_obj.saveState()
-                canvas_obj.drawImage(bg_image_path, 0, 0, 
-                                width=PAGE_WIDTH, height=PAGE_HEIGHT)
-                canvas_obj.restoreState()
+    else:
+        doc = BaseDocTemplate(destino, pagesize=landscape(A4))
+    doc.addPageTemplates([plantilla_reporte(doc, no_feet_report)])
+    return doc
 
-        # Frame covering bottom half of the page
-        frame = Frame(
-            doc.leftMargin,  # 2cm left margin
-            0,  # Start at bottom of page
-            doc.width,  # Calculated width
-            PAGE_HEIGHT/2,  # Half page height
-            id='bottom'
-        )
-        
-        template = PageTemplate(id='no_feet', frames=frame, 
-                            onPage=add_no_feet_background)
-        doc.addPageTemplates([template])
-
-        # Increase base font size for no-feet report
-        if 'Roboto' in pdfmetrics.getRegisteredFontNames():
-            normal_style = ParagraphStyle('Normal', 
-                parent=styles['Normal'], 
-                fontName='Roboto', 
-                fontSize=32,
-                leading=80  # Add line spacing
-            )
-        else:
-            normal_style = ParagraphStyle(
-                name='Normal', 
-                fontSize=32,
-                leading=80,
-                fontName='Helvetica'
-            )
+# Largest size in points of each image in the normal report layout of `doc`
+def marco_imagenes(doc):
+    return (doc.width - 6 * cm) / 4, doc.height / 2
+
+def codificar_imagenes_reporte(
+    left_heatmap_image, right_heatmap_image,
+    left_original_image, right_original_image,
+    dpi=DPI_IMAGENES, calidad_jpeg=CALIDAD_JPEG
+):
+    """Las cuatro imágenes del reporte codificadas para su marco.
+
+    Devuelve [original izquierdo, original derecho, mapa izquierdo, mapa
+    derecho]; cada una es (buffer, ancho, alto) o None si falta el original.
+    Pasarlas a generate_pdf_report(codificadas=...) genera el reporte otra
+    vez (p. ej. tras corregir los datos del paciente) sin volver a codificar.
+    """
+    max_image_width, max_image_height = marco_imagenes(documento_reporte(None))
+    logo_path = ruta_recurso('logo_square.png')
+
+    # Encode the four images in parallel; OpenCV releases the GIL while encoding
+    trabajos = [
+        (codificar_original, left_original_image, max_image_width, max_image_height, dpi, calidad_jpeg),
+        (codificar_original, right_original_image, max_image_width, max_image_height, dpi, calidad_jpeg),
+        (codificar_mapa_calor, left_heatmap_image, logo_path, 'bottom_left', max_image_width, max_image_height, dpi),
+        (codificar_mapa_calor, right_heatmap_image, logo_path, 'bottom_right', max_image_width, max_image_height, dpi),
+    ]
+    return mapear(lambda trabajo: trabajo[0](*trabajo[1:]), trabajos)
+
+def elementos_reporte(
+    doc, paciente, telefono, order_number, sucursal, taller,
+    longitud_pie, material, observaciones,
+    left_heatmap_image, right_heatmap_image,
+    left_original_image, right_original_image,
+    fecha_escaneo_formatted, entrega_date_formatted,
+    no_feet_report=False, dpi=DPI_IMAGENES, calidad_jpeg=CALIDAD_JPEG, codificadas=None
+):
+    """Flowables del reporte de un paciente, para el diseño de `doc` (ver documento_reporte).
+
+    `codificadas` es el resultado de codificar_imagenes_reporte; sin él se
+    codifican las imágenes.
+    """
+    recursos = recursos_reporte()
+    normal_style = recursos.normal
+    bold_font = recursos.bold_font
+    if not order_number.strip():
+        order_number = DEFAULT_ORDER_NUMBER
+
+    if no_feet_report:
+        normal_style = recursos.normal_sin_pies
 
         elements = []
         elements.append(Spacer(1, 72))  # Increased top spacing
@@ -239,200 +281,181 @@ def generate_pdf_report(
         ))
         
         if observaciones.strip():
-            observaciones_style = ParagraphStyle(
-                'Observaciones', 
-                parent=normal_style,
-                spaceBefore=0,
-                spaceAfter=0
-            )
+            observaciones_style = recursos.observaciones_sin_pies
             elements.append(Paragraph(f"<font name='{bold_font}'>Observaciones:</font>", observaciones_style))
             elements.append(Paragraph(observaciones, observaciones_style))
-        
-        doc.build(elements)
-        print("Reporte PDF generado exitosamente (sin imágenes de pies).")
-        return ruta_archivo
-    else:
-        # Normal report layout (with images)
-        doc = BaseDocTemplate(ruta_archivo, pagesize=landscape(A4))
-        def add_background(canvas_obj, doc):
-            bg_image_path = os.path.join('resources', 'background.jpeg')
-            if os.path.exists(bg_image_path):
-                canvas_obj.saveState()
-                try:
-                    canvas_obj.drawImage(bg_image_path, 0, 0, width=landscape(A4)[0], height=landscape(A4)[1])
-                except Exception as e:
-                    print(f"Error al dibujar la imagen de fondo: {e}")
-                canvas_obj.restoreState()
-            else:
-                print("Imagen de fondo no encontrada.")
-        frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
-        template = PageTemplate(id='test', frames=frame, onPage=add_background)
-        doc.addPageTemplates([template])
-        elements = []
-        elements.append(Spacer(1, 24))
-        # Use the global create_patient_info_table (with bold field labels)
-        elements.append(create_patient_info_table(
-            paciente, telefono, order_number, sucursal,
-            material, taller, fecha_escaneo_formatted, entrega_date_formatted,
-            longitud_pie, normal_style, doc, bold_font
-        ))
-        
-        # Helper to overlay a logo and convert a cv image to an RL image (used for heatmaps)
-        def cv_image_to_Image_with_logo(cv_image, logo_path, position, max_width, max_height):
-            if not isinstance(cv_image, np.ndarray):
-                raise TypeError("cv_image debe ser un objeto ndarray de OpenCV.")
-            def overlay_logo(imagen, logo_path, position='bottom_right', scale=0.2):
-                if not os.path.exists(logo_path):
-                    print(f"Archivo de logo no encontrado en {logo_path}. Saltando superposición del logo.")
-                    return imagen
-                logo = cv2.imread(logo_path, cv2.IMREAD_UNCHANGED)
-                if logo is None:
-                    print(f"Fallo al cargar el logo desde {logo_path}. Saltando superposición del logo.")
-                    return imagen
-                h_img, w_img = imagen.shape[:2]
-                h_logo, w_logo = logo.shape[:2]
-                logo_width = int(w_img * scale)
-                aspect_ratio = w_logo / h_logo
-                logo_height = int(logo_width / aspect_ratio)
-                if logo_height > h_img or logo_width > w_img:
-                    return imagen
-                logo_resized = cv2.resize(logo, (logo_width, logo_height), interpolation=cv2.INTER_AREA)
-                if position == 'bottom_right':
-                    x = w_img - logo_width - 60
-                    y = h_img - logo_height
-                elif position == 'bottom_left':
-                    x = 60
-                    y = h_img - logo_height
-                else:
-                    x = 10
-                    y = 10
-                if x < 0 or y < 0 or x + logo_width > w_img or y + logo_height > h_img:
-                    return imagen
-                if logo_resized.shape[2] == 4:
-                    alpha_logo = logo_resized[:, :, 3] / 255.0
-                    for c in range(0, 3):
-                        imagen[y:y + logo_height, x:x + logo_width, c] = (
-                            alpha_logo * logo_resized[:, :, c] +
-                            (1 - alpha_logo) * imagen[y:y + logo_height, x:x + logo_width, c]
-                        )
-                else:
-                    imagen[y:y + logo_height, x:x + logo_width] = logo_resized
-                return imagen
-            cv_image_with_logo = overlay_logo(cv_image.copy(), logo_path, position=position, scale=0.2)
-            is_success, buffer = cv2.imencode(".png", cv_image_with_logo)
-            if not is_success:
-                raise Exception("No se pudo convertir la imagen.")
-            image_stream = BytesIO(buffer)
-            img = RLImage(image_stream)
-            img_width, img_height = img.wrap(0, 0)
-            aspect = img_height / float(img_width)
-            if img_width > max_width:
-                img.drawWidth = max_width
-                img.drawHeight = max_width * aspect
-            if img.drawHeight > max_height:
-                img.drawHeight = max_height
-                img.drawWidth = max_height / aspect
-            return img
-
-        small_space_between_elements = 0.5 * cm
-        large_space_between_pairs = 2 * cm
-        max_image_width = (doc.width - 6 * cm) / 4
-        max_image_height = doc.height / 2
-
-        logo_path = os.path.join('resources', 'logo_square.png')
-        
-        # --- New: Convert and flip original images horizontally ---
-        def cv_image_to_rlImage(cv_image, max_width, max_height):
-            if not isinstance(cv_image, np.ndarray):
-                raise TypeError("cv_image debe ser un objeto ndarray de OpenCV.")
-            # Flip the original image horizontally
-            flipped_image = cv2.flip(cv_image, 1)
-            is_success, buffer = cv2.imencode(".png", flipped_image)
-            if not is_success:
-                raise Exception("No se pudo convertir la imagen original.")
-            image_stream = BytesIO(buffer)
-            img = RLImage(image_stream)
-            img_width, img_height = img.wrap(0, 0)
-            aspect = img_height / float(img_width)
-            if img_width > max_width:
-                img.drawWidth = max_width
-                img.drawHeight = max_width * aspect
-            if img.drawHeight > max_height:
-                img.drawHeight = max_height
-                img.drawWidth = max_height / aspect
-            return img
-
-        if left_original_image is not None and isinstance(left_original_image, np.ndarray):
-            left_original_rl = cv_image_to_rlImage(left_original_image, max_image_width, max_image_height)
-        else:
-            left_original_rl = Spacer(1, max_image_height)
-        
-        if right_original_image is not None and isinstance(right_original_image, np.ndarray):
-            right_original_rl = cv_image_to_rlImage(right_original_image, max_image_width, max_image_height)
-        else:
-            right_original_rl = Spacer(1, max_image_height)
-        # --- End New Section ---
-
-        left_heatmap_img = cv_image_to_Image_with_logo(
-            left_heatmap_image,
-            logo_path,
-            position='bottom_left',
-            max_width=max_image_width,
-            max_height=max_image_height
-        )
-        right_heatmap_img = cv_image_to_Image_with_logo(
-            right_heatmap_image,
-            logo_path,
-            position='bottom_right',
-            max_width=max_image_width,
-            max_height=max_image_height
+        return elements
+
+    # Normal report layout (with images)
+    elements = []
+    elements.append(Spacer(1, 24))
+    # Use the global create_patient_info_table (with bold field labels)
+    elements.append(create_patient_info_table(
+        paciente, telefono, order_number, sucursal,
+        material, taller, fecha_escaneo_formatted, entrega_date_formatted,
+        longitud_pie, normal_style, doc, bold_font
+    ))
+    
+    small_space_between_elements = 0.5 * cm
+    large_space_between_pairs = 2 * cm
+    max_image_width, max_image_height = marco_imagenes(doc)
+    if codificadas is None:
+        codificadas = codificar_imagenes_reporte(
+            left_heatmap_image, right_heatmap_image,
+            left_original_image, right_original_image,
+            dpi, calidad_jpeg
         )
-        adjusted_image_width = (doc.width - (2 * small_space_between_elements) - large_space_between_pairs) / 4
-
-        # Create images table with both original and processed (heatmap) images.
-        data_images = [
-            [left_original_rl, Spacer(1, small_space_between_elements), right_original_rl,
-             Spacer(1, large_space_between_pairs), left_heatmap_img, Spacer(1, small_space_between_elements), right_heatmap_img]
-        ]
-        colWidths = [
-            adjusted_image_width,
-            small_space_between_elements,
-            adjusted_image_width,
-            large_space_between_pairs,
-            adjusted_image_width,
-            small_space_between_elements,
-            adjusted_image_width
-        ]
-        table_images = Table(data_images, colWidths=colWidths, hAlign='CENTER')
-        table_images.setStyle(TableStyle([
-            ('BOX', (0, 0), (0, 0), 1, colors.black),
-            ('BOX', (2, 0), (2, 0), 1, colors.black),
-            ('BOX', (4, 0), (4, 0), 1, colors.black),
-            ('BOX', (6, 0), (6, 0), 1, colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-        ]))
+
+    if codificadas[0] is not None:
+        left_original_rl = codificada_a_rlImage(codificadas[0])
+    else:
+        left_original_rl = Spacer(1, max_image_height)
+
+    if codificadas[1] is not None:
+        right_original_rl = codificada_a_rlImage(codificadas[1])
+    else:
+        right_original_rl = Spacer(1, max_image_height)
+
+    left_heatmap_img = codificada_a_rlImage(codificadas[2])
+    right_heatmap_img = codificada_a_rlImage(codificadas[3])
+    adjusted_image_width = (doc.width - (2 * small_space_between_elements) - large_space_between_pairs) / 4
+
+    # Create images table with both original and processed (heatmap) images.
+    data_images = [
+        [left_original_rl, Spacer(1, small_space_between_elements), right_original_rl,
+         Spacer(1, large_space_between_pairs), left_heatmap_img, Spacer(1, small_space_between_elements), right_heatmap_img]
+    ]
+    colWidths = [
+        adjusted_image_width,
+        small_space_between_elements,
+        adjusted_image_width,
+        large_space_between_pairs,
+        adjusted_image_width,
+        small_space_between_elements,
+        adjusted_image_width
+    ]
+    table_images = Table(data_images, colWidths=colWidths, hAlign='CENTER')
+    table_images.setStyle(TableStyle([
+        ('BOX', (0, 0), (0, 0), 1, colors.black),
+        ('BOX', (2, 0), (2, 0), 1, colors.black),
+        ('BOX', (4, 0), (4, 0), 1, colors.black),
+        ('BOX', (6, 0), (6, 0), 1, colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 10),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+        ('TOPPADDING', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ]))
+    elements.append(Spacer(1, 24))
+    elements.append(table_images)
+    if observaciones.strip():
+        elements.append(Spacer(1, 4))
+        observaciones_heading = Paragraph(f"<font name='{bold_font}'>Observaciones:</font>", normal_style)
+        elements.append(observaciones_heading)
+        observaciones_content = Paragraph(observaciones, normal_style)
+        elements.append(observaciones_content)
         elements.append(Spacer(1, 24))
-        elements.append(table_images)
-        if observaciones.strip():
-            elements.append(Spacer(1, 4))
-            observaciones_heading = Paragraph(f"<font name='{bold_font}'>Observaciones:</font>", normal_style)
-            elements.append(observaciones_heading)
-            observaciones_content = Paragraph(observaciones, normal_style)
-            elements.append(observaciones_content)
-            elements.append(Spacer(1, 24))
-        doc.build(elements)
-        print("Reporte PDF generado exitosamente.")
-        if material.lower() in ["biomecanica", "biomecánica"]:
-            base_filename = os.path.splitext(ruta_archivo)[0]
-            if left_original_image is not None and not np.all(left_original_image==255):
-                left_image_path = f"{base_filename}-i.png"
-                cv2.imwrite(left_image_path, left_original_image)
-            if right_original_image is not None and not np.all(right_original_image==255):
-                right_image_path = f"{base_filename}-d.png"
-                cv2.imwrite(right_image_path, right_original_image)
+    return elements
+
+def generate_pdf_report(
+    paciente, telefono, order_number, sucursal, taller,
+    longitud_pie, material, observaciones,
+    left_skin_image, right_skin_image,
+    left_heatmap_image, right_heatmap_image,
+    left_original_image, right_original_image,
+    last_pdf_directory, fecha_escaneo,
+    fecha_entrega,
+    no_feet_report=False,
+    ruta_archivo=None,
+    dpi=DPI_IMAGENES,
+    calidad_jpeg=CALIDAD_JPEG,
+    codificadas=None,
+    left_is_placeholder=False,
+    right_is_placeholder=False
+):
+    """Genera el reporte PDF y devuelve su ruta.
+
+    `ruta_archivo` puede ser una ruta o un archivo binario abierto (p. ej.
+    BytesIO); en ese caso no se exportan las imágenes de Biomecánica. Sin
+    `ruta_archivo` se pregunta con un diálogo de guardado de Qt, así que debe
+    llamarse desde el hilo de la interfaz; los trabajos en segundo plano y el
+    modo sin interfaz pasan la ruta.
+
+    Las imágenes se reducen a los píxeles de su marco a `dpi` (los
+    originales en JPEG con `calidad_jpeg`, los mapas de calor en PNG);
+    dpi=None las incrusta a resolución completa. Con `codificadas` (de
+    codificar_imagenes_reporte) se usan esas imágenes tal cual.
+
+    Con material Biomecánica los originales se exportan junto al PDF en
+    segundo plano (ver scan_export; scan_export.esperar() espera a que
+    terminen), salvo los marcados con left/right_is_placeholder.
+    """
+    # Validate input types for directories and dates
+    if not isinstance(last_pdf_directory, (str, bytes, os.PathLike)):
+        raise TypeError("El parámetro 'last_pdf_directory' debe ser una cadena que representa una ruta válida.")
+    entrega_date_formatted = formatear_fecha(fecha_entrega, 'fecha_entrega')
+    fecha_escaneo_formatted = formatear_fecha(fecha_escaneo, 'fecha_escaneo')
+
+    if not order_number.strip():
+        order_number = DEFAULT_ORDER_NUMBER
+    if ruta_archivo is None:
+        ruta_archivo = solicitar_ruta_pdf(paciente, order_number, last_pdf_directory)
+
+    doc = documento_reporte(ruta_archivo, no_feet_report)
+    doc.build(elementos_reporte(
+        doc, paciente, telefono, order_number, sucursal, taller,
+        longitud_pie, material, observaciones,
+        left_heatmap_image, right_heatmap_image,
+        left_original_image, right_original_image,
+        fecha_escaneo_formatted, entrega_date_formatted,
+        no_feet_report, dpi, calidad_jpeg, codificadas
+    ))
+    if no_feet_report:
+        print("Reporte PDF generado exitosamente (sin imágenes de pies).")
         return ruta_archivo
+    print("Reporte PDF generado exitosamente.")
+    if isinstance(ruta_archivo, (str, os.PathLike)):
+        exportar_originales(
+            os.fspath(ruta_archivo), material, left_original_image, right_original_image,
+            left_is_placeholder, right_is_placeholder
+        )
+    return ruta_archivo
+
+def generate_combined_pdf_report(reportes, ruta_archivo, dpi=DPI_IMAGENES, calidad_jpeg=CALIDAD_JPEG):
+    """Un solo PDF con los reportes de varios pacientes, cada uno desde una página nueva.
+
+    `reportes` son diccionarios con los argumentos de generate_pdf_report
+    (los de last_pdf_directory y ruta_archivo se ignoran). Con 'codificadas'
+    (de codificar_imagenes_reporte) no hacen falta los arreglos de imagen.
+    Los fondos y las fuentes quedan una sola vez en el archivo. No exporta
+    las imágenes de Biomecánica.
+    """
+    reportes = list(reportes)
+    if not reportes:
+        raise ValueError("No hay reportes que combinar.")
+    # One layout per report type; the first report's layout starts the document
+    disenos = {sin_pies: documento_reporte(None, sin_pies) for sin_pies in (False, True)}
+    primero = bool(reportes[0].get('no_feet_report', False))
+    doc = BaseDocTemplate(ruta_archivo, pagesize=disenos[primero].pagesize)
+    doc.addPageTemplates([disenos[primero].pageTemplates[0], disenos[not primero].pageTemplates[0]])
+
+    elements = []
+    for indice, datos in enumerate(reportes):
+        no_feet_report = bool(datos.get('no_feet_report', False))
+        if indice > 0:
+            elements.append(NextPageTemplate('no_feet' if no_feet_report else 'test'))
+            elements.append(PageBreak())
+        elements.extend(elementos_reporte(
+            disenos[no_feet_report], datos['paciente'], datos['telefono'], datos['order_number'],
+            datos['sucursal'], datos['taller'], datos['longitud_pie'], datos['material'],
+            datos['observaciones'],
+            datos.get('left_heatmap_image'), datos.get('right_heatmap_image'),
+            datos.get('left_original_image'), datos.get('right_original_image'),
+            formatear_fecha(datos['fecha_escaneo'], 'fecha_escaneo'),
+            formatear_fecha(datos['fecha_entrega'], 'fecha_entrega'),
+            no_feet_report, dpi, calidad_jpeg, datos.get('codificadas')
+        ))
+    doc.build(elements)
+    print(f"Reporte PDF combinado generado exitosamente ({len(reportes)} pacientes).")
+    return ruta_archivo
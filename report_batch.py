@@ -0,0 +1,244 @@
+# report_batch.py
+"""Reportes PDF sin interfaz gráfica, uno a uno o por lotes desde un manifiesto.
+
+Uso:
+    python report_batch.py <manifiesto.csv|json> --salida <carpeta> [--procesos N]
+    python report_batch.py <manifiesto.csv|json> --combinado <reporte.pdf> [--procesos N]
+
+Cada fila del manifiesto es un paciente con las columnas paciente, telefono,
+order_number, sucursal, taller, longitud_pie, material, observaciones,
+fecha_escaneo, fecha_entrega (dd/mm/yyyy) y las rutas pie_izquierdo y
+pie_derecho (vacías si falta el pie; rutas relativas al manifiesto). Cada
+reporte se guarda como <paciente>-<orden>.pdf, igual que en la interfaz; si
+dos filas dan el mismo nombre, las siguientes llevan un sufijo
+(<paciente>-<orden>-2.pdf, ...) en lugar de sobrescribirse.
+Con --combinado todos los pacientes van, en orden, en un solo PDF.
+
+Este módulo no importa PyQt5.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import report_resources
+import scan_export
+from batch import inicializar_proceso, leer_manifiesto
+from image_io import leer_imagen
+from image_processing import segmentar_imagen
+from pdf_report import (
+    codificar_imagenes_reporte, formatear_fecha, generate_combined_pdf_report, generate_pdf_report,
+    nombre_archivo_reporte,
+)
+
+CAMPOS_PACIENTE = (
+    "paciente", "telefono", "order_number", "sucursal", "taller",
+    "longitud_pie", "material", "observaciones", "fecha_escaneo", "fecha_entrega",
+)
+COLUMNAS_IMAGEN = ("pie_izquierdo", "pie_derecho")
+
+
+def hay_imagen(imagen):
+    return imagen is not None and not (isinstance(imagen, str) and not imagen.strip())
+
+
+def preparar_pie(imagen, foot_side):
+    """(original, piel, mapa de calor) de un pie a partir de un arreglo o una ruta.
+
+    Sin imagen devuelve tres lienzos blancos, como la interfaz.
+    """
+    if not hay_imagen(imagen):
+        blank_image = np.ones((600, 600, 3), dtype=np.uint8) * 255
+        return blank_image, blank_image.copy(), blank_image.copy()
+    if not isinstance(imagen, np.ndarray):
+        imagen = leer_imagen(imagen)
+    segmentacion = segmentar_imagen(image=imagen, foot_side=foot_side)
+    return imagen, segmentacion.render_piel(), segmentacion.render_mapa_calor()
+
+
+def preparar_reporte(imagen_izquierda=None, imagen_derecha=None, **datos):
+    """Argumentos de generate_pdf_report (sin destino) para un paciente.
+
+    Las imágenes son los escaneos originales (arreglos de OpenCV o rutas) y
+    `datos` los campos de CAMPOS_PACIENTE; los que falten quedan vacíos.
+    """
+    campos = {campo: str(datos.get(campo) or "") for campo in CAMPOS_PACIENTE}
+    left_original, left_skin, left_heatmap = preparar_pie(imagen_izquierda, "left")
+    right_original, right_skin, right_heatmap = preparar_pie(imagen_derecha, "right")
+    return dict(
+        campos,
+        left_skin_image=left_skin,
+        right_skin_image=right_skin,
+        left_heatmap_image=left_heatmap,
+        right_heatmap_image=right_heatmap,
+        left_original_image=left_original,
+        right_original_image=right_original,
+        no_feet_report=not hay_imagen(imagen_izquierda) and not hay_imagen(imagen_derecha),
+        left_is_placeholder=not hay_imagen(imagen_izquierda),
+        right_is_placeholder=not hay_imagen(imagen_derecha),
+    )
+
+
+def generar_reporte(destino, imagen_izquierda=None, imagen_derecha=None, **datos):
+    """Genera el reporte de un paciente en `destino` (ruta o archivo binario como BytesIO).
+
+    Los argumentos son los de preparar_reporte.
+    """
+    return generate_pdf_report(
+        **preparar_reporte(imagen_izquierda, imagen_derecha, **datos),
+        last_pdf_directory=os.path.dirname(destino) if isinstance(destino, str) else "",
+        ruta_archivo=destino,
+    )
+
+
+def preparar_fila(fila):
+    """preparar_reporte de una fila del manifiesto; se ejecuta en un proceso del pool."""
+    return preparar_reporte(
+        fila.get('pie_izquierdo'), fila.get('pie_derecho'),
+        **{campo: fila.get(campo) for campo in CAMPOS_PACIENTE},
+    )
+
+
+def destinos_unicos(filas, directorio_salida):
+    """Ruta del reporte de cada fila en `directorio_salida`, sin repetir ninguna.
+
+    Las filas con el mismo paciente y orden (o ambos vacíos) reciben
+    <nombre>-2.pdf, <nombre>-3.pdf, ... en el orden del manifiesto.
+    """
+    destinos, usados = [], set()
+    for fila in filas:
+        nombre = nombre_archivo_reporte(fila.get('paciente') or "", fila.get('order_number') or "")
+        base, extension = os.path.splitext(nombre)
+        candidato, n = nombre, 1
+        # Compared without case so names that differ only in case do not clash on Windows or macOS
+        while candidato.casefold() in usados:
+            n += 1
+            candidato = f"{base}-{n}{extension}"
+        usados.add(candidato.casefold())
+        destinos.append(os.path.join(directorio_salida, candidato))
+    return destinos
+
+
+def generar_fila(tarea):
+    """Genera el reporte de una fila del manifiesto en `destino`; se ejecuta en un proceso del pool."""
+    fila, destino = tarea
+    inicio = time.perf_counter()
+    # Whether this report reused the fonts and styles loaded by an earlier one
+    reutilizados = report_resources.cargados()
+    try:
+        generar_reporte(
+            destino,
+            imagen_izquierda=fila.get('pie_izquierdo'),
+            imagen_derecha=fila.get('pie_derecho'),
+            **{campo: fila.get(campo) for campo in CAMPOS_PACIENTE},
+        )
+        # Pool processes exit without joining threads, so finish the exports here
+        scan_export.esperar()
+        error = None
+    except Exception as e:
+        error = str(e)
+    ahorro = report_resources.recursos_reporte().segundos_carga if reutilizados else 0.0
+    return {'destino': destino, 'segundos': time.perf_counter() - inicio, 'error': error,
+            'segundos_recursos_ahorrados': ahorro}
+
+
+def codificar_fila(fila):
+    """Reporte de una fila del manifiesto listo para el PDF combinado; se ejecuta en un proceso del pool.
+
+    Devuelve {'reporte': ..., 'error': None} donde el reporte sólo lleva los
+    campos de texto y las imágenes ya codificadas (codificar_imagenes_reporte),
+    así que al proceso principal no vuelven los arreglos a resolución
+    completa. Si la fila falla, 'reporte' es None y 'error' el mensaje.
+    """
+    try:
+        datos = preparar_fila(fila)
+        # Dates are formatted again when the document is built; a failure shows up here, tied to its row
+        for campo in ('fecha_escaneo', 'fecha_entrega'):
+            formatear_fecha(datos[campo], campo)
+        codificadas = None
+        if not datos['no_feet_report']:
+            codificadas = codificar_imagenes_reporte(
+                datos['left_heatmap_image'], datos['right_heatmap_image'],
+                datos['left_original_image'], datos['right_original_image'],
+            )
+        reporte = {campo: datos[campo] for campo in CAMPOS_PACIENTE}
+        reporte.update(no_feet_report=datos['no_feet_report'], codificadas=codificadas)
+        return {'reporte': reporte, 'error': None}
+    except Exception as e:
+        return {'reporte': None, 'error': str(e)}
+
+
+def generar_combinado(filas, destino, procesos):
+    """Segmenta y codifica las filas en el pool y escribe todos los reportes en el PDF `destino`.
+
+    Las filas que fallan se omiten del documento y se informan al final.
+    """
+    inicio = time.perf_counter()
+    if procesos <= 1:
+        resultados = [codificar_fila(fila) for fila in filas]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=inicializar_proceso) as pool:
+            resultados = list(pool.map(codificar_fila, filas, chunksize=1))
+    reportes = [r['reporte'] for r in resultados if r['error'] is None]
+    fallidos = [(fila, r['error']) for fila, r in zip(filas, resultados) if r['error'] is not None]
+    if reportes:
+        directorio = os.path.dirname(destino)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        generate_combined_pdf_report(reportes, destino)
+        segundos = time.perf_counter() - inicio
+        print(f"{len(reportes)} pacientes en {destino} en {segundos:.2f} s")
+    for fila, error in fallidos:
+        nombre = nombre_archivo_reporte(fila.get('paciente') or "", fila.get('order_number') or "")
+        print(f"Error en {nombre}: {error}", file=sys.stderr)
+    return 1 if fallidos else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reportes PDF por lotes de Orto-Flex Scanner.")
+    parser.add_argument("manifiesto", help="CSV o JSON con una fila por paciente.")
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument("--salida", help="Carpeta donde escribir los reportes.")
+    destino.add_argument("--combinado", help="PDF único con los reportes de todos los pacientes.")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    filas = leer_manifiesto(args.manifiesto, COLUMNAS_IMAGEN)
+    if not filas:
+        parser.error("El manifiesto no tiene pacientes.")
+    if args.combinado:
+        return generar_combinado(filas, args.combinado, args.procesos)
+    os.makedirs(args.salida, exist_ok=True)
+    destinos = destinos_unicos(filas, args.salida)
+    for fila, destino_fila in zip(filas, destinos):
+        nombre = nombre_archivo_reporte(fila.get('paciente') or "", fila.get('order_number') or "")
+        if os.path.basename(destino_fila) != nombre:
+            print(f"{nombre} está repetido en el manifiesto; se guarda como {os.path.basename(destino_fila)}",
+                  file=sys.stderr)
+    tareas = list(zip(filas, destinos))
+
+    inicio = time.perf_counter()
+    if args.procesos <= 1:
+        resultados = [generar_fila(tarea) for tarea in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=args.procesos, initializer=inicializar_proceso) as pool:
+            resultados = list(pool.map(generar_fila, tareas, chunksize=1))
+    segundos = time.perf_counter() - inicio
+
+    fallidos = [r for r in resultados if r['error']]
+    generados = len(resultados) - len(fallidos)
+    print(f"{generados} reportes en {segundos:.2f} s ({generados / segundos:.2f} reportes/s, "
+          f"{max(1, args.procesos)} procesos)")
+    ahorro = sum(r['segundos_recursos_ahorrados'] for r in resultados)
+    print(f"Fuentes y estilos cargados una vez por proceso: {1000 * ahorro / len(resultados):.1f} ms "
+          f"ahorrados por reporte")
+    for resultado in fallidos:
+        print(f"Error en {resultado['destino']}: {resultado['error']}", file=sys.stderr)
+    return 1 if fallidos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# report_resources.py
+"""Fuentes, estilos de párrafo y fondos de página del reporte, cargados una sola vez por proceso.
+
+Leer Roboto con TTFont y armar la hoja de estilos cuesta lo mismo en cada
+reporte y el resultado nunca cambia, así que se hace la primera vez que se
+piden y se comparte entre reportes e hilos. Los estilos no se modifican
+después de crearlos. Los fondos de página se comprueban una vez por ruta.
+"""
+import functools
+import os
+import threading
+import time
+
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from asset_registry import ruta_recurso
+
+RUTA_FUENTE = ruta_recurso('Roboto-Regular.ttf')
+RUTA_FUENTE_NEGRITA = ruta_recurso('Roboto-Bold.ttf')
+FONDO_REPORTE = ruta_recurso('background.jpeg')
+FONDO_SIN_PIES = ruta_recurso('bg_no_feet.jpg')
+
+
+class RecursosReporte:
+    """Estilos del reporte normal (title, normal, heading), del reporte sin pies
+    (normal_sin_pies, observaciones_sin_pies) y la fuente de las etiquetas."""
+
+    def __init__(self):
+        inicio = time.perf_counter()
+        registrar_fuentes()
+        registradas = pdfmetrics.getRegisteredFontNames()
+        styles = getSampleStyleSheet()
+        if 'Roboto' in registradas:
+            self.title = ParagraphStyle('Title', parent=styles['Title'], fontName='Roboto')
+            self.normal = ParagraphStyle('Normal', parent=styles['Normal'], fontName='Roboto', fontSize=12)
+            self.heading = ParagraphStyle(
+                'Heading', parent=styles['Heading1'], fontName='Roboto',
+                fontSize=14, leading=16, spaceAfter=12, alignment=1
+            )
+            # Larger base font for the no-feet report
+            self.normal_sin_pies = ParagraphStyle(
+                'Normal', parent=styles['Normal'], fontName='Roboto', fontSize=32, leading=80
+            )
+        else:
+            self.title = styles['Title']
+            self.normal = styles['Normal']
+            self.heading = ParagraphStyle(
+                name='Heading', fontSize=14, leading=16, spaceAfter=12,
+                alignment=1, fontName='Helvetica-Bold'
+            )
+            self.normal_sin_pies = ParagraphStyle(
+                name='Normal', fontSize=32, leading=80, fontName='Helvetica'
+            )
+        self.observaciones_sin_pies = ParagraphStyle(
+            'Observaciones', parent=self.normal_sin_pies, spaceBefore=0, spaceAfter=0
+        )
+        # Bold font for the field labels
+        self.bold_font = "Roboto-Bold" if 'Roboto-Bold' in registradas else "Helvetica-Bold"
+        self.segundos_carga = time.perf_counter() - inicio
+
+
+def registrar_fuentes():
+    """Registra Roboto y Roboto-Bold en ReportLab si están en resources/."""
+    try:
+        if os.path.exists(RUTA_FUENTE):
+            pdfmetrics.registerFont(TTFont('Roboto', RUTA_FUENTE))
+        else:
+            print("Roboto font not found. Using default fonts.")
+        if os.path.exists(RUTA_FUENTE_NEGRITA):
+            pdfmetrics.registerFont(TTFont('Roboto-Bold', RUTA_FUENTE_NEGRITA))
+        else:
+            print("Roboto-Bold font not found. Bold tags might not render as expected.")
+    except Exception as e:
+        print(f"Error al registrar la fuente: {e}")
+
+
+_recursos = None
+_cerrojo = threading.Lock()
+
+
+def recursos_reporte():
+    """RecursosReporte compartido; la primera llamada registra las fuentes y crea los estilos."""
+    global _recursos
+    if _recursos is None:
+        with _cerrojo:
+            if _recursos is None:
+                _recursos = RecursosReporte()
+    return _recursos
+
+
+def cargados():
+    """True si este proceso ya cargó las fuentes y los estilos."""
+    return _recursos is not None
+
+
+class FondoPagina:
+    """Imagen de fondo de página, comprobada una vez.
+
+    Se dibuja desde la ruta del JPEG: ReportLab copia el JPEG tal cual al PDF
+    (sin decodificarlo ni recomprimirlo) y, como lo identifica por la ruta,
+    lo guarda una sola vez por documento aunque haya muchas páginas o
+    pacientes. Un ImageReader precargado resulta más lento, porque ReportLab
+    calcula su identidad a partir de los píxeles decodificados.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta if os.path.exists(ruta) else None
+        if self.ruta is None:
+            print(f"Imagen de fondo no encontrada: {ruta}")
+
+    def dibujar(self, canvas_obj, ancho, alto):
+        if self.ruta is None:
+            return
+        canvas_obj.saveState()
+        try:
+            canvas_obj.drawImage(self.ruta, 0, 0, width=ancho, height=alto)
+        except Exception as e:
+            print(f"Error al dibujar la imagen de fondo: {e}")
+        canvas_obj.restoreState()
+
+
+@functools.lru_cache(maxsize=None)
+def fondo_pagina(ruta):
+    """FondoPagina compartido de `ruta`."""
+    return FondoPagina(ruta)
@@ -0,0 +1,236 @@
+# result_cache.py
+"""Caché en disco de segmentaciones, direccionada por contenido.
+
+La clave es un hash de los píxeles de entrada, el lado del pie y los
+parámetros del proceso, así que volver a cargar el mismo escaneo (aunque sea
+otro archivo o después de reiniciar la aplicación) reutiliza el resultado.
+Cada entrada es un .npz con la máscara refinada empaquetada en bits, el
+contorno y las líneas; el perfil se reconstruye del contorno. Las vistas de
+piel y mapa de calor se vuelven a generar desde el recorte del pie, que a
+resolución completa se toma de la imagen de entrada (tiene los mismos
+píxeles, por la clave) y en las vistas previas se guarda en PNG; ambas cosas
+son más rápidas que decodificar vistas completas guardadas. El directorio
+tiene un límite de tamaño y se descartan primero las entradas usadas hace
+más tiempo.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+import zlib
+
+import cv2
+import numpy as np
+
+import image_processing
+from foot_geometry import PerfilPie
+from image_processing import SegmentacionPie, segmentar_imagen, segmentar_vista_previa
+from parallel import ejecutor
+from shape_cache import mascara_elipse
+
+# Bump when the stored format or the segmentation output changes
+VERSION_FORMATO = 2
+
+DIRECTORIO_CACHE = os.environ.get(
+    "ORTOFLEX_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "orto_flex")
+)
+LIMITE_BYTES = 512 * 1024 * 1024
+
+
+class CacheResultados:
+    """Caché LRU de SegmentacionPie en `directorio`, con un máximo de `limite_bytes`."""
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, limite_bytes=LIMITE_BYTES):
+        self.directorio = directorio
+        self.limite_bytes = limite_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self._cerrojo = threading.Lock()
+
+    def clave(self, imagen, foot_side, **parametros):
+        """Hash hexadecimal de los píxeles, el lado del pie y los parámetros."""
+        h = hashlib.blake2b(digest_size=20)
+        descripcion = {
+            'version': VERSION_FORMATO,
+            'forma': imagen.shape,
+            'dtype': str(imagen.dtype),
+            'foot_side': foot_side,
+            'iteraciones_cierre': image_processing.ITERACIONES_CIERRE,
+            'radio_desenfoque': image_processing.RADIO_DESENFOQUE,
+            'piel': [image_processing.LOWER_SKIN.tolist(), image_processing.UPPER_SKIN.tolist()],
+            'parametros': parametros,
+        }
+        h.update(json.dumps(descripcion, sort_keys=True).encode())
+        h.update(np.ascontiguousarray(imagen).data)
+        return h.hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave[:2], f"{clave}.npz")
+
+    def obtener(self, clave, imagen=None):
+        """SegmentacionPie guardada con `clave`, o None si no está (o no se puede leer).
+
+        `imagen` es la entrada con la que se calculó la clave; hace falta para
+        las entradas guardadas sin recorte.
+        """
+        ruta = self._ruta(clave)
+        try:
+            with np.load(ruta) as datos:
+                segmentacion = _desde_arreglos(datos, imagen)
+            # Touch the entry so eviction sees it as recently used
+            os.utime(ruta)
+        # An empty file raises EOFError; damaged compressed data, zlib.error
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile, zlib.error):
+            with self._cerrojo:
+                self.fallos += 1
+            return None
+        with self._cerrojo:
+            self.aciertos += 1
+        return segmentacion
+
+    def guardar(self, clave, segmentacion, con_recorte=True):
+        """Guarda `segmentacion`; con_recorte=False si la entrada se leerá pasando la imagen original."""
+        ruta = self._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **_a_arreglos(segmentacion, con_recorte))
+        # Write then rename so readers never see a partial entry
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(buffer.getbuffer())
+            os.replace(temporal, ruta)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        self.recortar()
+
+    def recortar(self):
+        """Borra las entradas menos usadas hasta quedar por debajo de limite_bytes."""
+        entradas = []
+        for raiz, _, archivos in os.walk(self.directorio):
+            for nombre in archivos:
+                if nombre.endswith(".npz"):
+                    ruta = os.path.join(raiz, nombre)
+                    try:
+                        info = os.stat(ruta)
+                    except OSError:
+                        continue
+                    entradas.append((info.st_mtime, info.st_size, ruta))
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except OSError:
+                continue
+            total -= tamano
+
+    def vaciar(self):
+        for raiz, _, archivos in os.walk(self.directorio):
+            for nombre in archivos:
+                if nombre.endswith(".npz"):
+                    os.remove(os.path.join(raiz, nombre))
+
+
+def _a_arreglos(segmentacion, con_recorte=True):
+    x, y, w, h = segmentacion.caja()
+    arreglos = {
+        'forma': np.array(segmentacion.mascara.shape[:2]),
+        'tamano_completo': np.array(segmentacion.tamano_completo),
+        'caja': np.array((x, y, w, h)),
+        'mascara': np.packbits(segmentacion.mascara[y:y + h, x:x + w] > 0),
+        'contorno': segmentacion.contorno,
+        'lineas': np.frombuffer(json.dumps(segmentacion.lineas).encode(), dtype=np.uint8),
+        'foot_side': np.frombuffer(segmentacion.foot_side.encode(), dtype=np.uint8),
+    }
+    if con_recorte:
+        # Only the pixels under the mask reach any view, so the skin render of
+        # the bounding box is enough to rebuild every variant.
+        x0, y0 = segmentacion.region[:2]
+        piel = image_processing.render_piel(segmentacion.imagen_region, segmentacion.mascara,
+                                            caja=(x, y, w, h), origen=(x0, y0))[y:y + h, x:x + w]
+        ok, png = cv2.imencode(".png", piel, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        if not ok:
+            raise ValueError("No se pudo codificar el recorte del pie.")
+        arreglos['recorte'] = png
+    return arreglos
+
+
+def _desde_arreglos(datos, imagen=None):
+    height, width = (int(v) for v in datos['forma'])
+    x, y, w, h = (int(v) for v in datos['caja'])
+    mascara = np.zeros((height, width), dtype=np.uint8)
+    bits = np.unpackbits(datos['mascara'], count=w * h).reshape(h, w)
+    mascara[y:y + h, x:x + w] = bits * np.uint8(255)
+    if 'recorte' in datos:
+        recorte = cv2.imdecode(datos['recorte'], cv2.IMREAD_COLOR)
+        if recorte is None or recorte.shape[:2] != (h, w):
+            raise ValueError("Recorte del pie dañado.")
+    elif imagen is not None and imagen.shape[:2] == (height, width):
+        # Same pixels segmentar_imagen saw: flipped, then masked by the ellipse
+        recorte = cv2.flip(imagen[y:y + h, width - x - w:width - x], 1)
+        recorte = cv2.bitwise_and(recorte, recorte, mask=mascara_elipse(height, width)[y:y + h, x:x + w])
+    else:
+        raise ValueError("La entrada no tiene recorte y no se dio la imagen original.")
+    lineas = {
+        nombre: tuple(tuple(p) for p in valor) if isinstance(valor[0], list) else tuple(valor)
+        for nombre, valor in json.loads(datos['lineas'].tobytes().decode()).items()
+    }
+    # The profile is rebuilt from the contour; it is a single vectorized pass
+    perfil = PerfilPie.desde_contorno(datos['contorno'])
+    return SegmentacionPie(recorte, (x, y, x + w, y + h), mascara, datos['contorno'], perfil, lineas,
+                           datos['foot_side'].tobytes().decode(), tuple(int(v) for v in datos['tamano_completo']))
+
+
+_cache = None
+_cerrojo_cache = threading.Lock()
+
+
+def cache_predeterminada():
+    """CacheResultados compartida en DIRECTORIO_CACHE."""
+    global _cache
+    with _cerrojo_cache:
+        if _cache is None:
+            _cache = CacheResultados()
+        return _cache
+
+
+def segmentar(imagen, foot_side="right", vista_previa=False, cache=None, tamano_completo=None):
+    """segmentar_imagen o segmentar_vista_previa pasando por la caché en disco.
+
+    En un fallo de caché la entrada nueva se escribe en segundo plano (en el
+    ejecutor compartido) para no retrasar el resultado; un error al escribirla
+    sólo se informa. `tamano_completo` es el de segmentar_vista_previa, para
+    vistas previas de una imagen que ya llega reducida.
+    """
+    cache = cache if cache is not None else cache_predeterminada()
+    if vista_previa:
+        parametros = {'vista_previa': image_processing.LADO_VISTA_PREVIA}
+        if tamano_completo is not None:
+            parametros['tamano_completo'] = list(tamano_completo)
+    else:
+        parametros = {'metodo_cierre': "descompuesto"}
+    clave = cache.clave(imagen, foot_side, **parametros)
+    segmentacion = cache.obtener(clave, imagen)
+    if segmentacion is not None:
+        return segmentacion
+    if vista_previa:
+        segmentacion = segmentar_vista_previa(imagen, foot_side=foot_side, tamano_completo=tamano_completo)
+    else:
+        segmentacion = segmentar_imagen(image=imagen, foot_side=foot_side)
+    # Full-resolution entries rebuild their crop from the input on a hit
+    ejecutor().submit(_guardar_en_segundo_plano, cache, clave, segmentacion, vista_previa)
+    return segmentacion
+
+
+def _guardar_en_segundo_plano(cache, clave, segmentacion, con_recorte):
+    try:
+        cache.guardar(clave, segmentacion, con_recorte)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo guardar en la caché de resultados: {e}")
@@ -0,0 +1,168 @@
+# scan_export.py
+"""Exportación de los escaneos originales junto al reporte (material Biomecánica).
+
+Cada original se guarda como <reporte>-i.png / <reporte>-d.png en un hilo
+aparte, así que el reporte queda listo sin esperar la compresión. Los pies
+que faltan se marcan explícitamente al pedir la exportación en lugar de
+buscar lienzos blancos píxel por píxel. Al volver a generar un reporte, los
+originales cuyo archivo ya tiene esos mismos píxeles no se reescriben.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+MATERIALES = ("biomecanica", "biomecánica")
+FORMATO = ".png"
+
+_cerrojo = threading.Lock()
+_ejecutor = None
+_pendientes = set()
+# Destination path -> (fingerprint, size, mtime) of the files written by this process
+_escritos = {}
+# mkstemp creates files as 0600; exported scans keep the permissions cv2.imwrite gave them
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+def requiere_exportacion(material):
+    return material.lower() in MATERIALES
+
+
+def parametros_formato(formato, compresion=None):
+    """Parámetros de cv2.imencode: `compresion` es el nivel PNG (0-9) o la calidad JPEG (0-100).
+
+    Con None se usa el valor predeterminado de OpenCV.
+    """
+    formato = formato.lower()
+    if compresion is None:
+        return []
+    if formato == ".png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, compresion]
+    if formato in (".jpg", ".jpeg"):
+        return [cv2.IMWRITE_JPEG_QUALITY, compresion]
+    return []
+
+
+def exportar_originales(ruta_reporte, material, left_original_image, right_original_image,
+                        left_is_placeholder=False, right_is_placeholder=False,
+                        formato=FORMATO, compresion=None, en_segundo_plano=True):
+    """Guarda los originales junto a `ruta_reporte` si el material es Biomecánica.
+
+    Los pies marcados como marcador de posición (o None) no se exportan.
+    Devuelve los futuros de las escrituras en segundo plano (lista vacía si
+    no hay nada que escribir o si en_segundo_plano=False).
+    """
+    if not requiere_exportacion(material):
+        return []
+    base_filename = os.path.splitext(ruta_reporte)[0]
+    futuros = []
+    for sufijo, imagen, marcador in (
+        ("i", left_original_image, left_is_placeholder),
+        ("d", right_original_image, right_is_placeholder),
+    ):
+        if imagen is None or marcador:
+            continue
+        destino = f"{base_filename}-{sufijo}{formato}"
+        if en_segundo_plano:
+            futuros.append(_enviar(destino, imagen, formato, compresion))
+        else:
+            escribir_original(destino, imagen, formato, compresion)
+    return futuros
+
+
+def escribir_original(destino, imagen, formato=FORMATO, compresion=None):
+    """Escribe `imagen` en `destino` salvo que este proceso ya le haya escrito los mismos píxeles.
+
+    Devuelve True si escribió el archivo.
+    """
+    parametros = parametros_formato(formato, compresion)
+    huella = _huella(imagen, formato, parametros)
+    if _sin_cambios(destino, huella):
+        return False
+    ok, buffer = cv2.imencode(formato, imagen, parametros)
+    if not ok:
+        raise ValueError(f"No se pudo codificar {destino}.")
+    # Write then rename so a half-written file never replaces a good one
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(destino) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(buffer.data)
+        os.chmod(temporal, 0o666 & ~_umask)
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    info = os.stat(destino)
+    with _cerrojo:
+        _escritos[destino] = (huella, info.st_size, info.st_mtime_ns)
+    return True
+
+
+def esperar(timeout=None):
+    """Espera a que terminen las exportaciones pendientes."""
+    with _cerrojo:
+        pendientes = list(_pendientes)
+    wait(pendientes, timeout=timeout)
+
+
+def _huella(imagen, formato, parametros):
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr((imagen.shape, str(imagen.dtype), formato.lower(), parametros)).encode())
+    h.update(np.ascontiguousarray(imagen).data)
+    return h.digest()
+
+
+def _sin_cambios(destino, huella):
+    with _cerrojo:
+        escrito = _escritos.get(destino)
+    if escrito is None or escrito[0] != huella:
+        return False
+    # Only trust the record while the file on disk is the one we wrote
+    try:
+        info = os.stat(destino)
+    except OSError:
+        return False
+    return (info.st_size, info.st_mtime_ns) == escrito[1:]
+
+
+def _enviar(destino, imagen, formato, compresion):
+    global _ejecutor
+    with _cerrojo:
+        if _ejecutor is None:
+            # One writer: exports queue up instead of competing with report work
+            _ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="orto-flex-export")
+        futuro = _ejecutor.submit(_escribir_en_segundo_plano, destino, imagen, formato, compresion)
+        _pendientes.add(futuro)
+    futuro.add_done_callback(_terminado)
+    return futuro
+
+
+def _terminado(futuro):
+    with _cerrojo:
+        _pendientes.discard(futuro)
+
+
+def _reiniciar_en_hijo():
+    # A forked child (e.g. a batch pool process) inherits the writer but not its thread
+    global _cerrojo, _ejecutor
+    _cerrojo = threading.Lock()
+    _ejecutor = None
+    _pendientes.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+
+
+def _escribir_en_segundo_plano(destino, imagen, formato, compresion):
+    try:
+        return escribir_original(destino, imagen, formato, compresion)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo exportar {destino}: {e}")
+        return False
@@ -0,0 +1,67 @@
+# shape_cache.py
+"""Constantes que sólo dependen de la forma del cuadro y de parámetros fijos.
+
+Los cuadros del escáner tienen siempre las mismas dimensiones, así que la
+máscara elíptica, los elementos estructurantes y las tablas de color se
+calculan una vez por combinación de parámetros y se guardan en cachés LRU
+acotadas. Los arreglos devueltos son de sólo lectura porque se comparten
+entre llamadas (y entre hilos).
+"""
+import functools
+
+import cv2
+import numpy as np
+
+TAMANO_CACHE = 8
+
+
+def solo_lectura(arreglo):
+    """Marca `arreglo` como de sólo lectura y lo devuelve; para lo que se guarda en una caché."""
+    arreglo.flags.writeable = False
+    return arreglo
+
+
+@functools.lru_cache(maxsize=TAMANO_CACHE)
+def mascara_elipse(height, width):
+    """Elipse de la zona del pie para un cuadro de `height` x `width`.
+
+    Centro en el centro del cuadro, semiejes (width // 3, height). Un recorte
+    del cuadro usa la vista correspondiente de esta misma máscara.
+    """
+    mascara = np.zeros((height, width), dtype=np.uint8)
+    cv2.ellipse(mascara, (width // 2, height // 2), (width // 3, height), 0, 0, 360, 255, -1)
+    return solo_lectura(mascara)
+
+
+@functools.lru_cache(maxsize=TAMANO_CACHE)
+def elemento_estructurante(forma, ancho, alto):
+    """cv2.getStructuringElement(forma, (ancho, alto))."""
+    return solo_lectura(cv2.getStructuringElement(forma, (ancho, alto)))
+
+
+@functools.lru_cache(maxsize=TAMANO_CACHE)
+def colores_colormap(colormap):
+    """Los 256 colores BGR de un mapa de color de OpenCV, como arreglo (256, 3)."""
+    colores = cv2.applyColorMap(np.arange(256, dtype=np.uint8).reshape(256, 1), colormap)
+    return solo_lectura(colores.reshape(256, 3))
+
+
+CACHES = {
+    'mascara_elipse': mascara_elipse,
+    'elemento_estructurante': elemento_estructurante,
+    'colores_colormap': colores_colormap,
+}
+
+
+def estadisticas():
+    """Aciertos, fallos y tamaño actual de cada caché, por nombre."""
+    resultado = {}
+    for nombre, funcion in CACHES.items():
+        info = funcion.cache_info()
+        resultado[nombre] = {'aciertos': info.hits, 'fallos': info.misses, 'tamano': info.currsize}
+    return resultado
+
+
+def limpiar():
+    for funcion in CACHES.values():
+        funcion.cache_clear()
@@ -0,0 +1,6 @@
+# conftest.py
+"""Configuración común de las pruebas: los módulos de la aplicación están en la raíz del repositorio."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
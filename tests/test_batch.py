@@ -0,0 +1,36 @@
+# test_batch.py
+"""Prefijos de salida del lote: subcarpetas conservadas y choques rechazados."""
+import os
+
+import pytest
+
+from batch import bases_salida
+
+
+def test_escaneos_de_una_carpeta(tmp_path):
+    escaneos = [(str(tmp_path / "a.jpg"), "left"), (str(tmp_path / "b.jpg"), "right")]
+    salida = str(tmp_path / "salida")
+    assert bases_salida(escaneos, salida) == [os.path.join(salida, "a-left"), os.path.join(salida, "b-right")]
+
+
+def test_mismo_nombre_en_subcarpetas(tmp_path):
+    escaneos = [(str(tmp_path / "x" / "pie.jpg"), "left"), (str(tmp_path / "y" / "pie.jpg"), "left")]
+    salida = str(tmp_path / "salida")
+    assert bases_salida(escaneos, salida) == [os.path.join(salida, "x", "pie-left"),
+                                              os.path.join(salida, "y", "pie-left")]
+
+
+@pytest.mark.parametrize("otro", ["pie.png", "PIE.jpg"])
+def test_salidas_que_chocan(tmp_path, otro):
+    escaneos = [(str(tmp_path / "pie.jpg"), "left"), (str(tmp_path / otro), "left")]
+    with pytest.raises(ValueError):
+        bases_salida(escaneos, str(tmp_path / "salida"))
+
+
+def test_misma_ruta_en_otro_objeto_no_choca(tmp_path):
+    # Equal paths built separately (e.g. read twice from a manifest) are the same scan
+    ruta = str(tmp_path / "pie.jpg")
+    copia = "".join(list(ruta))
+    assert copia is not ruta
+    bases = bases_salida([(ruta, "left"), (copia, "left")], str(tmp_path / "salida"))
+    assert bases[0] == bases[1]
@@ -0,0 +1,152 @@
+# test_foot_geometry.py
+"""Los puntos de referencia de PerfilPie frente a los del agregar_lineas original."""
+import cv2
+import numpy as np
+import pytest
+
+from foot_geometry import PerfilPie
+from image_processing import calcular_lineas, segmentar_imagen
+
+
+def lineas_original(foot_contour, height, foot_side="right"):
+    """Puntos que elegía el agregar_lineas original, sin dibujarlos.
+
+    Copia de su código; el orden por x es estable, que es lo que hace el
+    argsort original con los pocos vértices de cada franja.
+    """
+    contour_points = foot_contour.reshape(-1, 2)
+    heel_point = contour_points[contour_points[:, 1].argmax()]
+    heel_x, heel_y = heel_point
+
+    top_points = contour_points[contour_points[:, 1] <= contour_points[:, 1].min() + 0.05 * height]
+
+    if foot_side.lower() == "right":
+        big_toe_point = top_points[top_points[:, 0].argmin()]
+        little_toe_point = top_points[top_points[:, 0].argmax()]
+    else:
+        big_toe_point = top_points[top_points[:, 0].argmax()]
+        little_toe_point = top_points[top_points[:, 0].argmin()]
+
+    thumb_x, thumb_y = big_toe_point
+
+    heel_y = int(heel_y)
+    foot_height = heel_y - contour_points[:, 1].min()
+    horizontal_line_y = heel_y - int(0.1 * foot_height)
+
+    tolerance = 5
+    horizontal_points = contour_points[np.abs(contour_points[:, 1] - horizontal_line_y) <= tolerance]
+    if horizontal_points.size >= 2:
+        horizontal_points = horizontal_points[horizontal_points[:, 0].argsort(kind="stable")]
+        heel_start = horizontal_points[0]
+        heel_end = horizontal_points[-1]
+    else:
+        heel_start = (contour_points[:, 0].min(), horizontal_line_y)
+        heel_end = (contour_points[:, 0].max(), horizontal_line_y)
+
+    y_values = np.arange(int(thumb_y), heel_y, 5)
+    max_width = 0
+    metatarsal_line_y = thumb_y
+
+    for y in y_values:
+        points_at_y = contour_points[np.abs(contour_points[:, 1] - y) <= tolerance]
+        if points_at_y.size >= 2:
+            x_coords = points_at_y[:, 0]
+            width_at_y = x_coords.max() - x_coords.min()
+            if width_at_y > max_width:
+                max_width = width_at_y
+                metatarsal_line_y = y
+
+    metatarsal_points = contour_points[np.abs(contour_points[:, 1] - metatarsal_line_y) <= tolerance]
+    if metatarsal_points.size >= 2:
+        metatarsal_points = metatarsal_points[metatarsal_points[:, 0].argsort(kind="stable")]
+        start_x, end_x = metatarsal_points[0][0], metatarsal_points[-1][0]
+    else:
+        start_x, end_x = contour_points[:, 0].min(), contour_points[:, 0].max()
+
+    def punto(p):
+        return int(p[0]), int(p[1])
+
+    return {
+        'talon': (int(heel_x), heel_y),
+        'dedo_gordo': punto(big_toe_point),
+        'dedo_pequeno': punto(little_toe_point),
+        'linea_talon': (punto(heel_start), punto(heel_end)),
+        'linea_metatarso': ((int(start_x), int(metatarsal_line_y)), (int(end_x), int(metatarsal_line_y))),
+    }
+
+
+def segmentar_original(imagen):
+    """Contorno del pie con el proceso original de procesar_imagen."""
+    imagen = cv2.flip(imagen, 1)
+    height, width = imagen.shape[:2]
+    mask_ellipse = np.zeros((height, width), dtype=np.uint8)
+    cv2.ellipse(mask_ellipse, (width // 2, height // 2), (width // 3, height), 0, 0, 360, 255, -1)
+    imagen = cv2.bitwise_and(imagen, imagen, mask=mask_ellipse)
+    hsv = cv2.cvtColor(imagen, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, np.array([0, 100, 100], dtype=np.uint8), np.array([140, 255, 255], dtype=np.uint8))
+    mask = cv2.GaussianBlur(mask, (7, 7), 0)
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=35)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return max(contours, key=cv2.contourArea)
+
+
+def escaneo_sintetico(semilla, alto=900, ancho=700):
+    """Cama del escáner con un pie: planta elíptica, cinco dedos, ruido y un giro aleatorio."""
+    rng = np.random.default_rng(semilla)
+    imagen = np.full((alto, ancho, 3), 235, dtype=np.uint8)
+    piel = (60, 110, 210)
+    cx, cy = ancho // 2 + int(rng.integers(-40, 40)), alto // 2 + int(rng.integers(-30, 30))
+    ejes = (int(ancho * rng.uniform(0.12, 0.18)), int(alto * rng.uniform(0.3, 0.38)))
+    angulo = float(rng.uniform(-15, 15))
+    cv2.ellipse(imagen, (cx, cy), ejes, angulo, 0, 360, piel, -1)
+    for i in range(5):
+        radio = int(rng.integers(12, 30)) if i else 34
+        x = cx - ejes[0] + 20 + i * (2 * ejes[0] - 40) // 4
+        y = cy - ejes[1] + int(rng.integers(-10, 25))
+        cv2.circle(imagen, (x, y), radio, piel, -1)
+    ruido = rng.integers(0, 20, imagen.shape, dtype=np.uint8)
+    return cv2.add(imagen, ruido)
+
+
+def contorno_aleatorio(semilla):
+    """Contorno de un polígono estrellado aleatorio, con tramos rectos y vértices a la misma altura."""
+    rng = np.random.default_rng(semilla)
+    angulos = np.sort(rng.uniform(0, 2 * np.pi, 40))
+    radios = rng.uniform(80, 200, 40)
+    puntos = np.stack([300 + radios * np.cos(angulos), 300 + 1.8 * radios * np.sin(angulos)], axis=1)
+    # Coarse coordinates make ties in x and y common
+    puntos = (np.round(puntos / 7) * 7).astype(np.int32)
+    mascara = np.zeros((800, 600), dtype=np.uint8)
+    cv2.fillPoly(mascara, [puntos], 255)
+    contours, _ = cv2.findContours(mascara, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return max(contours, key=cv2.contourArea)
+
+
+@pytest.mark.parametrize("foot_side", ["right", "left"])
+@pytest.mark.parametrize("semilla", range(20))
+def test_lineas_iguales_al_original(semilla, foot_side):
+    contorno = contorno_aleatorio(semilla)
+    assert calcular_lineas(contorno, 800, foot_side) == lineas_original(contorno, 800, foot_side)
+
+
+@pytest.mark.parametrize("foot_side", ["right", "left"])
+@pytest.mark.parametrize("semilla", range(6))
+def test_segmentacion_da_las_lineas_originales(semilla, foot_side):
+    imagen = escaneo_sintetico(semilla)
+    segmentacion = segmentar_imagen(image=imagen, foot_side=foot_side)
+    esperadas = lineas_original(segmentar_original(imagen), imagen.shape[0], foot_side)
+    assert segmentacion.lineas == esperadas
+
+
+def test_puntos_son_vertices_del_contorno():
+    contorno = contorno_aleatorio(3)
+    vertices = {tuple(int(v) for v in p) for p in contorno.reshape(-1, 2)}
+    lineas = calcular_lineas(contorno, 800)
+    for punto in (lineas['talon'], lineas['dedo_gordo'], lineas['dedo_pequeno'], *lineas['linea_talon']):
+        assert punto in vertices
+
+
+def test_contorno_vacio():
+    with pytest.raises(ValueError):
+        PerfilPie(np.zeros((0, 1, 2), dtype=np.int32))
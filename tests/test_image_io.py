@@ -0,0 +1,224 @@
+# test_image_io.py
+"""Lectores por np.memmap de image_io frente a cv2.imread."""
+import os
+import struct
+
+import cv2
+import numpy as np
+import pytest
+
+from image_io import leer_imagen, leer_sin_comprimir, leer_vista_previa, listar_imagenes, tamano_imagen
+
+
+def imagen_aleatoria(alto, ancho, canales=3, semilla=0):
+    forma = (alto, ancho, canales) if canales > 1 else (alto, ancho)
+    return np.random.default_rng(semilla).integers(0, 256, forma, dtype=np.uint8)
+
+
+def escribir_bmp(ruta, imagen, de_arriba_abajo=False):
+    """BMP de 24 bits sin comprimir; con `de_arriba_abajo` el alto va negativo."""
+    alto, ancho = imagen.shape[:2]
+    paso = (ancho * 3 + 3) & ~3
+    filas = np.zeros((alto, paso), dtype=np.uint8)
+    filas[:, :ancho * 3] = imagen.reshape(alto, ancho * 3)
+    if not de_arriba_abajo:
+        filas = filas[::-1]
+    datos = filas.tobytes()
+    cabecera_dib = struct.pack("<IiiHHIIiiII", 40, ancho, -alto if de_arriba_abajo else alto, 1, 24, 0,
+                               len(datos), 2835, 2835, 0, 0)
+    cabecera = struct.pack("<2sIHHI", b"BM", 14 + 40 + len(datos), 0, 0, 14 + 40)
+    with open(ruta, "wb") as archivo:
+        archivo.write(cabecera + cabecera_dib + datos)
+
+
+def escribir_tiff(ruta, imagen, filas_por_tira, orden="<", separar_tiras=False):
+    """TIFF de 8 bits sin comprimir (gris o RGB) en tiras de `filas_por_tira` filas.
+
+    Con `separar_tiras` se deja un hueco entre tiras, que el lector por
+    memmap no puede tratar como un único arreglo.
+    """
+    alto, ancho = imagen.shape[:2]
+    muestras = 1 if imagen.ndim == 2 else 3
+    # TIFF stores RGB; the test images are BGR like OpenCV's
+    pixeles = imagen if muestras == 1 else imagen[:, :, ::-1]
+    tiras = [np.ascontiguousarray(pixeles[y:y + filas_por_tira]).tobytes() for y in range(0, alto, filas_por_tira)]
+    hueco = 16 if separar_tiras else 0
+
+    inicio_datos = 8
+    offsets, posicion = [], inicio_datos
+    for tira in tiras:
+        offsets.append(posicion)
+        posicion += len(tira) + hueco
+    datos = b"".join(tira + b"\0" * hueco for tira in tiras)
+
+    extra = bytearray()
+    inicio_extra = inicio_datos + len(datos)
+
+    def valores(tipo, lista):
+        # Values that do not fit in the entry go after the image data
+        formato = {3: "H", 4: "I"}[tipo]
+        empaquetado = struct.pack(orden + formato * len(lista), *lista)
+        if len(empaquetado) <= 4:
+            return empaquetado.ljust(4, b"\0")
+        desplazamiento = inicio_extra + len(extra)
+        extra.extend(empaquetado)
+        return struct.pack(orden + "I", desplazamiento)
+
+    entradas = [
+        (256, 4, [ancho]),
+        (257, 4, [alto]),
+        (258, 3, [8] * muestras),
+        (259, 3, [1]),
+        (262, 3, [1 if muestras == 1 else 2]),
+        (273, 4, offsets),
+        (277, 3, [muestras]),
+        (278, 4, [filas_por_tira]),
+        (279, 4, [len(tira) for tira in tiras]),
+        (284, 3, [1]),
+    ]
+    ifd = struct.pack(orden + "H", len(entradas))
+    for etiqueta, tipo, lista in entradas:
+        ifd += struct.pack(orden + "HHI", etiqueta, tipo, len(lista)) + valores(tipo, lista)
+    ifd += struct.pack(orden + "I", 0)
+    inicio_ifd = inicio_extra + len(extra)
+    inicio_ifd += inicio_ifd % 2
+    magia = b"II*\0" if orden == "<" else b"MM\0*"
+    with open(ruta, "wb") as archivo:
+        archivo.write(magia + struct.pack(orden + "I", inicio_ifd) + datos + bytes(extra))
+        archivo.write(b"\0" * (inicio_ifd - inicio_extra - len(extra)) + ifd)
+
+
+@pytest.mark.parametrize("de_arriba_abajo", [False, True])
+@pytest.mark.parametrize("ancho", [16, 13, 14, 15])
+def test_bmp_igual_a_imread(tmp_path, de_arriba_abajo, ancho):
+    # Widths 13-15 leave 1-3 padding bytes per row
+    imagen = imagen_aleatoria(11, ancho)
+    ruta = str(tmp_path / "escaneo.bmp")
+    escribir_bmp(ruta, imagen, de_arriba_abajo)
+    leida = leer_sin_comprimir(ruta)
+    assert leida is not None
+    np.testing.assert_array_equal(leida, imagen)
+    np.testing.assert_array_equal(leida, cv2.imread(ruta))
+    assert tamano_imagen(ruta) == (11, ancho)
+
+
+def test_bmp_de_opencv(tmp_path):
+    imagen = imagen_aleatoria(21, 37, semilla=1)
+    ruta = str(tmp_path / "escaneo.bmp")
+    assert cv2.imwrite(ruta, imagen)
+    np.testing.assert_array_equal(leer_imagen(ruta), cv2.imread(ruta))
+
+
+@pytest.mark.parametrize("formato", ["bmp", "bmp_arriba_abajo", "tif"])
+def test_lectura_no_queda_ligada_al_archivo(tmp_path, formato):
+    def escribir(ruta, imagen):
+        if formato == "tif":
+            escribir_tiff(ruta, imagen, 4)
+        else:
+            escribir_bmp(ruta, imagen, de_arriba_abajo=formato == "bmp_arriba_abajo")
+
+    imagen = imagen_aleatoria(8, 10, semilla=6)
+    ruta = str(tmp_path / "escaneo")
+    escribir(ruta, imagen)
+    leida = leer_imagen(ruta)
+    assert leida.flags.owndata and leida.flags.writeable
+    # Overwriting the scan in place (a live map would see it) must not change what was read
+    otra = str(tmp_path / "otra")
+    escribir(otra, imagen_aleatoria(8, 10, semilla=7))
+    with open(otra, "rb") as origen, open(ruta, "r+b") as destino:
+        destino.write(origen.read())
+    np.testing.assert_array_equal(leida, imagen)
+    # Nothing keeps the file open, so it can be removed (Windows refuses while it is mapped)
+    os.remove(ruta)
+
+
+@pytest.mark.parametrize("orden", ["<", ">"])
+@pytest.mark.parametrize("canales", [1, 3])
+@pytest.mark.parametrize("filas_por_tira", [1, 4, 64])
+def test_tiff_en_tiras_igual_a_imread(tmp_path, orden, canales, filas_por_tira):
+    imagen = imagen_aleatoria(19, 23, canales, semilla=2)
+    ruta = str(tmp_path / "escaneo.tif")
+    escribir_tiff(ruta, imagen, filas_por_tira, orden)
+    leida = leer_sin_comprimir(ruta)
+    assert leida is not None and leida.shape == (19, 23, 3)
+    np.testing.assert_array_equal(leida, cv2.imread(ruta))
+    assert tamano_imagen(ruta) == (19, 23)
+
+
+def test_tiff_con_tiras_separadas_pasa_por_imread(tmp_path):
+    imagen = imagen_aleatoria(12, 9, semilla=3)
+    ruta = str(tmp_path / "escaneo.tif")
+    escribir_tiff(ruta, imagen, 4, separar_tiras=True)
+    assert leer_sin_comprimir(ruta) is None
+    np.testing.assert_array_equal(leer_imagen(ruta), cv2.imread(ruta))
+
+
+def test_tiff_de_opencv(tmp_path):
+    imagen = imagen_aleatoria(33, 17, semilla=4)
+    ruta = str(tmp_path / "escaneo.tif")
+    assert cv2.imwrite(ruta, imagen, [cv2.IMWRITE_TIFF_COMPRESSION, 1])
+    np.testing.assert_array_equal(leer_imagen(ruta), cv2.imread(ruta))
+    # Compressed TIFFs are left to OpenCV
+    comprimido = str(tmp_path / "comprimido.tif")
+    assert cv2.imwrite(comprimido, imagen, [cv2.IMWRITE_TIFF_COMPRESSION, 5])
+    assert leer_sin_comprimir(comprimido) is None
+    np.testing.assert_array_equal(leer_imagen(comprimido), imagen)
+
+
+@pytest.mark.parametrize("extension", [".jpg", ".png", ".bmp", ".tif"])
+def test_tamano_de_cabecera(tmp_path, extension):
+    ruta = str(tmp_path / f"escaneo{extension}")
+    assert cv2.imwrite(ruta, imagen_aleatoria(45, 71, semilla=5))
+    assert tamano_imagen(ruta) == (45, 71)
+
+
+def test_tamano_de_jpeg_progresivo(tmp_path):
+    ruta = str(tmp_path / "escaneo.jpg")
+    assert cv2.imwrite(ruta, imagen_aleatoria(30, 50), [cv2.IMWRITE_JPEG_PROGRESSIVE, 1])
+    assert tamano_imagen(ruta) == (30, 50)
+
+
+def escribir_jpeg_orientado(ruta, imagen, orientacion):
+    """JPEG con un bloque EXIF (APP1) que sólo lleva la etiqueta de orientación."""
+    ok, jpeg = cv2.imencode(".jpg", imagen)
+    assert ok
+    tiff = b"MM\0*" + struct.pack(">IH", 8, 1) + struct.pack(">HHIHH", 274, 3, 1, orientacion, 0)
+    tiff += struct.pack(">I", 0)
+    exif = b"Exif\0\0" + tiff
+    app1 = b"\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif
+    jpeg = jpeg.tobytes()
+    with open(ruta, "wb") as archivo:
+        archivo.write(jpeg[:2] + app1 + jpeg[2:])
+
+
+@pytest.mark.parametrize("orientacion", range(1, 9))
+def test_tamano_de_jpeg_con_orientacion_exif(tmp_path, orientacion):
+    ruta = str(tmp_path / "escaneo.jpg")
+    escribir_jpeg_orientado(ruta, imagen_aleatoria(403, 242, semilla=8), orientacion)
+    completa = cv2.imread(ruta)
+    assert tamano_imagen(ruta) == completa.shape[:2]
+    # The preview and the full image agree on which side is which
+    reducida, tamano = leer_vista_previa(ruta, 100)
+    assert tamano == completa.shape[:2]
+    assert reducida.shape[:2] == tuple(-(-lado // 4) for lado in tamano)
+
+
+def test_tamano_de_archivo_desconocido(tmp_path):
+    ruta = tmp_path / "notas.txt"
+    ruta.write_bytes(b"no es una imagen")
+    assert tamano_imagen(str(ruta)) is None
+    assert tamano_imagen(str(tmp_path / "no_existe.jpg")) is None
+
+
+def test_leer_imagen_sin_archivo(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        leer_imagen(str(tmp_path / "no_existe.png"))
+
+
+def test_listar_imagenes(tmp_path):
+    for nombre in ("b.JPG", "a.png", "notas.txt"):
+        (tmp_path / nombre).write_bytes(b"")
+    suelta = str(tmp_path / "suelta.bmp")
+    assert listar_imagenes([str(tmp_path), suelta]) == [
+        str(tmp_path / "a.png"), str(tmp_path / "b.JPG"), suelta,
+    ]
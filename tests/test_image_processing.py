@@ -0,0 +1,93 @@
+# test_image_processing.py
+"""Vistas de piel y mapa de calor frente a la composición original con cv2.normalize y applyColorMap."""
+import cv2
+import numpy as np
+import pytest
+
+from image_processing import render_mapa_calor, render_piel, tabla_mapa_calor
+
+
+def mapa_calor_original(imagen, refined_mask, colormap=cv2.COLORMAP_JET):
+    """Mapa de calor como lo componía el procesar_imagen original."""
+    imagen_sin_fondo = cv2.bitwise_and(imagen, imagen, mask=refined_mask)
+    fondo_blanco = np.ones_like(imagen) * 255
+    mask_inv = cv2.bitwise_not(refined_mask)
+    fondo = cv2.bitwise_and(fondo_blanco, fondo_blanco, mask=mask_inv)
+    imagen_con_fondo_blanco = cv2.add(fondo, imagen_sin_fondo)
+    imagen_gris = cv2.cvtColor(imagen_con_fondo_blanco, cv2.COLOR_BGR2GRAY)
+    imagen_normalizada = cv2.normalize(imagen_gris, None, 0, 255, cv2.NORM_MINMAX)
+    heatmap = cv2.applyColorMap(imagen_normalizada, colormap)
+    refined_mask_3ch = cv2.cvtColor(refined_mask, cv2.COLOR_GRAY2BGR)
+    heatmap_foreground = cv2.bitwise_and(heatmap, refined_mask_3ch)
+    return cv2.add(fondo, heatmap_foreground)
+
+
+def piel_original(imagen, refined_mask):
+    imagen_sin_fondo = cv2.bitwise_and(imagen, imagen, mask=refined_mask)
+    fondo_blanco = np.ones_like(imagen) * 255
+    fondo = cv2.bitwise_and(fondo_blanco, fondo_blanco, mask=cv2.bitwise_not(refined_mask))
+    return cv2.add(fondo, imagen_sin_fondo)
+
+
+def escena(semilla, alto=120, ancho=90, rango=(0, 256)):
+    rng = np.random.default_rng(semilla)
+    imagen = rng.integers(*rango, (alto, ancho, 3), dtype=np.uint8)
+    mascara = np.zeros((alto, ancho), dtype=np.uint8)
+    centro = (int(rng.integers(20, ancho - 20)), int(rng.integers(20, alto - 20)))
+    cv2.ellipse(mascara, centro, (int(rng.integers(5, 40)), int(rng.integers(5, 60))),
+                float(rng.uniform(0, 180)), 0, 360, 255, -1)
+    return imagen, mascara
+
+
+@pytest.mark.parametrize("colormap", [cv2.COLORMAP_JET, cv2.COLORMAP_HOT, cv2.COLORMAP_VIRIDIS])
+@pytest.mark.parametrize("minimo,maximo", [(0, 255), (37, 255), (12, 200), (90, 91), (128, 128)])
+def test_tabla_igual_a_normalize_y_applycolormap(minimo, maximo, colormap):
+    # Every gray level, plus the extremes that fix the normalization
+    gris = np.concatenate([np.arange(minimo, maximo + 1), [minimo, maximo]]).astype(np.uint8).reshape(1, -1)
+    esperado = cv2.applyColorMap(cv2.normalize(gris, None, 0, 255, cv2.NORM_MINMAX), colormap)
+    tabla = tabla_mapa_calor(minimo, maximo, colormap)
+    np.testing.assert_array_equal(tabla[gris[0]], esperado[0])
+
+
+@pytest.mark.parametrize("rango", [(0, 256), (20, 120), (200, 256)])
+@pytest.mark.parametrize("semilla", range(6))
+def test_mapa_calor_igual_al_original(semilla, rango):
+    imagen, mascara = escena(semilla, rango=rango)
+    np.testing.assert_array_equal(render_mapa_calor(imagen, mascara), mapa_calor_original(imagen, mascara))
+
+
+def test_mapa_calor_con_mascara_completa():
+    # Without background the white does not take part in the normalization
+    imagen, _ = escena(7, rango=(30, 140))
+    mascara = np.full(imagen.shape[:2], 255, dtype=np.uint8)
+    np.testing.assert_array_equal(render_mapa_calor(imagen, mascara), mapa_calor_original(imagen, mascara))
+
+
+def test_mapa_calor_con_otro_colormap():
+    imagen, mascara = escena(8)
+    np.testing.assert_array_equal(render_mapa_calor(imagen, mascara, colormap=cv2.COLORMAP_HOT),
+                                  mapa_calor_original(imagen, mascara, cv2.COLORMAP_HOT))
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_piel_igual_a_la_original(semilla):
+    imagen, mascara = escena(semilla)
+    np.testing.assert_array_equal(render_piel(imagen, mascara), piel_original(imagen, mascara))
+
+
+def test_vistas_desde_recorte():
+    # Only the crop under the mask is passed, as SegmentacionPie does
+    imagen, mascara = escena(9)
+    x, y, w, h = cv2.boundingRect(mascara)
+    recorte = imagen[y - 3:y + h + 2, x - 4:x + w + 1]
+    np.testing.assert_array_equal(render_mapa_calor(recorte, mascara, origen=(x - 4, y - 3)),
+                                  mapa_calor_original(imagen, mascara))
+    np.testing.assert_array_equal(render_piel(recorte, mascara, origen=(x - 4, y - 3)),
+                                  piel_original(imagen, mascara))
+
+
+def test_mascara_vacia_da_lienzo_blanco():
+    imagen, _ = escena(10)
+    mascara = np.zeros(imagen.shape[:2], dtype=np.uint8)
+    assert (render_mapa_calor(imagen, mascara) == 255).all()
+    assert (render_piel(imagen, mascara) == 255).all()
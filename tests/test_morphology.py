@@ -0,0 +1,60 @@
+# test_morphology.py
+"""El cierre descompuesto frente a cv2.morphologyEx."""
+import cv2
+import numpy as np
+import pytest
+
+from morphology import KERNEL_CIERRE, cerrar_mascara, iou_mascaras
+from workspace import EspacioTrabajo
+
+
+def mascara_aleatoria(semilla, alto=240, ancho=200):
+    """Manchas y huecos al azar, algunas tocando el borde, desenfocadas como en la segmentación."""
+    rng = np.random.default_rng(semilla)
+    mascara = np.zeros((alto, ancho), dtype=np.uint8)
+    for _ in range(int(rng.integers(3, 9))):
+        centro = (int(rng.integers(-20, ancho + 20)), int(rng.integers(-20, alto + 20)))
+        ejes = (int(rng.integers(3, 50)), int(rng.integers(3, 50)))
+        cv2.ellipse(mascara, centro, ejes, float(rng.uniform(0, 180)), 0, 360, 255, -1)
+    for _ in range(int(rng.integers(0, 6))):
+        centro = (int(rng.integers(0, ancho)), int(rng.integers(0, alto)))
+        cv2.circle(mascara, centro, int(rng.integers(1, 12)), 0, -1)
+    return cv2.GaussianBlur(mascara, (7, 7), 0)
+
+
+@pytest.mark.parametrize("iteraciones", [1, 2, 3, 4, 7, 12, 35])
+@pytest.mark.parametrize("semilla", range(8))
+def test_descompuesto_igual_a_morphologyex(semilla, iteraciones):
+    mascara = mascara_aleatoria(semilla)
+    referencia = cv2.morphologyEx(mascara, cv2.MORPH_CLOSE, KERNEL_CIERRE, iterations=iteraciones)
+    descompuesto = cerrar_mascara(mascara, iteraciones=iteraciones, metodo="descompuesto")
+    np.testing.assert_array_equal(descompuesto > 0, referencia > 0)
+    assert set(np.unique(descompuesto)) <= {0, 255}
+
+
+def test_descompuesto_con_espacio_de_trabajo():
+    espacio = EspacioTrabajo((240, 200))
+    for semilla in range(3):
+        mascara = mascara_aleatoria(semilla)
+        referencia = cv2.morphologyEx(mascara, cv2.MORPH_CLOSE, KERNEL_CIERRE, iterations=35)
+        descompuesto = cerrar_mascara(mascara, iteraciones=35, espacio=espacio)
+        np.testing.assert_array_equal(descompuesto > 0, referencia > 0)
+
+
+def test_mascara_vacia():
+    mascara = np.zeros((50, 40), dtype=np.uint8)
+    assert not cerrar_mascara(mascara, iteraciones=5).any()
+
+
+def test_metodo_desconocido():
+    with pytest.raises(ValueError):
+        cerrar_mascara(np.zeros((5, 5), dtype=np.uint8), metodo="otro")
+
+
+def test_iou():
+    a = np.zeros((4, 4), dtype=np.uint8)
+    b = a.copy()
+    assert iou_mascaras(a, b) == 1.0
+    a[:2] = 255
+    b[1:3] = 255
+    assert iou_mascaras(a, b) == pytest.approx(4 / 12)
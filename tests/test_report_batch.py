@@ -0,0 +1,37 @@
+# test_report_batch.py
+"""Nombres de salida del lote: ningún reporte pisa a otro."""
+import os
+
+from report_batch import destinos_unicos
+
+
+def nombres(filas):
+    return [os.path.basename(ruta) for ruta in destinos_unicos(filas, "salida")]
+
+
+def test_pacientes_repetidos():
+    filas = [{'paciente': "Ana", 'order_number': "7"}] * 3 + [{'paciente': "Luis", 'order_number': "7"}]
+    assert nombres(filas) == ["Ana-7.pdf", "Ana-7-2.pdf", "Ana-7-3.pdf", "Luis-7.pdf"]
+
+
+def test_paciente_y_orden_vacios():
+    filas = [{}, {'paciente': " ", 'order_number': ""}, {'paciente': None, 'order_number': None}]
+    assert nombres(filas) == ["Paciente-52763.pdf", "Paciente-52763-2.pdf", "Paciente-52763-3.pdf"]
+
+
+def test_nombres_que_solo_difieren_en_mayusculas():
+    # They would be the same file on Windows and macOS
+    filas = [{'paciente': "Ana", 'order_number': "7"}, {'paciente': "ana", 'order_number': "7"},
+             {'paciente': "ANA", 'order_number': "7"}]
+    assert nombres(filas) == ["Ana-7.pdf", "ana-7-2.pdf", "ANA-7-3.pdf"]
+
+
+def test_sufijo_que_coincide_con_otro_reporte():
+    filas = [{'paciente': "Ana", 'order_number': "7"}, {'paciente': "Ana", 'order_number': "7"},
+             {'paciente': "Ana", 'order_number': "7-2"}]
+    assert nombres(filas) == ["Ana-7.pdf", "Ana-7-2.pdf", "Ana-7-2-2.pdf"]
+
+
+def test_rutas_en_el_directorio_de_salida(tmp_path):
+    destinos = destinos_unicos([{'paciente': "Ana", 'order_number': "7"}], str(tmp_path))
+    assert destinos == [os.path.join(str(tmp_path), "Ana-7.pdf")]
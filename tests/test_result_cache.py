@@ -0,0 +1,114 @@
+# test_result_cache.py
+"""Caché en disco de segmentaciones: ida y vuelta, claves, recorte por tamaño y entradas dañadas."""
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from image_processing import segmentar_imagen, segmentar_vista_previa
+from result_cache import CacheResultados
+
+
+def escaneo(semilla=0, alto=600, ancho=460):
+    rng = np.random.default_rng(semilla)
+    imagen = np.full((alto, ancho, 3), 235, dtype=np.uint8)
+    cv2.ellipse(imagen, (ancho // 2, alto // 2), (80, 220), float(rng.uniform(-10, 10)), 0, 360, (60, 110, 210), -1)
+    return cv2.add(imagen, rng.integers(0, 20, imagen.shape, dtype=np.uint8))
+
+
+def assert_misma_segmentacion(leida, original):
+    np.testing.assert_array_equal(leida.mascara, original.mascara)
+    assert leida.lineas == original.lineas
+    assert leida.shape == original.shape and leida.tamano_completo == original.tamano_completo
+    np.testing.assert_array_equal(leida.render_piel(), original.render_piel())
+    np.testing.assert_array_equal(leida.render_mapa_calor(), original.render_mapa_calor())
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheResultados(str(tmp_path / "cache"))
+
+
+def test_ida_y_vuelta_con_recorte(cache):
+    imagen = escaneo()
+    segmentacion = segmentar_vista_previa(imagen, foot_side="left", lado_maximo=300)
+    clave = cache.clave(imagen, "left", vista_previa=300)
+    cache.guardar(clave, segmentacion)
+    assert_misma_segmentacion(cache.obtener(clave), segmentacion)
+    assert (cache.aciertos, cache.fallos) == (1, 0)
+
+
+def test_ida_y_vuelta_a_resolucion_completa_reconstruye_el_recorte(cache):
+    imagen = escaneo(1)
+    segmentacion = segmentar_imagen(image=imagen)
+    clave = cache.clave(imagen, "right", metodo_cierre="descompuesto")
+    cache.guardar(clave, segmentacion, con_recorte=False)
+    assert_misma_segmentacion(cache.obtener(clave, imagen), segmentacion)
+    # Without the input there is nothing to rebuild the crop from
+    assert cache.obtener(clave) is None
+
+
+def test_clave_depende_de_pixeles_lado_y_parametros(cache):
+    imagen = escaneo(2)
+    clave = cache.clave(imagen, "right", metodo_cierre="descompuesto")
+    assert cache.clave(imagen.copy(), "right", metodo_cierre="descompuesto") == clave
+    assert cache.clave(imagen, "left", metodo_cierre="descompuesto") != clave
+    assert cache.clave(imagen, "right", metodo_cierre="referencia") != clave
+    assert cache.clave(imagen, "right", metodo_cierre="descompuesto", vista_previa=800) != clave
+    otra = imagen.copy()
+    otra[0, 0, 0] ^= 1
+    assert cache.clave(otra, "right", metodo_cierre="descompuesto") != clave
+
+
+def test_recortar_borra_las_menos_usadas(tmp_path):
+    cache = CacheResultados(str(tmp_path / "cache"), limite_bytes=2500)
+    rutas = []
+    for clave in ["aa01", "bb02", "cc03", "dd04"]:
+        ruta = cache._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "wb") as archivo:
+            archivo.write(b"\0" * 1000)
+        rutas.append(ruta)
+    # Least recently used first: dd04, aa01, cc03, bb02
+    for ruta, mtime in zip(rutas, (2000, 4000, 3000, 1000)):
+        os.utime(ruta, (mtime, mtime))
+    cache.recortar()
+    assert [os.path.exists(ruta) for ruta in rutas] == [False, True, True, False]
+
+
+def test_obtener_actualiza_el_uso(cache):
+    imagen = escaneo(3)
+    segmentacion = segmentar_vista_previa(imagen, lado_maximo=200)
+    clave = cache.clave(imagen, "right", vista_previa=200)
+    cache.guardar(clave, segmentacion)
+    os.utime(cache._ruta(clave), (1000, 1000))
+    cache.obtener(clave)
+    assert os.stat(cache._ruta(clave)).st_mtime > 1000
+
+
+@pytest.mark.parametrize("danar", ["basura", "truncada", "vacia", "alterada"])
+def test_entrada_danada_es_un_fallo(cache, danar):
+    imagen = escaneo(4)
+    segmentacion = segmentar_vista_previa(imagen, lado_maximo=200)
+    clave = cache.clave(imagen, "right", vista_previa=200)
+    cache.guardar(clave, segmentacion)
+    ruta = cache._ruta(clave)
+    with open(ruta, "rb") as archivo:
+        datos = archivo.read()
+    mitad = len(datos) // 2
+    danados = {
+        "basura": b"no es un npz",
+        "truncada": datos[:mitad],
+        "vacia": b"",
+        "alterada": datos[:mitad] + bytes(b ^ 0xFF for b in datos[mitad:mitad + 64]) + datos[mitad + 64:],
+    }
+    with open(ruta, "wb") as archivo:
+        archivo.write(danados[danar])
+    assert cache.obtener(clave) is None
+    assert (cache.aciertos, cache.fallos) == (0, 1)
+
+
+def test_clave_ausente_es_un_fallo(cache):
+    assert cache.obtener("ff" * 20) is None
+    assert cache.fallos == 1
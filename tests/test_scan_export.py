@@ -0,0 +1,99 @@
+# test_scan_export.py
+"""Exportación de originales: marcadores de posición y archivos sin cambios."""
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import scan_export
+from scan_export import escribir_original, exportar_originales
+
+
+def escaneo(semilla):
+    return np.random.default_rng(semilla).integers(0, 256, (40, 30, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def codificaciones(monkeypatch):
+    """Formato de cada imagen que llega a codificarse, es decir, de cada archivo escrito."""
+    llamadas = []
+    imencode = cv2.imencode
+
+    def contar(formato, imagen, parametros=()):
+        llamadas.append(formato)
+        return imencode(formato, imagen, parametros)
+
+    monkeypatch.setattr(scan_export.cv2, "imencode", contar)
+    return llamadas
+
+
+@pytest.mark.parametrize("en_segundo_plano", [False, True])
+def test_exportar_dos_veces_no_reescribe(tmp_path, codificaciones, en_segundo_plano):
+    reporte = str(tmp_path / "Paciente-1.pdf")
+    izquierdo, derecho = escaneo(0), escaneo(1)
+
+    def exportar():
+        futuros = exportar_originales(reporte, "Biomecánica", izquierdo, derecho,
+                                      en_segundo_plano=en_segundo_plano)
+        return [futuro.result() for futuro in futuros]
+
+    exportar()
+    rutas = [str(tmp_path / "Paciente-1-i.png"), str(tmp_path / "Paciente-1-d.png")]
+    np.testing.assert_array_equal(cv2.imread(rutas[0]), izquierdo)
+    np.testing.assert_array_equal(cv2.imread(rutas[1]), derecho)
+    fechas = [os.stat(ruta).st_mtime_ns for ruta in rutas]
+    assert len(codificaciones) == 2
+
+    resultados = exportar()
+    assert len(codificaciones) == 2
+    assert [os.stat(ruta).st_mtime_ns for ruta in rutas] == fechas
+    if en_segundo_plano:
+        assert resultados == [False, False]
+
+
+def test_se_reescribe_si_cambian_los_pixeles_o_el_archivo(tmp_path, codificaciones):
+    destino = str(tmp_path / "Paciente-1-i.png")
+    imagen = escaneo(2)
+    assert escribir_original(destino, imagen)
+    assert not escribir_original(destino, imagen.copy())
+    otra = imagen.copy()
+    otra[0, 0] ^= 1
+    assert escribir_original(destino, otra)
+    # Someone else replaced the file: the record no longer describes it
+    with open(destino, "ab") as archivo:
+        archivo.write(b"\0")
+    assert escribir_original(destino, otra)
+    assert len(codificaciones) == 3
+
+
+@pytest.mark.parametrize("en_segundo_plano", [False, True])
+def test_marcadores_de_posicion_no_se_exportan(tmp_path, codificaciones, en_segundo_plano):
+    reporte = str(tmp_path / "Paciente-1.pdf")
+    blanco = np.full((40, 30, 3), 255, dtype=np.uint8)
+    futuros = exportar_originales(reporte, "biomecanica", blanco, escaneo(3),
+                                  left_is_placeholder=True, right_is_placeholder=False,
+                                  en_segundo_plano=en_segundo_plano)
+    for futuro in futuros:
+        futuro.result()
+    assert sorted(os.listdir(tmp_path)) == ["Paciente-1-d.png"]
+
+    futuros = exportar_originales(str(tmp_path / "Paciente-2.pdf"), "biomecanica", blanco, None,
+                                  left_is_placeholder=True, en_segundo_plano=en_segundo_plano)
+    assert futuros == []
+    assert sorted(os.listdir(tmp_path)) == ["Paciente-1-d.png"]
+    assert len(codificaciones) == 1
+
+
+def test_otros_materiales_no_exportan(tmp_path, codificaciones):
+    assert exportar_originales(str(tmp_path / "Paciente-1.pdf"), "EVA", escaneo(4), escaneo(5)) == []
+    assert os.listdir(tmp_path) == []
+    assert codificaciones == []
+
+
+def test_permisos_como_imwrite(tmp_path):
+    destino = str(tmp_path / "Paciente-1-d.png")
+    escribir_original(destino, escaneo(6))
+    referencia = str(tmp_path / "referencia.png")
+    cv2.imwrite(referencia, escaneo(6))
+    assert os.stat(destino).st_mode == os.stat(referencia).st_mode
@@ -0,0 +1,85 @@
+# test_watermark.py
+"""Mezcla entera del logo frente a la mezcla en coma flotante del overlay_logo original."""
+import cv2
+import numpy as np
+import pytest
+
+from watermark import aplicar_marca, logo_escalado
+
+
+def marca_original(imagen, ruta, position='bottom_right', scale=0.2):
+    """Marca de agua como la ponía el overlay_logo original (la asignación a uint8 trunca)."""
+    logo = cv2.imread(ruta, cv2.IMREAD_UNCHANGED)
+    h_img, w_img = imagen.shape[:2]
+    h_logo, w_logo = logo.shape[:2]
+    logo_width = int(w_img * scale)
+    logo_height = int(logo_width / (w_logo / h_logo))
+    logo_resized = cv2.resize(logo, (logo_width, logo_height), interpolation=cv2.INTER_AREA)
+    x = w_img - logo_width - 60 if position == 'bottom_right' else 60
+    y = h_img - logo_height
+    alpha_logo = logo_resized[:, :, 3] / 255.0
+    for c in range(0, 3):
+        imagen[y:y + logo_height, x:x + logo_width, c] = (
+            alpha_logo * logo_resized[:, :, c] +
+            (1 - alpha_logo) * imagen[y:y + logo_height, x:x + logo_width, c]
+        )
+    return imagen
+
+
+@pytest.fixture
+def ruta_logo(tmp_path):
+    rng = np.random.default_rng(0)
+    logo = rng.integers(0, 256, (90, 160, 4), dtype=np.uint8)
+    # Fully transparent and fully opaque areas as well as partial alpha
+    logo[:20, :, 3] = 0
+    logo[-20:, :, 3] = 255
+    ruta = str(tmp_path / "logo.png")
+    assert cv2.imwrite(ruta, logo)
+    return ruta
+
+
+@pytest.mark.parametrize("position", ['bottom_right', 'bottom_left'])
+@pytest.mark.parametrize("semilla", range(3))
+def test_mezcla_entera_a_una_unidad_de_la_original(ruta_logo, position, semilla):
+    imagen = np.random.default_rng(semilla + 1).integers(0, 256, (400, 700, 3), dtype=np.uint8)
+    entera = aplicar_marca(imagen.copy(), ruta_logo, position=position)
+    original = marca_original(imagen.copy(), ruta_logo, position=position)
+    diferencia = entera.astype(np.int16) - original
+    # The integer blend rounds where the float one truncated: never below it, at most one above
+    assert diferencia.min() == 0 and diferencia.max() == 1
+    # Outside the logo nothing changes
+    np.testing.assert_array_equal(entera[:200], imagen[:200])
+
+
+def test_mezcla_entera_redondea_el_valor_exacto(ruta_logo):
+    imagen = np.random.default_rng(4).integers(0, 256, (400, 700, 3), dtype=np.uint8)
+    alto, ancho = 78, 140
+    color, inverso = logo_escalado(ruta_logo, ancho, alto)
+    region = imagen[-alto:, 700 - ancho - 60:700 - 60].astype(np.int64)
+    exacto = color + region * inverso
+    esperado = (exacto + 127) // 255
+    entera = aplicar_marca(imagen.copy(), ruta_logo)
+    np.testing.assert_array_equal(entera[-alto:, 700 - ancho - 60:700 - 60], esperado)
+
+
+def test_division_en_punto_fijo_es_exacta():
+    # Every sum logo * alfa + fondo * (255 - alfa) that can occur
+    s = np.arange(255 * 255 + 1, dtype=np.uint32)
+    t = s + 128
+    np.testing.assert_array_equal((t + (t >> 8)) >> 8, (s + 127) // 255)
+
+
+def test_logo_sin_alfa_se_copia(tmp_path):
+    logo = np.random.default_rng(5).integers(0, 256, (50, 100, 3), dtype=np.uint8)
+    ruta = str(tmp_path / "logo.png")
+    assert cv2.imwrite(ruta, logo)
+    imagen = np.zeros((300, 500, 3), dtype=np.uint8)
+    aplicar_marca(imagen, ruta)
+    esperado = cv2.resize(logo, (100, 50), interpolation=cv2.INTER_AREA)
+    np.testing.assert_array_equal(imagen[-50:, 500 - 100 - 60:500 - 60], esperado)
+
+
+def test_logo_inexistente_no_cambia_la_imagen(tmp_path):
+    imagen = np.full((100, 100, 3), 7, dtype=np.uint8)
+    assert aplicar_marca(imagen, str(tmp_path / "no_existe.png")) is imagen
+    assert (imagen == 7).all()
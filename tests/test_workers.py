@@ -0,0 +1,110 @@
+# test_workers.py
+"""GestorTrabajos: sólo el último trabajo de cada clave llega a la interfaz y la cancelación es cooperativa."""
+import threading
+import time
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from workers import GestorTrabajos, Trabajo, TrabajoCancelado
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def gestor(app):
+    gestor = GestorTrabajos()
+    yield gestor
+    gestor.cancelar_todos()
+    gestor.esperar()
+
+
+def entregar(gestor, hasta=lambda: True, segundos=5):
+    """Espera a los hilos y procesa las señales que dejaron en cola para el hilo principal."""
+    assert gestor.esperar(segundos * 1000)
+    limite = time.monotonic() + segundos
+    QCoreApplication.processEvents()
+    while not hasta() and time.monotonic() < limite:
+        QCoreApplication.processEvents()
+    assert hasta()
+
+
+def test_segundo_envio_descarta_el_primero_en_curso(gestor):
+    liberar = threading.Event()
+    resultados, cancelados = [], []
+
+    def lento(reportar):
+        assert liberar.wait(5)
+        return "primero"
+
+    gestor.enviar("izquierdo", lento, resultados.append, al_cancelar=lambda: cancelados.append(1))
+    gestor.enviar("izquierdo", lambda reportar: "segundo", resultados.append)
+    liberar.set()
+    entregar(gestor, lambda: not gestor.ocupado())
+    assert resultados == ["segundo"]
+    assert cancelados == []
+
+
+def test_segundo_envio_descarta_el_resultado_ya_en_cola(gestor):
+    resultados = []
+    gestor.enviar("izquierdo", lambda reportar: "primero", resultados.append)
+    # The first job has finished, but its result has not reached the GUI thread yet
+    assert gestor.esperar(5000)
+    gestor.enviar("izquierdo", lambda reportar: "segundo", resultados.append)
+    entregar(gestor, lambda: not gestor.ocupado())
+    assert resultados == ["segundo"]
+
+
+def test_claves_distintas_no_se_cancelan(gestor):
+    resultados = []
+    gestor.enviar("izquierdo", lambda reportar: "i", resultados.append)
+    gestor.enviar("derecho", lambda reportar: "d", resultados.append)
+    entregar(gestor, lambda: len(resultados) == 2)
+    assert sorted(resultados) == ["d", "i"]
+
+
+def test_reportar_lanza_tras_cancelar():
+    trabajo = Trabajo(lambda reportar: None)
+    trabajo.reportar("Segmentando", 10)
+    trabajo.cancelar()
+    assert trabajo.fue_cancelado
+    with pytest.raises(TrabajoCancelado):
+        trabajo.reportar("Segmentando", 20)
+
+
+def test_cancelar_detiene_el_trabajo_en_la_siguiente_etapa(gestor):
+    empezado, seguir = threading.Event(), threading.Event()
+    etapas, resultados, cancelados, inactivo = [], [], [], []
+    gestor.inactivo.connect(lambda: inactivo.append(1))
+
+    def por_etapas(reportar):
+        empezado.set()
+        assert seguir.wait(5)
+        reportar("Segmentando", 50)
+        etapas.append("Segmentando")
+        return "hecho"
+
+    gestor.enviar("izquierdo", por_etapas, resultados.append, al_cancelar=lambda: cancelados.append(1))
+    assert empezado.wait(5)
+    gestor.cancelar("izquierdo")
+    assert cancelados == [1] and inactivo == [1]
+    assert not gestor.ocupado("izquierdo")
+    seguir.set()
+    entregar(gestor)
+    assert etapas == [] and resultados == []
+    # al_cancelar already ran when the job was discarded
+    assert cancelados == [1]
+
+
+def test_fallo_llega_a_al_fallar(gestor):
+    fallos = []
+
+    def falla(reportar):
+        raise ValueError("sin contorno")
+
+    gestor.enviar("derecho", falla, lambda resultado: None, al_fallar=fallos.append)
+    entregar(gestor, lambda: bool(fallos))
+    assert fallos == ["sin contorno"]
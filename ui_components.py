@@ -4,6 +4,7 @@ from PyQt5.QtWidgets import (
     QDateEdit, QComboBox, QLabel, QHBoxLayout, QMessageBox, QVBoxLayout, QWidget
 )
 from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtGui import QPixmap
 import datetime
 
 
@@ -171,13 +172,31 @@ class PatientInfoDialog(QDialog):
 
 
 class ConfirmationDialog(QDialog):
+    # Height of the report image thumbnails in the preview
+    ALTO_MINIATURA = 220
+
     def __init__(self, paciente, telefono, longitud_pie, material, entrega_date,
-                 fecha_escaneo, sucursal, taller, order_number, observaciones):
+                 fecha_escaneo, sucursal, taller, order_number, observaciones,
+                 miniaturas=None):
+        """`miniaturas` son las imágenes del reporte ya codificadas (bytes PNG/JPEG, o None si falta el pie)."""
         super().__init__()
         self.setWindowTitle("Confirmación de Información")
-        self.setFixedSize(500, 600)
+        miniaturas = [m for m in (miniaturas or []) if m is not None]
+        self.setFixedSize(900 if miniaturas else 500, 600 + (self.ALTO_MINIATURA if miniaturas else 0))
         layout = QVBoxLayout()
 
+        # Preview of the report images, decoded from the same bytes the PDF embeds
+        if miniaturas:
+            miniaturas_layout = QHBoxLayout()
+            for datos in miniaturas:
+                pixmap = QPixmap()
+                pixmap.loadFromData(bytes(datos))
+                label = QLabel()
+                label.setAlignment(Qt.AlignCenter)
+                label.setPixmap(pixmap.scaledToHeight(self.ALTO_MINIATURA, Qt.SmoothTransformation))
+                miniaturas_layout.addWidget(label)
+            layout.addLayout(miniaturas_layout)
+
         # Display patient information
         info_labels = [
             f"<b>Paciente:</b> {paciente}",
@@ -199,7 +218,7 @@ class ConfirmationDialog(QDialog):
 
         # Add dialog buttons
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-        buttons.button(QDialogButtonBox.Ok).setText("Confirmar y Generar Reporte")
+        buttons.button(QDialogButtonBox.Ok).setText("Confirmar y Guardar Reporte")
         buttons.button(QDialogButtonBox.Cancel).setText("Cancelar y Editar Información")
         buttons.accepted.connect(self.accept)
         buttons.rejected.connect(self.reject)
@@ -1,25 +1,60 @@
 # utils.py
-import os
+import sys
 import cv2
-from PyQt5.QtGui import QPixmap, QImage, QFontDatabase
+import numpy as np
+from PyQt5.QtGui import QPixmap, QImage
 
-def convertir_cv_qt(imagen_cv):
+from asset_registry import familia_fuente
+
+def imagen_cv_a_qimage(imagen_cv):
+    """QImage que comparte la memoria de `imagen_cv` (gris, BGR o BGRA, uint8) sin copiarla.
+
+    El arreglo queda guardado en el QImage para que su memoria siga viva
+    mientras exista el QImage. Si Qt no tiene Format_BGR888 (antes de 5.14),
+    las imágenes BGR se convierten a RGB en una copia.
+    """
+    if imagen_cv.ndim == 2:
+        formato = QImage.Format_Grayscale8
+    elif imagen_cv.shape[2] == 4:
+        if sys.byteorder == "little":
+            # ARGB32 is stored as B, G, R, A on little-endian machines: OpenCV's BGRA order
+            formato = QImage.Format_ARGB32
+        else:
+            imagen_cv = cv2.cvtColor(imagen_cv, cv2.COLOR_BGRA2RGBA)
+            formato = QImage.Format_RGBA8888
+    elif hasattr(QImage, "Format_BGR888"):
+        formato = QImage.Format_BGR888
+    else:
+        imagen_cv = cv2.cvtColor(imagen_cv, cv2.COLOR_BGR2RGB)
+        formato = QImage.Format_RGB888
+    imagen_cv = np.ascontiguousarray(imagen_cv)
+    height, width = imagen_cv.shape[:2]
+    q_image = QImage(imagen_cv.data, width, height, imagen_cv.strides[0], formato)
+    q_image._arreglo = imagen_cv
+    return q_image
+
+def reducir_para_pantalla(imagen_cv, lado_maximo):
+    """`imagen_cv` reducida para que su lado mayor no pase de `lado_maximo`."""
+    height, width = imagen_cv.shape[:2]
+    escala = lado_maximo / max(height, width)
+    if escala >= 1:
+        return imagen_cv
+    tamano = (max(1, round(width * escala)), max(1, round(height * escala)))
+    # Above half size bilinear does not alias and is several times faster than INTER_AREA
+    interpolacion = cv2.INTER_LINEAR if escala > 0.5 else cv2.INTER_AREA
+    return cv2.resize(imagen_cv, tamano, interpolation=interpolacion)
+
+def convertir_cv_qt(imagen_cv, lado_maximo=None):
+    """QPixmap de una imagen de OpenCV; con `lado_maximo` sube a Qt una copia reducida.
+
+    La única copia de la imagen completa es la que hace Qt al crear el pixmap.
+    """
     if imagen_cv is None:
         return QPixmap()
-    imagen_rgb = cv2.cvtColor(imagen_cv, cv2.COLOR_BGR2RGB)
-    height, width, channel = imagen_rgb.shape
-    bytes_per_line = channel * width
-    q_image = QImage(imagen_rgb.data, width, height, bytes_per_line, QImage.Format_RGB888)
-    return QPixmap.fromImage(q_image)
+    if lado_maximo:
+        imagen_cv = reducir_para_pantalla(imagen_cv, lado_maximo)
+    return QPixmap.fromImage(imagen_cv_a_qimage(imagen_cv))
 
 def load_fonts():
-    font_path = os.path.join('resources', 'Roboto-Regular.ttf')
-    if not os.path.exists(font_path):
-        print("Roboto font file not found in resources.")
-        return "Arial"
-    font_id = QFontDatabase.addApplicationFont(font_path)
-    if font_id == -1:
-        print("Failed to load Roboto font.")
-        return "Arial"
-    font_family = QFontDatabase.applicationFontFamilies(font_id)[0]
-    return font_family
+    """Familia de Roboto para Qt; la fuente se registra una sola vez (ver asset_registry)."""
+    return familia_fuente('Roboto-Regular.ttf')
@@ -0,0 +1,90 @@
+# watermark.py
+"""Marca de agua del logo sobre los mapas de calor del reporte.
+
+El logo se decodifica una vez por ruta y cada tamaño pedido se escala una
+vez y se guarda ya premultiplicado por su alfa, de modo que poner la marca
+es una sola operación entera sobre los tres canales:
+
+    resultado = (logo * alfa + imagen * (255 - alfa)) / 255
+
+con la división por 255 redondeada en aritmética de punto fijo de 16 bits.
+La mezcla original en coma flotante truncaba al asignar a uint8, así que
+el resultado puede quedar una unidad por encima de aquélla, nunca más.
+"""
+import functools
+import os
+
+import cv2
+import numpy as np
+
+from shape_cache import TAMANO_CACHE, solo_lectura
+
+
+@functools.lru_cache(maxsize=TAMANO_CACHE)
+def logo(ruta):
+    """Logo en `ruta` tal como está en el archivo (con alfa si lo tiene), o None si no se puede leer."""
+    if not os.path.exists(ruta):
+        print(f"Archivo de logo no encontrado en {ruta}. Saltando superposición del logo.")
+        return None
+    imagen = cv2.imread(ruta, cv2.IMREAD_UNCHANGED)
+    if imagen is None:
+        print(f"Fallo al cargar el logo desde {ruta}. Saltando superposición del logo.")
+        return None
+    return solo_lectura(imagen)
+
+
+@functools.lru_cache(maxsize=TAMANO_CACHE)
+def logo_escalado(ruta, ancho, alto):
+    """(color, inverso) del logo escalado a `ancho` x `alto`.
+
+    Con alfa, `color` es BGR * alfa e `inverso` es 255 - alfa, ambos uint16
+    con tres canales; sin alfa, `color` es el logo BGR e `inverso` es None.
+    """
+    original = logo(ruta)
+    escalado = cv2.resize(original, (ancho, alto), interpolation=cv2.INTER_AREA)
+    if escalado.ndim == 3 and escalado.shape[2] == 4:
+        alfa = escalado[:, :, 3:4].astype(np.uint16)
+        color = escalado[:, :, :3] * alfa
+        inverso = np.repeat(255 - alfa, 3, axis=2)
+        return solo_lectura(color), solo_lectura(inverso)
+    return solo_lectura(escalado), None
+
+
+def aplicar_marca(imagen, ruta, position='bottom_right', scale=0.2):
+    """Pone el logo en una esquina inferior de `imagen` (BGR, uint8), en su lugar.
+
+    El logo mide `scale` del ancho de la imagen y queda a 60 px del borde
+    lateral; si no cabe, la imagen no cambia.
+    """
+    original = logo(ruta)
+    if original is None:
+        return imagen
+    h_img, w_img = imagen.shape[:2]
+    h_logo, w_logo = original.shape[:2]
+    logo_width = int(w_img * scale)
+    logo_height = int(logo_width / (w_logo / h_logo))
+    if logo_width <= 0 or logo_height <= 0 or logo_height > h_img or logo_width > w_img:
+        return imagen
+    if position == 'bottom_right':
+        x, y = w_img - logo_width - 60, h_img - logo_height
+    elif position == 'bottom_left':
+        x, y = 60, h_img - logo_height
+    else:
+        x, y = 10, 10
+    if x < 0 or y < 0 or x + logo_width > w_img or y + logo_height > h_img:
+        return imagen
+
+    color, inverso = logo_escalado(ruta, logo_width, logo_height)
+    region = imagen[y:y + logo_height, x:x + logo_width]
+    if inverso is None:
+        region[...] = color
+        return imagen
+    # At most 255 * 255 + 128, so everything fits in uint16
+    suma = region * inverso
+    suma += color
+    suma += 128
+    # Rounded division by 255: (s + (s >> 8)) >> 8 with s = x + 128
+    suma += suma >> 8
+    suma >>= 8
+    region[...] = suma
+    return imagen
@@ -0,0 +1,163 @@
+# workers.py
+import threading
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TrabajoCancelado(Exception):
+    """Se lanza dentro de un trabajo cuando se pidió su cancelación."""
+
+
+class SenalesTrabajo(QObject):
+    # Emitted from the worker thread; Qt queues them to the GUI thread
+    progreso = pyqtSignal(str, int)
+    terminado = pyqtSignal(object)
+    fallido = pyqtSignal(str)
+    cancelado = pyqtSignal()
+
+
+class Trabajo(QRunnable):
+    """Ejecuta `funcion(reportar)` en el pool de hilos.
+
+    `reportar(etapa, porcentaje)` publica el avance y es también el punto donde
+    el trabajo se detiene si se canceló: la cancelación es cooperativa y surte
+    efecto en la siguiente etapa.
+    """
+
+    def __init__(self, funcion):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.funcion = funcion
+        self.senales = SenalesTrabajo()
+        self._cancelado = threading.Event()
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    @property
+    def fue_cancelado(self):
+        return self._cancelado.is_set()
+
+    def reportar(self, etapa, porcentaje):
+        if self._cancelado.is_set():
+            raise TrabajoCancelado()
+        self.senales.progreso.emit(etapa, int(porcentaje))
+
+    def run(self):
+        try:
+            self.reportar("Iniciando", 0)
+            resultado = self.funcion(self.reportar)
+            if self._cancelado.is_set():
+                raise TrabajoCancelado()
+        except TrabajoCancelado:
+            self.senales.cancelado.emit()
+        except Exception as e:
+            traceback.print_exc()
+            self.senales.fallido.emit(str(e))
+        else:
+            self.senales.terminado.emit(resultado)
+
+
+class GestorTrabajos(QObject):
+    """Pool de trabajos en segundo plano identificados por una clave.
+
+    Enviar un trabajo con una clave que ya tiene uno en curso cancela el
+    anterior y descarta su resultado, de modo que sólo el último llega a la
+    interfaz (p. ej. volver a cargar un pie mientras el anterior se procesa).
+    Cancelar un trabajo también lo deja de considerar vigente en ese momento:
+    aunque ya haya pasado su última comprobación o su resultado esté en cola,
+    éste se descarta y se llama `al_cancelar`. Todas las funciones de retorno
+    se ejecutan en el hilo de la interfaz.
+    """
+
+    # Clave, etapa y porcentaje del trabajo vigente
+    progreso = pyqtSignal(str, str, int)
+    # Emitted when no job is left running
+    inactivo = pyqtSignal()
+
+    def __init__(self, max_hilos=2, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_hilos)
+        self._vigentes = {}
+        self._en_ejecucion = set()
+
+    def enviar(self, clave, funcion, al_terminar, al_fallar=None, al_cancelar=None):
+        anterior = self._vigentes.get(clave)
+        if anterior is not None:
+            anterior.cancelar()
+
+        trabajo = Trabajo(funcion)
+        trabajo.al_cancelar = al_cancelar
+        self._vigentes[clave] = trabajo
+        self._en_ejecucion.add(trabajo)
+
+        def vigente():
+            return self._vigentes.get(clave) is trabajo
+
+        def finalizar():
+            self._en_ejecucion.discard(trabajo)
+            if vigente():
+                del self._vigentes[clave]
+            if not self._vigentes:
+                self.inactivo.emit()
+
+        def terminado(resultado):
+            es_vigente = vigente()
+            finalizar()
+            if es_vigente:
+                al_terminar(resultado)
+
+        def fallido(mensaje):
+            es_vigente = vigente()
+            finalizar()
+            if es_vigente and al_fallar is not None:
+                al_fallar(mensaje)
+
+        def cancelado():
+            # Jobs cancelled through the manager were already discarded; this
+            # only runs for jobs that stopped on their own
+            es_vigente = vigente()
+            finalizar()
+            if es_vigente and al_cancelar is not None:
+                al_cancelar()
+
+        def progreso(etapa, porcentaje):
+            if vigente():
+                self.progreso.emit(clave, etapa, porcentaje)
+
+        trabajo.senales.progreso.connect(progreso)
+        trabajo.senales.terminado.connect(terminado)
+        trabajo.senales.fallido.connect(fallido)
+        trabajo.senales.cancelado.connect(cancelado)
+        self.pool.start(trabajo)
+        return trabajo
+
+    def cancelar(self, clave):
+        trabajo = self._vigentes.pop(clave, None)
+        if trabajo is not None:
+            self._descartar(trabajo)
+            if not self._vigentes:
+                self.inactivo.emit()
+
+    def cancelar_todos(self):
+        trabajos = list(self._vigentes.values())
+        self._vigentes.clear()
+        for trabajo in trabajos:
+            self._descartar(trabajo)
+        self.inactivo.emit()
+
+    def _descartar(self, trabajo):
+        # No longer current: a result already queued to the GUI thread is dropped
+        trabajo.cancelar()
+        if trabajo.al_cancelar is not None:
+            trabajo.al_cancelar()
+
+    def ocupado(self, clave=None):
+        if clave is None:
+            return bool(self._vigentes)
+        return clave in self._vigentes
+
+    def esperar(self, milisegundos=-1):
+        return self.pool.waitForDone(milisegundos)
@@ -0,0 +1,78 @@
+# workspace.py
+
+import threading
+
+import numpy as np
+
+
+class EspacioTrabajo:
+    """Búferes reutilizables para segmentar y renderizar cuadros de una misma forma.
+
+    Cada búfer se reserva una vez (al tamaño más grande pedido) y se vuelve a
+    entregar como vista contigua en las llamadas siguientes, así que un cuadro
+    de escáner no provoca reservas nuevas para los intermedios del recorte del
+    pie (volteo, HSV, máscaras, cierre, gris). Los resultados que sobreviven a
+    la llamada (la máscara refinada, el recorte del pie y las vistas
+    renderizadas) no salen de aquí.
+
+    Memoria máxima medida con `python benchmark.py memoria` (tracemalloc,
+    segmentar y renderizar piel y mapa de calor de un escaneo de 12 MP): unos
+    9,0 MB por megapíxel sin espacio de trabajo, de los que 8,6 son los
+    resultados (máscara, recorte y dos vistas a cuadro completo); ningún
+    intermedio es de cuadro completo. Con un espacio ya reservado el máximo
+    baja a 8,6 MB por megapíxel, pero el espacio retiene unos 9 MB por
+    megapíxel entre llamadas, así que sólo conviene cuando esa memoria se va a
+    volver a usar enseguida; batch.py y la interfaz no lo usan.
+
+    No es seguro compartir una instancia entre hilos; usar espacio_trabajo()
+    para obtener la del hilo actual.
+    """
+
+    def __init__(self, shape):
+        self.shape = tuple(shape)
+        self._buferes = {}
+
+    def bufer(self, nombre, shape, dtype=np.uint8):
+        """Arreglo contiguo de forma `shape` que reutiliza la memoria de llamadas anteriores."""
+        dtype = np.dtype(dtype)
+        tamano = int(np.prod(shape))
+        plano = self._buferes.get(nombre)
+        if plano is None or plano.dtype != dtype or plano.size < tamano:
+            plano = np.empty(tamano, dtype=dtype)
+            self._buferes[nombre] = plano
+        return plano[:tamano].reshape(shape)
+
+    @property
+    def bytes_reservados(self):
+        return sum(plano.nbytes for plano in self._buferes.values())
+
+    def liberar(self):
+        self._buferes.clear()
+
+
+_locales = threading.local()
+
+
+def espacio_trabajo(shape, maximo=2):
+    """EspacioTrabajo del hilo actual para cuadros de forma `shape`.
+
+    Se guardan como mucho `maximo` formas por hilo; la menos reciente se descarta.
+    """
+    espacios = getattr(_locales, "espacios", None)
+    if espacios is None:
+        espacios = _locales.espacios = {}
+    shape = tuple(shape)
+    espacio = espacios.pop(shape, None)
+    if espacio is None:
+        espacio = EspacioTrabajo(shape)
+    espacios[shape] = espacio
+    while len(espacios) > maximo:
+        espacios.pop(next(iter(espacios)))
+    return espacio
+
+
+def bufer(espacio, nombre, shape, dtype=np.uint8):
+    """Búfer `nombre` de `espacio`, o un arreglo nuevo si no hay espacio de trabajo."""
+    if espacio is None:
+        return np.empty(shape, dtype=dtype)
+    return espacio.bufer(nombre, shape, dtype)